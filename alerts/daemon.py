@@ -18,6 +18,8 @@ sys.path.insert(0, ROOT_DIR)
 os.chdir(ROOT_DIR)
 
 from src.spectral_galileo.core.agent import FinancialAgent
+from src.spectral_galileo.external import reddit_sentiment
+from src.spectral_galileo.core.data_manager import DataManager
 from src.spectral_galileo.core.watchlist_manager import get_watchlist_tickers
 from src.spectral_galileo.core.portfolio_manager import load_portfolio
 from src.spectral_galileo.core.accumulation_helper import (
@@ -66,6 +68,8 @@ class AlertDaemon:
         self.dry_run = dry_run
         self.running = False
         self.config = load_config()
+        # Caché compartida con main.py y el bot de Telegram
+        self.data_manager = DataManager()
         
         # Registrar handlers de señales
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -151,6 +155,11 @@ class AlertDaemon:
             watchlist = get_watchlist_tickers()
             logger.info(f"📋 Watchlist: {len(watchlist)} tickers")
             
+            # Historia de toda la watchlist en una sola descarga
+            self.data_manager.prefetch(watchlist)
+            # Reddit: un índice de menciones para toda la watchlist (no una búsqueda por ticker)
+            reddit_sentiment.use_mention_index(watchlist)
+            
             for ticker in watchlist:
                 if not self.running:
                     break
@@ -212,11 +221,12 @@ class AlertDaemon:
         
         # Analizar ticker en AMBOS plazos (Production: use all external data sources)
         is_short_term = self.config['analysis_mode'] == 'short_term'
-        agent_short = FinancialAgent(ticker, is_short_term=True, skip_external_data=False)
-        results_short = agent_short.run_analysis()
+        data = self.data_manager.get_ticker_data(ticker)
+        data['macro_data'] = self.data_manager.get_macro_data()
+        data['market_regime'] = self.data_manager.get_market_regime()
         
-        agent_long = FinancialAgent(ticker, is_short_term=False, skip_external_data=False)
-        results_long = agent_long.run_analysis()
+        results_short, results_long = FinancialAgent.run_dual_analysis(
+            ticker, pre_data=data, skip_external_data=False)
         
         # Usar corto plazo para decisión de alerta (timing operativo)
         verdict = results_short.get('strategy', {}).get('verdict', 'NEUTRAL')
@@ -33,6 +33,9 @@ from report_generator_v2 import ReportGeneratorV2
 # Importar agent
 try:
     from agent import FinancialAgent
+    from src.spectral_galileo.analysis import indicators
+    from src.spectral_galileo.analysis import regime_detection
+    from src.spectral_galileo.analysis import timeframe_analysis
     AGENT_AVAILABLE = True
 except ImportError:
     AGENT_AVAILABLE = False
@@ -44,6 +47,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Proxy del mercado para el régimen y días de historia previos al inicio
+# necesarios para calentar SMA_200/ADX
+REGIME_TICKER = 'SPY'
+REGIME_WARMUP_DAYS = 400
+
+# Historia diaria previa al inicio para el análisis multi-timeframe (5 años mensuales)
+TIMEFRAME_WARMUP_DAYS = 1826
+
 
 class AgentBacktester:
     """
@@ -94,6 +105,15 @@ class AgentBacktester:
         # Cache de agentes para evitar recrearlos
         self.agents = {}  # {ticker: FinancialAgent}
         
+        # Régimen de mercado point-in-time (desde SPY almacenado, sin red)
+        self.regime_timeline = None
+        
+        # Barras diarias/semanales/mensuales locales por ticker para el análisis MTF
+        self.timeframes = {}  # {ticker: HistoricalTimeframes}
+        
+        # Buffers de indicadores reutilizados en cada día simulado
+        self.indicator_buffers = {}  # {ticker: np.ndarray (lookback x indicadores)}
+        
         # ==================== PHASE 3: RISK MANAGEMENT ====================
         # Tracking de posiciones abiertas con stops y targets
         self.open_positions = {}  # {ticker: {'entry_price': float, 'shares': int, 'entry_date': date}}
@@ -135,8 +155,51 @@ class AgentBacktester:
                 logger.error(f"  ✗ {ticker}: Error - {e}")
         
         logger.info(f"✨ {successful}/{len(self.tickers)} tickers cargados exitosamente\n")
+        
+        if AGENT_AVAILABLE:
+            self._load_regime_timeline()
+            self._load_timeframes()
         return successful > 0
     
+    def _load_timeframes(self):
+        """
+        Prepara el análisis multi-timeframe histórico: semanal y mensual se
+        remuestrean desde la historia diaria local (con años previos al inicio),
+        truncada en cada fecha simulada.
+        """
+        warmup_start = self.start_date - timedelta(days=TIMEFRAME_WARMUP_DAYS)
+        for ticker in self.daily_data:
+            history = self.data_manager.get_historical_range(
+                ticker,
+                start_date=warmup_start.strftime('%Y-%m-%d'),
+                end_date=self.end_date.strftime('%Y-%m-%d'),
+                auto_download=False
+            )
+            if history.empty:
+                continue
+            history.columns = history.columns.str.title()
+            self.timeframes[ticker] = timeframe_analysis.HistoricalTimeframes(history)
+    
+    def _load_regime_timeline(self):
+        """
+        Precalcula el régimen de mercado de cada fecha a partir del SPY
+        almacenado localmente. Sin datos de SPY el régimen queda UNKNOWN
+        (umbrales neutrales); nunca se consulta el SPY en vivo.
+        """
+        warmup_start = self.start_date - timedelta(days=REGIME_WARMUP_DAYS)
+        spy = self.data_manager.get_historical_range(
+            REGIME_TICKER,
+            start_date=warmup_start.strftime('%Y-%m-%d'),
+            end_date=self.end_date.strftime('%Y-%m-%d'),
+            auto_download=False
+        )
+        if not spy.empty:
+            spy.columns = spy.columns.str.title()
+        else:
+            logger.warning(f"  ⚠ {REGIME_TICKER} no almacenado: régimen UNKNOWN en todo el backtest")
+        
+        self.regime_timeline = regime_detection.RegimeTimeline.from_history(spy)
+    
     def _calculate_volatility(self, ticker: str, periods: int = 20) -> float:
         """
         Calcula volatilidad anualizada (desviación estándar de retornos diarios).
@@ -155,24 +218,23 @@ class AgentBacktester:
         if len(data) < periods:
             return 0.02
         
-        # Calcular retornos diarios
-        close = data['Close'].tail(periods).values
-        returns = np.diff(close) / close[:-1]
-        
-        # Desviación estándar diaria
-        daily_volatility = np.std(returns)
-        
-        # Anualizada (252 días de trading)
-        annual_volatility = daily_volatility * np.sqrt(252)
-        
-        return float(annual_volatility)
+        # `periods` cierres = periods - 1 retornos diarios (mismo kernel que el agente)
+        return float(indicators.annualized_volatility(data['Close'].values, periods - 1))
+    
+    def _history_until(self, data: pd.DataFrame, date: pd.Timestamp, lookback: int) -> pd.DataFrame:
+        """
+        Últimas `lookback` filas con fecha <= date (búsqueda binaria sobre el
+        índice ordenado, sin construir una máscara booleana por día).
+        """
+        end = data.index.searchsorted(date, side='right')
+        return data.iloc[max(0, end - lookback):end]
     
     def get_daily_prices(self, date: pd.Timestamp) -> Dict[str, float]:
         """Obtiene precios de cierre para una fecha específica."""
         prices = {}
         for ticker, data in self.daily_data.items():
             try:
-                price = data[data.index <= date]['Close'].iloc[-1]
+                price = self._history_until(data, date, 1)['Close'].iloc[-1]
                 prices[ticker] = float(price)
             except (IndexError, KeyError):
                 pass
@@ -196,12 +258,13 @@ class AgentBacktester:
             logger.warning("Agent.py no disponible - usando fallback")
             return self._generate_fallback_signals(date, prices)
         
+        # Valor de la cuenta simulada (en vez de leer la config del portafolio por ticker)
+        account_value = self.portfolio.get_portfolio_value()
+        
         for ticker in self.tickers:
             try:
                 # Obtener datos hasta esta fecha
-                hist_data = self.daily_data[ticker][
-                    self.daily_data[ticker].index <= date
-                ].tail(lookback_days)
+                hist_data = self._history_until(self.daily_data[ticker], date, lookback_days)
                 
                 if len(hist_data) < 5:  # Necesitamos mínimo 5 días
                     continue
@@ -210,17 +273,28 @@ class AgentBacktester:
                 if ticker not in self.agents:
                     self.agents[ticker] = FinancialAgent(
                         ticker_symbol=ticker,
-                        is_short_term=self.is_short_term
+                        is_short_term=self.is_short_term,
+                        lean=True  # peers/dimensionado solo si se leen
                     )
                 
                 agent = self.agents[ticker]
                 
+                buffer = self.indicator_buffers.get(ticker)
+                if buffer is None or len(buffer) < lookback_days:
+                    buffer = np.empty((lookback_days, len(indicators.ALL_INDICATORS)))
+                    self.indicator_buffers[ticker] = buffer
+                
                 # Ejecutar análisis con datos históricos
                 pre_data = {
                     'history': hist_data,
                     'fundamentals': agent.info if hasattr(agent, 'info') else {},
                     'news': agent.news if hasattr(agent, 'news') else [],
-                    'macro_data': agent.macro_data if hasattr(agent, 'macro_data') else {}
+                    'macro_data': agent.macro_data if hasattr(agent, 'macro_data') else {},
+                    'indicator_buffer': buffer[:len(hist_data)],
+                    'market_regime': self.regime_timeline.at(date),
+                    'account_value': account_value,
+                    'timeframes': (self.timeframes[ticker].frames_at(date)
+                                   if ticker in self.timeframes else {})
                 }
                 
                 # Ejecutar análisis
@@ -559,29 +633,9 @@ class AgentBacktester:
             return 0.0
         
         data = self.daily_data[ticker]
-        high = data['High'].values
-        low = data['Low'].values
-        close = data['Close'].values
-        
-        if len(high) < periods:
-            return 0.0
-        
-        # Calculate True Range
-        tr_list = []
-        for i in range(len(high)):
-            if i == 0:
-                tr = high[i] - low[i]
-            else:
-                tr = max(
-                    high[i] - low[i],
-                    abs(high[i] - close[i-1]),
-                    abs(low[i] - close[i-1])
-                )
-            tr_list.append(tr)
-        
-        # Average True Range
-        atr = np.mean(tr_list[-periods:])
-        return atr
+        # Mismo kernel que agent.calculate_atr
+        return float(indicators.atr_last(data['High'].values, data['Low'].values,
+                                         data['Close'].values, periods))
     
     def _calculate_position_size(
         self,
@@ -793,7 +847,7 @@ class AgentBacktester:
         signals = {}
         
         for ticker, data in self.daily_data.items():
-            hist = data[data.index <= date].tail(20)
+            hist = self._history_until(data, date, 20)
             
             if len(hist) < 20:
                 continue
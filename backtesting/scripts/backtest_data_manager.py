@@ -3,9 +3,10 @@ Backtest Data Manager - Gestiona datos históricos locales para backtesting
 
 Funcionalidad:
 - Descarga datos históricos de yfinance
-- Guarda datos en CSV local (backtest_data/)
-- Lee datos desde CSV local (rápido)
-- Actualiza datos diarios (append-only)
+- Guarda datos en CSV local (backtest_data/) o en formato binario columnar
+- Lee datos locales (binario con memory-map: sin parsear texto ni fechas)
+- Migra un directorio CSV existente a formato binario (--migrate)
+- Actualiza datos diarios (append-only, solo barras nuevas)
 - Valida integridad de datos
 
 Author: Spectral Galileo
@@ -13,12 +14,15 @@ Date: 2025-12-23
 """
 
 import os
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
 
+from backtest_storage import OHLCV_COLUMNS, CsvStorage, BinaryStorage, get_storage, is_restated
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +31,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def normalize_download(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza la salida de yf.download a columnas OHLCV con índice 'Date'.
+    
+    Selecciona las columnas por nombre (yfinance no garantiza el orden y
+    puede devolver MultiIndex (campo, ticker)).
+    """
+    if isinstance(data.columns, pd.MultiIndex):
+        level = 0 if 'Close' in data.columns.get_level_values(0) else -1
+        data.columns = data.columns.get_level_values(level)
+    data = data[OHLCV_COLUMNS]
+    
+    if not isinstance(data.index, pd.DatetimeIndex):
+        data.index = pd.to_datetime(data.index)
+    data.index.name = 'Date'
+    return data.sort_index()
+
+
 class BacktestDataManager:
     """
     Gestor de datos históricos para backtesting.
@@ -34,20 +56,19 @@ class BacktestDataManager:
     Maneja descarga, almacenamiento y actualización de datos de precios.
     """
     
-    def __init__(self, data_dir: str = "./backtest_data"):
+    def __init__(self, data_dir: str = "./backtest_data", storage: str = "auto"):
         """
         Inicializa el gestor de datos.
         
         Args:
-            data_dir: Directorio donde almacenar archivos CSV
+            data_dir: Directorio donde almacenar los datos
+            storage: Backend de almacenamiento: 'csv', 'binary' o 'auto'
+                     (binario si el directorio ya fue migrado, CSV si no)
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"BacktestDataManager inicializado en: {self.data_dir}")
-    
-    def _get_csv_path(self, ticker: str) -> Path:
-        """Obtiene la ruta del archivo CSV para un ticker."""
-        return self.data_dir / f"{ticker.upper()}.csv"
+        self.storage = get_storage(self.data_dir, storage)
+        logger.info(f"BacktestDataManager inicializado en: {self.data_dir} ({self.storage.name})")
     
     def download_historical(
         self, 
@@ -58,26 +79,24 @@ class BacktestDataManager:
         force: bool = False
     ) -> pd.DataFrame:
         """
-        Descarga datos históricos y los guarda en CSV.
+        Descarga datos históricos y los guarda en el almacenamiento local.
         
-        Si el archivo ya existe, lo reutiliza (a menos que force=True).
+        Si los datos ya existen, los reutiliza (a menos que force=True).
         
         Args:
             ticker: Símbolo del ticker (ej: 'AAPL')
             years: Años hacia atrás a descargar (default 1)
             start_date: Fecha inicio (formato YYYY-MM-DD). Sobrescribe 'years'
             end_date: Fecha fin (formato YYYY-MM-DD). Default: hoy
-            force: Si True, fuerza descarga incluso si existe CSV
+            force: Si True, fuerza descarga incluso si existen datos locales
             
         Returns:
             DataFrame con datos OHLCV
         """
-        csv_path = self._get_csv_path(ticker)
-        
         # Si existe y no es force, retorna datos locales
-        if csv_path.exists() and not force:
+        if self.storage.exists(ticker) and not force:
             logger.info(f"✓ {ticker}: Datos locales encontrados (sin descargar)")
-            return self._read_csv(ticker)
+            return self._read(ticker)
         
         # Calcular fechas
         if not end_date:
@@ -102,27 +121,12 @@ class BacktestDataManager:
                 logger.warning(f"⚠ {ticker}: No se obtuvieron datos")
                 return pd.DataFrame()
             
-            # Si yfinance retorna MultiIndex en columnas, limpiar
-            if isinstance(data.columns, pd.MultiIndex):
-                # Aplanar las columnas usando el último nivel (el nombre real de la columna)
-                data.columns = [col[-1] if isinstance(col, tuple) else col for col in data.columns]
-            
-            # Renombrar columnas estándar
-            data.columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            
-            # Asegurar que el índice sea DateTime
-            if not isinstance(data.index, pd.DatetimeIndex):
-                data.index = pd.to_datetime(data.index)
-            
-            # Renombrar índice a 'Date'
-            data.index.name = 'Date'
+            # Columnas OHLCV por nombre, índice 'Date' ordenado
+            data = normalize_download(data)
             
-            # Ordenar por fecha
-            data = data.sort_index()
-            
-            # Guardar a CSV
-            data.to_csv(csv_path)
-            logger.info(f"✓ {ticker}: {len(data)} días descargados y guardados en {csv_path}")
+            # Guardar en el almacenamiento local
+            self.storage.write(ticker, data)
+            logger.info(f"✓ {ticker}: {len(data)} días descargados y guardados en {self.storage.path(ticker)}")
             
             return data
             
@@ -132,9 +136,7 @@ class BacktestDataManager:
     
     def update_daily(self, ticker: str) -> bool:
         """
-        Actualiza datos con el último cierre del mercado (append-only).
-        
-        Solo agrega la última fila si no existe en el CSV.
+        Actualiza datos con los últimos cierres del mercado (append-only).
         
         Args:
             ticker: Símbolo del ticker
@@ -142,50 +144,81 @@ class BacktestDataManager:
         Returns:
             True si se actualizó, False si no hay cambios o error
         """
-        csv_path = self._get_csv_path(ticker)
+        result = self.update_incremental(ticker)
+        return result['status'] in ('appended', 'refreshed', 'reloaded', 'downloaded')
+    
+    def update_incremental(self, ticker: str) -> dict:
+        """
+        Actualización incremental: descarga solo las barras recientes y las
+        anexa al almacenamiento sin reescribirlo.
+        
+        La descarga empieza en la penúltima barra guardada (barra de solape):
+        la última pudo guardarse en plena sesión (vela parcial), así que no
+        sirve para validar y se sobrescribe con la descargada. Si el Close de
+        la barra de solape difiere del almacenado, la serie fue re-ajustada por
+        el proveedor (split/dividendo) y se redescarga completa desde la
+        primera fecha local.
         
-        if not csv_path.exists():
-            logger.warning(f"⚠ {ticker}: Archivo CSV no existe. Descargando primero...")
-            self.download_historical(ticker, years=5)
-            return True
+        Args:
+            ticker: Símbolo del ticker
+            
+        Returns:
+            Dict con 'status' ('appended', 'refreshed' (solo cambió la última
+            barra), 'up_to_date', 'reloaded', 'downloaded', 'error') y 'rows'
+            (filas nuevas o totales)
+        """
+        if not self.storage.exists(ticker):
+            logger.warning(f"⚠ {ticker}: Datos locales no existen. Descargando primero...")
+            data = self.download_historical(ticker, years=5)
+            return {"status": "downloaded" if not data.empty else "no_data", "rows": len(data)}
         
         try:
-            # Leer último dato guardado
-            existing_data = pd.read_csv(csv_path, index_col='Date', parse_dates=True)
-            last_saved_date = existing_data.index[-1]
+            first_date, stored_tail = self.storage.read_bounds(ticker)
+            overlap_date = stored_tail.index[0]
+            last_saved_date = stored_tail.index[-1]
             
-            # Descargar solo últimos 2 días (para capturar cambios)
-            start_date = (last_saved_date - timedelta(days=2)).strftime('%Y-%m-%d')
             new_data = yf.download(
-                ticker, 
-                start=start_date,
+                ticker,
+                start=overlap_date.strftime('%Y-%m-%d'),
                 progress=False
             )
             
             if new_data.empty:
                 logger.info(f"ℹ {ticker}: Sin datos nuevos")
-                return False
-            
-            # Buscar datos nuevos (después de last_saved_date)
-            new_rows = new_data[new_data.index > last_saved_date]
-            
-            if new_rows.empty:
+                return {"status": "up_to_date", "rows": 0}
+            
+            new_data = normalize_download(new_data)
+            
+            # Validar la barra de solape (penúltima, ya cerrada) contra la copia local
+            if len(stored_tail) > 1 and overlap_date in new_data.index:
+                if is_restated(stored_tail['Close'].iloc[0], new_data.loc[overlap_date, 'Close']):
+                    logger.info(f"↻ {ticker}: Serie re-ajustada por el proveedor, redescargando...")
+                    data = self.download_historical(
+                        ticker, start_date=first_date.strftime('%Y-%m-%d'), force=True
+                    )
+                    return {"status": "reloaded" if not data.empty else "error", "rows": len(data)}
+            
+            # La última barra guardada se reescribe junto con las nuevas
+            new_rows = new_data[new_data.index >= last_saved_date]
+            added = int((new_rows.index > last_saved_date).sum())
+            
+            if new_rows.empty or (added == 0 and np.allclose(
+                    new_rows.iloc[-1][OHLCV_COLUMNS].to_numpy(dtype=float),
+                    stored_tail.iloc[-1][OHLCV_COLUMNS].to_numpy(dtype=float), equal_nan=True)):
                 logger.info(f"ℹ {ticker}: Ya actualizado")
-                return False
+                return {"status": "up_to_date", "rows": 0}
             
-            # Append a los datos existentes
-            updated_data = pd.concat([existing_data, new_rows])
-            updated_data = updated_data[~updated_data.index.duplicated(keep='last')]
-            updated_data = updated_data.sort_index()
-            
-            # Guardar
-            updated_data.to_csv(csv_path)
-            logger.info(f"✓ {ticker}: Actualizado con {len(new_rows)} nuevo(s) día(s)")
-            return True
+            # Append directo al archivo (sin re-serializar la historia)
+            self.storage.append(ticker, new_rows)
+            if added == 0:
+                logger.info(f"✓ {ticker}: Última barra actualizada")
+                return {"status": "refreshed", "rows": 0}
+            logger.info(f"✓ {ticker}: Actualizado con {added} nuevo(s) día(s)")
+            return {"status": "appended", "rows": added}
             
         except Exception as e:
             logger.error(f"✗ {ticker}: Error actualizando - {str(e)}")
-            return False
+            return {"status": "error", "error": str(e), "rows": 0}
     
     def get_historical_range(
         self, 
@@ -197,61 +230,55 @@ class BacktestDataManager:
         """
         Obtiene datos históricos de un rango de fechas.
         
-        Intenta leer del CSV local. Si no existe y auto_download=True, descarga primero.
+        Intenta leer de los datos locales. Si no existen y auto_download=True, descarga primero.
+        Con el backend binario solo se materializa el rango pedido.
         
         Args:
             ticker: Símbolo del ticker
             start_date: Fecha inicio (formato YYYY-MM-DD)
             end_date: Fecha fin (formato YYYY-MM-DD)
-            auto_download: Si True, descarga si no existe CSV local
+            auto_download: Si True, descarga si no existen datos locales
             
         Returns:
             DataFrame con datos filtrados
         """
-        csv_path = self._get_csv_path(ticker)
-        
         # Si no existe, descargar
-        if not csv_path.exists():
+        if not self.storage.exists(ticker):
             if auto_download:
                 logger.info(f"Datos de {ticker} no encontrados. Descargando...")
                 data = self.download_historical(ticker, years=5)
             else:
                 logger.warning(f"✗ {ticker}: Datos no encontrados y auto_download=False")
                 return pd.DataFrame()
-        else:
-            # Leer del CSV
-            data = self._read_csv(ticker)
-        
-        if data.empty:
+            
+            if data.empty:
+                return data
+            
+            # Filtrar por rango de fechas si se especifica
+            if start_date:
+                data = data[data.index >= pd.to_datetime(start_date)]
+            if end_date:
+                data = data[data.index <= pd.to_datetime(end_date)]
             return data
         
-        # Filtrar por rango de fechas si se especifica
-        if start_date:
-            data = data[data.index >= pd.to_datetime(start_date)]
-        if end_date:
-            data = data[data.index <= pd.to_datetime(end_date)]
-        
-        return data
+        return self._read(ticker, start_date=start_date, end_date=end_date)
     
-    def _read_csv(self, ticker: str) -> pd.DataFrame:
+    def _read(self, ticker: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
         """
-        Lee datos desde CSV local.
+        Lee datos locales del backend configurado.
         
         Args:
             ticker: Símbolo del ticker
+            start_date: Fecha inicio opcional (inclusive)
+            end_date: Fecha fin opcional (inclusive)
             
         Returns:
             DataFrame con datos
         """
-        csv_path = self._get_csv_path(ticker)
-        
         try:
-            data = pd.read_csv(csv_path, index_col=0, parse_dates=[0])
-            if data.index.name != 'Date':
-                data.index.name = 'Date'
-            return data
+            return self.storage.read(ticker, start_date=start_date, end_date=end_date)
         except Exception as e:
-            logger.error(f"✗ {ticker}: Error leyendo CSV - {str(e)}")
+            logger.error(f"✗ {ticker}: Error leyendo datos locales - {str(e)}")
             return pd.DataFrame()
     
     def list_available_tickers(self) -> list:
@@ -261,9 +288,51 @@ class BacktestDataManager:
         Returns:
             Lista de tickers
         """
-        csv_files = list(self.data_dir.glob("*.csv"))
-        tickers = [f.stem.upper() for f in csv_files]
-        return sorted(tickers)
+        return self.storage.list_tickers()
+    
+    def migrate_to_binary(self, tickers: list = None, remove_csv: bool = False) -> dict:
+        """
+        Migra los CSV del directorio al formato binario columnar.
+        
+        Cada ticker se relee desde binario y se compara con el CSV antes de
+        darlo por migrado. Tras la migración, los gestores creados con
+        storage='auto' sobre este directorio usan el backend binario.
+        
+        Args:
+            tickers: Tickers a migrar (default: todos los CSV del directorio)
+            remove_csv: Si True, borra cada CSV tras verificar su migración
+            
+        Returns:
+            Dict con resultados por ticker
+        """
+        csv_storage = CsvStorage(self.data_dir)
+        binary_storage = BinaryStorage(self.data_dir)
+        tickers = tickers or csv_storage.list_tickers()
+        results = {}
+        
+        logger.info(f"Migrando {len(tickers)} tickers a formato binario...")
+        
+        for ticker in tickers:
+            try:
+                data = csv_storage.read(ticker)[OHLCV_COLUMNS]
+                binary_storage.write(ticker, data)
+                
+                migrated = binary_storage.read(ticker)
+                if not (migrated.index.equals(data.index)
+                        and np.allclose(migrated.values, data.values, equal_nan=True)):
+                    results[ticker] = {"status": "error", "error": "Verificación fallida"}
+                    continue
+                
+                if remove_csv:
+                    csv_storage.path(ticker).unlink()
+                results[ticker] = {"status": "ok", "rows": len(data)}
+            except Exception as e:
+                results[ticker] = {"status": "error", "error": str(e)}
+        
+        self.storage = binary_storage
+        ok = len([r for r in results.values() if r['status'] == 'ok'])
+        logger.info(f"✓ Migración completada: {ok}/{len(tickers)} exitosos")
+        return results
     
     def get_ticker_info(self, ticker: str) -> dict:
         """
@@ -275,18 +344,16 @@ class BacktestDataManager:
         Returns:
             Dict con info (días, fechas, tamaño)
         """
-        csv_path = self._get_csv_path(ticker)
-        
-        if not csv_path.exists():
+        if not self.storage.exists(ticker):
             return {"status": "not_found", "ticker": ticker}
         
         try:
-            data = self._read_csv(ticker)
+            data = self._read(ticker)
             
             if data.empty:
                 return {"status": "empty", "ticker": ticker}
             
-            file_size_kb = csv_path.stat().st_size / 1024
+            file_size_kb = self.storage.size_bytes(ticker) / 1024
             
             return {
                 "status": "ok",
@@ -309,7 +376,8 @@ class BacktestDataManager:
         tickers: list,
         years: int = 5,
         force: bool = False,
-        max_workers: int = 4
+        max_workers: int = 4,
+        incremental: bool = False
     ) -> dict:
         """
         Descarga datos para múltiples tickers en paralelo.
@@ -319,6 +387,8 @@ class BacktestDataManager:
             years: Años hacia atrás
             force: Forzar descarga incluso si existen
             max_workers: Workers para descarga paralela (no implementado aún)
+            incremental: Si True, los tickers con datos locales solo descargan
+                         las barras nuevas (ver update_incremental)
             
         Returns:
             Dict con resultados
@@ -328,6 +398,15 @@ class BacktestDataManager:
         
         for ticker in tickers:
             try:
+                if incremental and not force and self.storage.exists(ticker):
+                    update = self.update_incremental(ticker)
+                    results[ticker] = {
+                        "status": "ok" if update['status'] != 'error' else "error",
+                        "update": update['status'],
+                        "rows": update['rows']
+                    }
+                    continue
+                
                 data = self.download_historical(ticker, years=years, force=force)
                 results[ticker] = {
                     "status": "ok" if not data.empty else "no_data",
@@ -350,13 +429,11 @@ class BacktestDataManager:
         Returns:
             Dict con validación
         """
-        csv_path = self._get_csv_path(ticker)
-        
-        if not csv_path.exists():
+        if not self.storage.exists(ticker):
             return {"valid": False, "reason": "File not found"}
         
         try:
-            data = self._read_csv(ticker)
+            data = self._read(ticker)
             
             if data.empty:
                 return {"valid": False, "reason": "Empty dataframe"}
@@ -410,15 +487,24 @@ if __name__ == "__main__":
     parser.add_argument("--validate", help="Validar datos de un ticker")
     parser.add_argument("--years", type=int, default=5, help="Años a descargar (default 5 - largo plazo)")
     parser.add_argument("--force", action="store_true", help="Forzar descarga")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Con --download: solo anexar barras nuevas a los datos existentes")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Migrar los CSV del directorio a formato binario columnar")
+    parser.add_argument("--remove-csv", action="store_true",
+                        help="Con --migrate: borrar cada CSV tras verificar su migración")
+    parser.add_argument("--storage", default="auto", choices=["auto", "csv", "binary"],
+                        help="Backend de almacenamiento (default auto)")
     parser.add_argument("--dir", default="./backtest_data", help="Directorio de datos")
     
     args = parser.parse_args()
     
-    manager = BacktestDataManager(args.dir)
+    manager = BacktestDataManager(args.dir, storage=args.storage)
     
     if args.download:
         print(f"\n📥 Descargando {len(args.download)} tickers...")
-        results = manager.bulk_download(args.download, years=args.years, force=args.force)
+        results = manager.bulk_download(args.download, years=args.years, force=args.force,
+                                        incremental=args.incremental)
         for ticker, result in results.items():
             status = "✓" if result['status'] == 'ok' else "✗"
             print(f"  {status} {ticker}: {result}")
@@ -448,5 +534,12 @@ if __name__ == "__main__":
         for key, value in result.items():
             print(f"  {key}: {value}")
     
+    elif args.migrate:
+        print(f"\n📦 Migrando {args.dir} a formato binario...")
+        results = manager.migrate_to_binary(remove_csv=args.remove_csv)
+        for ticker, result in results.items():
+            status = "✓" if result['status'] == 'ok' else "✗"
+            print(f"  {status} {ticker}: {result}")
+    
     else:
         parser.print_help()
@@ -0,0 +1,306 @@
+"""
+Backtest Storage - Backends de almacenamiento para datos OHLCV de backtesting
+
+Funcionalidad:
+- CsvStorage: un CSV por ticker (formato original, legible)
+- BinaryStorage: formato columnar binario (un archivo por columna) leído con
+  np.memmap, sin parsear texto ni fechas
+- Interfaz común (read, write, append, read_bounds) usada por BacktestDataManager;
+  append sustituye las filas finales desde la primera fecha anexada
+- Detección automática del backend de un directorio
+
+Author: Spectral Galileo
+Date: 2025-12-23
+"""
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Agregar directorio root al Python path para importar src
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.spectral_galileo.data.ohlcv import OHLCV_COLUMNS, columns_to_frame, is_restated
+
+# Sufijo del directorio columnar de cada ticker (ej: AAPL.cols/)
+BINARY_SUFFIX = '.cols'
+
+# Archivo de fechas (int64, nanosegundos) dentro del directorio columnar
+DATE_FILE = 'Date.i8'
+
+
+class CsvStorage:
+    """
+    Almacenamiento en CSV: un archivo `<TICKER>.csv` por ticker.
+    """
+
+    name = 'csv'
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+
+    def path(self, ticker: str) -> Path:
+        """Ruta del archivo CSV de un ticker."""
+        return self.data_dir / f"{ticker.upper()}.csv"
+
+    def exists(self, ticker: str) -> bool:
+        return self.path(ticker).exists()
+
+    def list_tickers(self) -> list:
+        return sorted(f.stem.upper() for f in self.data_dir.glob("*.csv"))
+
+    def size_bytes(self, ticker: str) -> int:
+        return self.path(ticker).stat().st_size
+
+    def read(self, ticker: str, start_date=None, end_date=None) -> pd.DataFrame:
+        """Lee el CSV completo y filtra por rango de fechas."""
+        data = pd.read_csv(self.path(ticker), index_col=0, parse_dates=[0])
+        if data.index.name != 'Date':
+            data.index.name = 'Date'
+        if start_date is not None:
+            data = data[data.index >= pd.to_datetime(start_date)]
+        if end_date is not None:
+            data = data[data.index <= pd.to_datetime(end_date)]
+        return data
+
+    def write(self, ticker: str, data: pd.DataFrame) -> None:
+        data.to_csv(self.path(ticker))
+
+    def append(self, ticker: str, data: pd.DataFrame) -> None:
+        """
+        Anexa filas al final del CSV sin reescribir el archivo. Las filas
+        guardadas con fecha >= a la primera nueva se sustituyen (se trunca
+        solo la cola).
+        """
+        path = self.path(ticker)
+        first_new = pd.Timestamp(data.index[0])
+        with open(path, 'rb+') as f:
+            keep = None
+            for offset, line in _reverse_lines(f):
+                if pd.to_datetime(line.split(b',')[0].decode()) < first_new:
+                    break
+                keep = offset
+            if keep is not None:
+                f.truncate(keep)
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        data.to_csv(path, mode='a', header=False)
+
+    def read_bounds(self, ticker: str, tail: int = 2) -> tuple:
+        """
+        Lee solo la primera fecha y las últimas filas del CSV (sin parsear el archivo).
+
+        Returns:
+            (primera_fecha, DataFrame con las últimas `tail` filas)
+        """
+        with open(self.path(ticker), 'rb') as f:
+            header = f.readline().decode().strip().split(',')
+            first_line = f.readline().decode().strip()
+
+            last_lines = []
+            for _, line in _reverse_lines(f):
+                last_lines.insert(0, line.decode().strip().split(','))
+                if len(last_lines) == tail:
+                    break
+
+        first_date = pd.to_datetime(first_line.split(',')[0])
+        rows = pd.DataFrame(
+            [[float(v) if v else float('nan') for v in values[1:]] for values in last_lines],
+            columns=header[1:],
+            index=pd.DatetimeIndex([pd.to_datetime(values[0]) for values in last_lines], name='Date')
+        )
+        return first_date, rows
+
+
+class BinaryStorage:
+    """
+    Almacenamiento columnar binario: un directorio `<TICKER>.cols/` con un
+    archivo crudo por columna (`Date.i8` en nanosegundos, `<Col>.f8`).
+
+    Las lecturas usan np.memmap y recortan el rango de fechas con búsqueda
+    binaria antes de construir el DataFrame; anexar es escribir al final de
+    cada archivo de columna.
+    """
+
+    name = 'binary'
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+
+    def path(self, ticker: str) -> Path:
+        """Ruta del directorio columnar de un ticker."""
+        return self.data_dir / f"{ticker.upper()}{BINARY_SUFFIX}"
+
+    def exists(self, ticker: str) -> bool:
+        return (self.path(ticker) / DATE_FILE).exists()
+
+    def list_tickers(self) -> list:
+        return sorted(
+            d.name[:-len(BINARY_SUFFIX)].upper()
+            for d in self.data_dir.glob(f"*{BINARY_SUFFIX}")
+            if (d / DATE_FILE).exists()
+        )
+
+    def size_bytes(self, ticker: str) -> int:
+        return sum(f.stat().st_size for f in self.path(ticker).iterdir())
+
+    def _columns(self, ticker: str) -> dict:
+        """Columnas memory-mapped del ticker, recortadas a la longitud común."""
+        base = self.path(ticker)
+        files = {'Date': (base / DATE_FILE, '<i8')}
+        for col in OHLCV_COLUMNS:
+            files[col] = (base / f"{col}.f8", '<f8')
+
+        lengths = [os.path.getsize(p) // 8 for p, _ in files.values()]
+        # Una escritura interrumpida puede dejar columnas desiguales
+        count = min(lengths)
+        if count == 0:
+            return {name: np.empty(0, dtype=dtype) for name, (_, dtype) in files.items()}
+        return {
+            name: np.memmap(p, dtype=dtype, mode='r', shape=(count,))
+            for name, (p, dtype) in files.items()
+        }
+
+    def read(self, ticker: str, start_date=None, end_date=None) -> pd.DataFrame:
+        """Lee el rango de fechas pedido sin cargar el resto del archivo."""
+        columns = self._columns(ticker)
+        dates = columns['Date']
+        lo, hi = 0, len(dates)
+        if start_date is not None:
+            lo = int(np.searchsorted(dates, _to_ns(start_date), side='left'))
+        if end_date is not None:
+            hi = int(np.searchsorted(dates, _to_ns(end_date), side='right'))
+        return _columns_to_frame({name: arr[lo:hi] for name, arr in columns.items()})
+
+    def write(self, ticker: str, data: pd.DataFrame) -> None:
+        """Reescribe la serie completa (directorio temporal + rename)."""
+        target = self.path(ticker)
+        tmp = target.with_name(target.name + '.tmp')
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+        _write_columns(tmp, data, mode='wb')
+
+        old = target.with_name(target.name + '.old')
+        if target.exists():
+            os.replace(target, old)
+        os.replace(tmp, target)
+        if old.exists():
+            shutil.rmtree(old)
+
+    def append(self, ticker: str, data: pd.DataFrame) -> None:
+        """
+        Anexa filas al final de cada columna. Las filas guardadas con fecha
+        >= a la primera nueva se sustituyen.
+        """
+        base = self.path(ticker)
+        dates = self._columns(ticker)['Date']
+        keep = int(np.searchsorted(dates, _to_ns(data.index[0]), side='left'))
+        del dates
+        # Truncar también iguala columnas desiguales de una escritura interrumpida
+        for name in [DATE_FILE] + [f"{col}.f8" for col in OHLCV_COLUMNS]:
+            with open(base / name, 'rb+') as f:
+                f.truncate(keep * 8)
+        _write_columns(base, data, mode='ab')
+
+    def read_bounds(self, ticker: str, tail: int = 2) -> tuple:
+        """
+        Primera fecha y últimas filas sin leer la serie.
+
+        Returns:
+            (primera_fecha, DataFrame con las últimas `tail` filas)
+        """
+        columns = self._columns(ticker)
+        first_date = pd.Timestamp(int(columns['Date'][0]), unit='ns')
+        rows = _columns_to_frame({name: arr[-tail:] for name, arr in columns.items()})
+        return first_date, rows
+
+
+def _reverse_lines(f):
+    """
+    Líneas de datos de un CSV abierto en binario, de la última a la primera
+    (sin la cabecera), como (offset de inicio, bytes de la línea).
+    """
+    f.seek(0, os.SEEK_END)
+    pos = f.tell()
+    partial = b''
+    while pos > 0:
+        step = min(4096, pos)
+        pos -= step
+        f.seek(pos)
+        lines = (f.read(step) + partial).split(b'\n')
+        # lines[0] puede estar cortada: se completa con el bloque anterior
+        partial = lines[0]
+        offset = pos + len(partial) + 1
+        starts = []
+        for line in lines[1:]:
+            starts.append(offset)
+            offset += len(line) + 1
+        for start, line in reversed(list(zip(starts, lines[1:]))):
+            if line.strip():
+                yield start, line
+    # Lo que queda en `partial` es la cabecera
+
+
+def _to_ns(value) -> int:
+    """Fecha (str o Timestamp, naive) -> entero en nanosegundos."""
+    ts = pd.Timestamp(value)
+    if ts.tz is not None:
+        ts = ts.tz_localize(None)
+    return int(ts.as_unit('ns').value)
+
+
+def _write_columns(base: Path, data: pd.DataFrame, mode: str) -> None:
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    with open(base / DATE_FILE, mode) as f:
+        index.as_unit('ns').asi8.astype('<i8').tofile(f)
+    for col in OHLCV_COLUMNS:
+        with open(base / f"{col}.f8", mode) as f:
+            data[col].to_numpy(dtype='<f8').tofile(f)
+
+
+def _columns_to_frame(columns: dict) -> pd.DataFrame:
+    index = pd.DatetimeIndex(np.asarray(columns['Date']).view('datetime64[ns]'), name='Date')
+    return columns_to_frame(index, columns)
+
+
+STORAGE_BACKENDS = {
+    CsvStorage.name: CsvStorage,
+    BinaryStorage.name: BinaryStorage,
+}
+
+
+def detect_storage(data_dir) -> str:
+    """
+    Backend de un directorio existente: 'binary' si ya fue migrado
+    (contiene directorios columnares), 'csv' en otro caso.
+    """
+    data_dir = Path(data_dir)
+    if data_dir.exists() and any(data_dir.glob(f"*{BINARY_SUFFIX}")):
+        return BinaryStorage.name
+    return CsvStorage.name
+
+
+def get_storage(data_dir, storage: str = 'auto'):
+    """
+    Crea el backend de almacenamiento.
+
+    Args:
+        data_dir: Directorio de datos
+        storage: 'csv', 'binary' o 'auto' (detecta según el contenido)
+    """
+    if storage == 'auto':
+        storage = detect_storage(data_dir)
+    if storage not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend de almacenamiento desconocido: {storage}")
+    return STORAGE_BACKENDS[storage](data_dir)
@@ -19,16 +19,83 @@ import numpy as np
 from typing import List, Dict, Tuple, Optional
 import json
 import logging
+import sys
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from itertools import product
 
+# Agregar directorio root al Python path para importar el kernel de scoring
+root_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_dir))
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Default evaluation window and daily history before it to warm up RSI/MACD/Stochastic
+DEFAULT_START_DATE = '2024-06-26'
+DEFAULT_END_DATE = '2025-12-23'
+FEATURE_WARMUP_DAYS = 100
+
+
+def simulate_long_only(close: np.ndarray, signals: np.ndarray) -> List[Dict]:
+    """
+    Simulate long-only strategies from signal columns (1 BUY, 0 HOLD, -1 SELL).
+    
+    A position opens at the close of a BUY bar and closes at the close of the
+    next SELL bar (or the last bar). Every column is one parameter set.
+    
+    Args:
+        close: Closes (T,)
+        signals: Signals (T, M)
+    
+    Returns:
+        One dict per column with return (%), sharpe, win_rate, max_drawdown, trades
+    """
+    signals = np.asarray(signals, dtype=float)
+    
+    # Position = last non-HOLD signal (forward fill of BUY/SELL)
+    state = pd.DataFrame(np.where(signals == 0, np.nan, signals)).ffill().to_numpy()
+    position = state == 1
+    
+    daily_returns = np.zeros_like(close, dtype=float)
+    daily_returns[1:] = close[1:] / close[:-1] - 1
+    strategy_returns = np.zeros(signals.shape)
+    strategy_returns[1:] = position[:-1] * daily_returns[1:, None]
+    
+    equity = np.cumprod(1 + strategy_returns, axis=0)
+    drawdown = 1 - equity / np.maximum.accumulate(equity, axis=0)
+    
+    mean = strategy_returns[1:].mean(axis=0)
+    std = strategy_returns[1:].std(axis=0)
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0) * np.sqrt(252)
+    
+    entries = position & ~np.vstack([np.zeros((1, position.shape[1]), dtype=bool), position[:-1]])
+    
+    metrics = []
+    for j in range(signals.shape[1]):
+        starts = np.flatnonzero(entries[:, j])
+        if len(starts):
+            # Exit: first bar without position after the entry (or the last bar)
+            flat = np.flatnonzero(~position[:, j])
+            exits = [flat[np.searchsorted(flat, start)] if np.searchsorted(flat, start) < len(flat)
+                     else len(close) - 1 for start in starts]
+            trade_returns = equity[exits, j] / equity[starts, j] - 1
+            win_rate = float((trade_returns > 0).mean())
+        else:
+            win_rate = 0.0
+        
+        metrics.append({
+            'return': float((equity[-1, j] - 1) * 100),
+            'sharpe': float(sharpe[j]),
+            'win_rate': win_rate,
+            'max_drawdown': float(drawdown[:, j].max()),
+            'trades': int(len(starts))
+        })
+    return metrics
+
 
 class ParameterOptimizer:
     """
@@ -38,7 +105,8 @@ class ParameterOptimizer:
     def __init__(
         self,
         strategy_name: str = "agent_backtester",
-        results_dir: str = "./optimization_results"
+        results_dir: str = "./optimization_results",
+        data_dir: str = "./backtest_data"
     ):
         """
         Initialize Parameter Optimizer.
@@ -46,10 +114,15 @@ class ParameterOptimizer:
         Args:
             strategy_name: Name of strategy to optimize
             results_dir: Directory to save optimization results
+            data_dir: Directory with the local daily bars (BacktestDataManager)
         """
         self.strategy_name = strategy_name
         self.results_dir = Path(results_dir)
         self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.data_dir = data_dir
+        
+        # Feature vectors per (ticker, start, end): computed once per sweep
+        self._features_cache = {}
         
         # Optimization results cache
         self.optimization_results = []
@@ -63,7 +136,9 @@ class ParameterOptimizer:
         self,
         buy_range: Tuple[int, int, int] = (30, 45, 2),  # start, end, step
         sell_range: Tuple[int, int, int] = (55, 70, 2),
-        ticker: str = "AAPL"
+        ticker: str = "AAPL",
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
     ) -> Dict:
         """
         Perform grid search on buy/sell thresholds.
@@ -72,6 +147,8 @@ class ParameterOptimizer:
             buy_range: (start, end, step) for buy threshold
             sell_range: (start, end, step) for sell threshold
             ticker: Ticker to optimize for
+            start_date: Optional evaluation start (YYYY-MM-DD)
+            end_date: Optional evaluation end (YYYY-MM-DD)
         
         Returns:
             Dictionary with best parameters and performance metrics
@@ -91,22 +168,18 @@ class ParameterOptimizer:
         total_combos = len(list(buy_thresholds)) * len(list(sell_thresholds))
         logger.info(f"   Testing {total_combos} combinations...")
         
-        combo_count = 0
-        for buy_thresh, sell_thresh in product(buy_thresholds, sell_thresholds):
-            # Validation: buy should be less than sell
-            if buy_thresh >= sell_thresh:
-                continue
-            
-            combo_count += 1
-            
-            # Here you would run backtest with these parameters
-            # This is a placeholder - actual implementation would call agent_backtester
-            metrics = self._evaluate_parameters(
-                ticker=ticker,
-                buy_threshold=buy_thresh,
-                sell_threshold=sell_thresh
-            )
-            
+        # Validation: buy should be less than sell
+        combos = [(buy, sell) for buy, sell in product(buy_thresholds, sell_thresholds) if buy < sell]
+        
+        # All combinations scored and simulated in one vectorised pass
+        all_metrics = self._evaluate_parameter_grid(
+            ticker=ticker,
+            param_sets=[{'buy_threshold': buy, 'sell_threshold': sell} for buy, sell in combos],
+            start_date=start_date,
+            end_date=end_date
+        )
+        
+        for (buy_thresh, sell_thresh), metrics in zip(combos, all_metrics):
             results.append({
                 'buy_threshold': buy_thresh,
                 'sell_threshold': sell_thresh,
@@ -124,9 +197,6 @@ class ParameterOptimizer:
                     'buy_threshold': buy_thresh,
                     'sell_threshold': sell_thresh
                 }
-            
-            if combo_count % max(1, total_combos // 10) == 0:
-                logger.info(f"   Progress: {combo_count}/{total_combos} combinations tested")
         
         # Sort by return
         results_df = pd.DataFrame(results).sort_values('return', ascending=False)
@@ -266,7 +336,11 @@ class ParameterOptimizer:
             logger.info(f"      Test: {test_start.date()} → {test_end.date()}")
             
             # Optimize on this window
-            opt_params = self.grid_search_thresholds(ticker=ticker)['best_parameters']
+            opt_params = self.grid_search_thresholds(
+                ticker=ticker,
+                start_date=str(opt_start.date()),
+                end_date=str(opt_end.date())
+            )['best_parameters']
             
             # Test on out-of-sample
             test_metrics = self._evaluate_parameters(
@@ -368,75 +442,85 @@ class ParameterOptimizer:
         end_date: Optional[str] = None
     ) -> Dict:
         """
-        Evaluate strategy with given parameters using real backtest.
-        
-        ==================== PHASE 3: REAL BACKTEST INTEGRATION ====================
-        
-        This connects to AgentBacktester to run actual backtests with optimized parameters.
+        Evaluate strategy with given parameters.
         
         Args:
             ticker: Stock ticker
-            buy_threshold: Buy RSI threshold
-            sell_threshold: Sell RSI threshold
+            buy_threshold: Buy score threshold
+            sell_threshold: Sell score threshold
             start_date: Optional override start date
             end_date: Optional override end date
         
         Returns:
             Dictionary with performance metrics
         """
+        return self._evaluate_parameter_grid(
+            ticker=ticker,
+            param_sets=[{'buy_threshold': buy_threshold, 'sell_threshold': sell_threshold}],
+            start_date=start_date,
+            end_date=end_date
+        )[0]
+    
+    def _evaluate_parameter_grid(
+        self,
+        ticker: str,
+        param_sets: List[Dict],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Evaluate many parameter sets at once with the short-term scoring kernel.
+        
+        Feature vectors (RSI, MACD, Stochastic, volatility, category) are
+        computed once from the local daily bars; scoring.score_batch then
+        scores every date x parameter set in one NumPy call and the signals
+        are simulated as a long-only strategy (enter on BUY, exit on SELL).
+        
+        Returns:
+            One metrics dict per parameter set (same order)
+        """
+        empty = {'return': 0.0, 'sharpe': 0.0, 'win_rate': 0.0, 'max_drawdown': 0.0, 'trades': 0}
         try:
-            from agent_backtester import AgentBacktester
+            from src.spectral_galileo.analysis import scoring
             
-            # Use provided dates or defaults
-            if not start_date:
-                start_date = '2024-06-26'
-            if not end_date:
-                end_date = '2025-12-23'
+            close, features = self._load_features(
+                ticker, start_date or DEFAULT_START_DATE, end_date or DEFAULT_END_DATE)
+            if len(close) < 2:
+                logger.warning(f"No local data for {ticker}")
+                return [dict(empty) for _ in param_sets]
             
-            # Create backtester with current parameters
-            bt = AgentBacktester(
-                tickers=[ticker],
-                start_date=start_date,
+            signals = scoring.score_batch(features, param_sets)['signal']
+            return simulate_long_only(close, signals)
+        
+        except Exception as e:
+            logger.warning(f"Error evaluating parameters for {ticker}: {e}")
+            return [dict(empty) for _ in param_sets]
+    
+    def _load_features(self, ticker: str, start_date: str, end_date: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Closes and feature vectors of the window (cached per sweep)"""
+        key = (ticker, start_date, end_date)
+        if key not in self._features_cache:
+            from backtest_data_manager import BacktestDataManager
+            from src.spectral_galileo.analysis import indicators
+            from src.spectral_galileo.analysis import scoring
+            
+            warmup_start = pd.to_datetime(start_date) - timedelta(days=FEATURE_WARMUP_DAYS)
+            data = BacktestDataManager(data_dir=self.data_dir).get_historical_range(
+                ticker,
+                start_date=warmup_start.strftime('%Y-%m-%d'),
                 end_date=end_date,
-                initial_cash=100000.0,
-                analysis_type='short_term'
+                auto_download=False
             )
-            
-            # Run backtest
-            results = bt.run_backtest()
-            
-            # Extract metrics
-            if results and 'portfolio' in results:
-                portfolio = results['portfolio']
-                metrics = results.get('metrics', {})
-                
-                return {
-                    'return': metrics.get('total_return', 0),
-                    'sharpe': metrics.get('sharpe_ratio', 1.0),
-                    'win_rate': portfolio.get('win_rate', 0.5),
-                    'max_drawdown': portfolio.get('max_drawdown', 0.1),
-                    'trades': portfolio.get('total_trades', 0)
-                }
+            if data is None or data.empty:
+                self._features_cache[key] = (np.empty(0), np.empty((0, len(scoring.FEATURES))))
             else:
-                # Fallback if backtest fails
-                return {
-                    'return': 0.0,
-                    'sharpe': 0.0,
-                    'win_rate': 0.0,
-                    'max_drawdown': 0.0,
-                    'trades': 0
-                }
-                
-        except Exception as e:
-            logger.warning(f"Error running backtest for {ticker}: {e}")
-            # Return default metrics if backtest fails
-            return {
-                'return': 0.0,
-                'sharpe': 0.0,
-                'win_rate': 0.0,
-                'max_drawdown': 0.0,
-                'trades': 0
-            }
+                data.columns = data.columns.str.title()
+                data = indicators.with_indicators(data, columns=['RSI', 'MACD', 'MACD_Signal', 'Stoch_K'])
+                features = scoring.features_from_frame(data, ticker)
+                in_window = data.index >= pd.to_datetime(start_date)
+                self._features_cache[key] = (data['Close'].to_numpy(dtype=float)[in_window],
+                                             features[in_window])
+        return self._features_cache[key]
 
     
     def save_optimization_results(
@@ -3,6 +3,7 @@ import sys
 from src.spectral_galileo.core import portfolio_manager
 from src.spectral_galileo.core import watchlist_manager
 from src.spectral_galileo.data import market_data
+from src.spectral_galileo.external import reddit_sentiment
 from src.spectral_galileo.core.agent import FinancialAgent
 from src.spectral_galileo.core.data_manager import DataManager
 from src.spectral_galileo.core.accumulation_helper import (
@@ -62,11 +63,17 @@ def run_portfolio_scanner(is_short_term=False, generate_html=False):
     
     dm = DataManager()
     macro_data = dm.get_macro_data()
+    market_regime = dm.get_market_regime()
+    account_value = portfolio_manager.get_account_value()  # Una lectura por escaneo
+    dm.prefetch(unique_tickers)
+    reddit_sentiment.use_mention_index(unique_tickers)  # Reddit: un índice para todo el escaneo
     
     def analyze_ticker(t):
         try:
             data = dm.get_ticker_data(t)
             data['macro_data'] = macro_data
+            data['market_regime'] = market_regime
+            data['account_value'] = account_value
             agent = FinancialAgent(t, is_short_term=is_short_term)
             return t, agent.run_analysis(pre_data=data)
         except Exception as e:
@@ -75,7 +82,7 @@ def run_portfolio_scanner(is_short_term=False, generate_html=False):
 
     print(f"Analizando {len(unique_tickers)} acciones únicas en paralelo...")
     analysis_cache = {}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
         results = list(tqdm(executor.map(analyze_ticker, unique_tickers), total=len(unique_tickers), desc="Holdings"))
         for t, res in results:
             if res and "error" not in res:
@@ -152,20 +159,21 @@ def run_watchlist_scanner(is_short_term=False, generate_html=False):
     
     dm = DataManager()
     macro_data = dm.get_macro_data()
+    market_regime = dm.get_market_regime()
+    account_value = portfolio_manager.get_account_value()  # Una lectura por escaneo
+    dm.prefetch(tickers)
+    reddit_sentiment.use_mention_index(tickers)  # Reddit: un índice para todo el escaneo
     
     def analyze_ticker_both(t):
         """Análisis de corto Y largo plazo para cada ticker"""
         try:
             data = dm.get_ticker_data(t)
             data['macro_data'] = macro_data
+            data['market_regime'] = market_regime
+            data['account_value'] = account_value
             
-            # CORTO PLAZO
-            agent_short = FinancialAgent(t, is_short_term=True)
-            short_result = agent_short.run_analysis(pre_data=data.copy())
-            
-            # LARGO PLAZO
-            agent_long = FinancialAgent(t, is_short_term=False)
-            long_result = agent_long.run_analysis(pre_data=data.copy())
+            # CORTO Y LARGO PLAZO (etapas comunes una sola vez)
+            short_result, long_result = FinancialAgent.run_dual_analysis(t, pre_data=data)
             
             return {
                 'ticker': t,
@@ -177,7 +185,7 @@ def run_watchlist_scanner(is_short_term=False, generate_html=False):
             return {'ticker': t, 'error': str(e)}
 
     print(f"Analizando {len(tickers)} acciones en AMBOS plazos (corto + largo)...")
-    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
         results = list(tqdm(executor.map(analyze_ticker_both, tickers), total=len(tickers), desc="Watchlist"))
 
     # Tabla 1: Resultados de Corto Plazo
@@ -386,18 +394,24 @@ def run_scanner(is_short_term=False, generate_html=False):
     
     dm = DataManager()
     macro_data = dm.get_macro_data()
+    market_regime = dm.get_market_regime()
+    account_value = portfolio_manager.get_account_value()  # Una lectura por escaneo
+    dm.prefetch(tickers)
+    reddit_sentiment.use_mention_index(tickers)  # Reddit: un índice para todo el escaneo
     
     def analyze_ticker(t):
         try:
             data = dm.get_ticker_data(t)
             data['macro_data'] = macro_data
+            data['market_regime'] = market_regime
+            data['account_value'] = account_value
             agent = FinancialAgent(t, is_short_term=is_short_term)
             return agent.run_analysis(pre_data=data)
         except Exception as e:
             # print(f"Error analizando {t}: {e}") # Debug
             return None
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=12) as executor:
         results = list(tqdm(executor.map(analyze_ticker, tickers), total=len(tickers), desc="Escaneando"))
 
     table_data = []
@@ -434,6 +448,22 @@ def run_scanner(is_short_term=False, generate_html=False):
         except Exception as e:
             print(f"{Fore.YELLOW}⚠️ Error generando HTMLs: {str(e)}{Style.RESET_ALL}\n")
 
+def run_cache_warmup():
+    """
+    Pre-carga en la caché compartida los datos diarios (earnings e insiders)
+    de la watchlist y el portafolio, p.ej. antes de la apertura.
+    """
+    tickers = set(watchlist_manager.get_watchlist_tickers())
+    tickers.update(item['symbol'] for item in portfolio_manager.load_portfolio())
+    if not tickers:
+        print(f"{Fore.YELLOW}Watchlist y portafolio vacíos: nada que pre-cargar.{Style.RESET_ALL}")
+        return
+    
+    print(f"\n{Fore.CYAN}Pre-cargando earnings e insiders de {len(tickers)} tickers...{Style.RESET_ALL}")
+    summary = DataManager().warm_external(sorted(tickers))
+    print(f"{Fore.GREEN}✅ Earnings: {summary['earnings']}/{summary['tickers']} | "
+          f"Insiders: {summary['insider']}/{summary['tickers']}{Style.RESET_ALL}")
+
 def handle_alerts_command(command: str, dry_run: bool = False):
     """
     Maneja comandos del sistema de alertas.
@@ -854,6 +884,8 @@ SISTEMA DE EXCELENCIA 2.0:
                         help='Control del sistema de alertas')
     parser.add_argument('--dry-run', action='store_true',
                         help='Modo dry-run (para testing de alertas)')
+    parser.add_argument('--warm-cache', action='store_true',
+                        help='Pre-cargar earnings e insiders de watchlist y portafolio (caché diaria)')
     
     args = parser.parse_args()
     
@@ -862,6 +894,10 @@ SISTEMA DE EXCELENCIA 2.0:
         handle_alerts_command(args.alerts, args.dry_run)
         return
     
+    if args.warm_cache:
+        run_cache_warmup()
+        return
+    
     # Procesar comandos
     if args.add:
         ticker = args.add[0]
@@ -1011,6 +1047,7 @@ SISTEMA DE EXCELENCIA 2.0:
             # Obtener datos y macro en paralelo a través del DataManager
             data = dm.get_ticker_data(args.ticker)
             data['macro_data'] = dm.get_macro_data()
+            data['market_regime'] = dm.get_market_regime()
             
             # CORTO PLAZO
             agent_short = FinancialAgent(args.ticker, is_short_term=True, is_etf=args.etf)
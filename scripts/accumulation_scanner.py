@@ -182,13 +182,10 @@ def scan_accumulation_opportunities(tickers):
         print(f"{Fore.YELLOW}⏳ Analizando {ticker}...{Style.RESET_ALL}", end=" ", flush=True)
         
         try:
-            # Análisis CORTO plazo (oportunidad operativa)
-            agent_short = FinancialAgent(ticker, is_short_term=True, skip_external_data=True)
-            short_analysis = agent_short.run_analysis()
-            
-            # Análisis LARGO plazo (valor fundamental)
-            agent_long = FinancialAgent(ticker, is_short_term=False, skip_external_data=True)
-            long_analysis = agent_long.run_analysis()
+            # Análisis CORTO plazo (oportunidad operativa) y LARGO plazo (valor
+            # fundamental) compartiendo datos, indicadores y contexto
+            short_analysis, long_analysis = FinancialAgent.run_dual_analysis(
+                ticker, skip_external_data=True)
             
             # Calcular métricas
             combined_conf, short_conf, long_conf = calculate_combined_confidence(short_analysis, long_analysis)
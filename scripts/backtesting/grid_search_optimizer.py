@@ -4,14 +4,15 @@ Finds optimal parameters through systematic search
 """
 
 from src.spectral_galileo.core import agent
+from src.spectral_galileo.analysis import scoring
+import numpy as np
 import pandas as pd
 import json
 import time
 from itertools import product
 import random
 from typing import Dict, List, Any
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
 
 # Parameter grid
@@ -76,64 +77,131 @@ def apply_config_to_agent(trading_agent, config):
     return original
 
 
-def evaluate_config(config: Dict, tickers: List[str], verbose=False) -> Dict[str, Any]:
+def analyze_ticker(ticker: str) -> Dict[str, Any]:
     """
-    Evaluate a single configuration
-    
-    Args:
-        config: Parameter configuration
-        tickers: List of tickers to test
-        verbose: Print progress
-        
-    Returns:
-        Evaluation results dict
+    Run the long-term agent once for a ticker and keep what the verdict
+    depends on (confidence, probability of success, category threshold).
     """
-    results = []
-    errors = 0
+    # Skip external data (Reddit/Earnings) to avoid API blocking
+    # lean: peers and position sizing are never read here
+    trading_agent = agent.FinancialAgent(ticker, is_short_term=False, skip_external_data=True,
+                                         lean=True)
+    analysis = trading_agent.run_analysis()
+    time.sleep(0.5)  # Rate limiting
     
-    if verbose:
-        print(f"\n  Testing: {config}")
+    if not analysis or 'strategy' not in analysis:
+        raise ValueError(analysis.get('error', 'no strategy') if analysis else 'empty analysis')
     
-    for i, ticker in enumerate(tickers):
+    strategy = analysis['strategy']
+    return {
+        'ticker': ticker,
+        'confidence': strategy.get('confidence', 0),
+        'probability_success': strategy.get('probability_success'),
+        'buy_threshold': strategy.get('buy_threshold'),
+        'regime': analysis.get('regime', 'N/A')
+    }
+
+
+def analyze_tickers(tickers: List[str], verbose=False, n_workers=1):
+    """
+    Analyze every ticker once (the expensive part: data, indicators, scoring).
+    
+    Returns:
+        (analyses, errors): list of analyze_ticker dicts and number of failures
+    """
+    def safe_analyze(item):
+        i, ticker = item
         if verbose and i % 10 == 0:
             print(f"    [{i}/{len(tickers)}] {ticker}...")
-        
         try:
-            # Skip external data (Reddit/Earnings) to avoid API blocking
-            trading_agent = agent.FinancialAgent(ticker, is_short_term=False, skip_external_data=True)
-            
-            # Apply config (simplified - just run normal analysis for now)
-            analysis = trading_agent.run_analysis()
-            
-            if analysis and 'strategy' in analysis:
-                strategy = analysis['strategy']
-                verdict = strategy.get('verdict', 'N/A')
-                confidence = strategy.get('confidence', 0)
-                
-                results.append({
-                    'ticker': ticker,
-                    'verdict': verdict,
-                    'confidence': confidence,
-                    'regime': analysis.get('regime', 'N/A')
-                })
-            
-            time.sleep(0.5)  # Rate limiting
-            
+            return analyze_ticker(ticker)
         except Exception as e:
             if verbose:
                 print(f"    ERROR on {ticker}: {str(e)[:50]}")
-            errors += 1
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max(1, n_workers)) as executor:
+        outcomes = list(executor.map(safe_analyze, enumerate(tickers)))
+    
+    analyses = [a for a in outcomes if a is not None]
+    return analyses, len(outcomes) - len(analyses)
+
+
+def evaluate_configs(configs: List[Dict], analyses: List[Dict], errors: int = 0) -> List[Dict[str, Any]]:
+    """
+    Evaluate many configurations at once on precomputed analyses.
     
-    # Calculate metrics
-    compra_count = sum(1 for r in results if 'COMPRA' in r['verdict'])
-    neutral_count = sum(1 for r in results if 'NEUTRAL' in r['verdict'])
+    Verdicts for all tickers x configs come from one call to
+    scoring.long_term_verdict_codes; no configuration re-runs the agent.
+    Only 'buy_threshold' changes the long-term verdict: the other grid keys
+    are not parameters of the agent.
     
-    compra_confidences = [r['confidence'] for r in results if 'COMPRA' in r['verdict']]
-    avg_compra_conf = sum(compra_confidences) / len(compra_confidences) if compra_confidences else 0
+    Returns:
+        One evaluation results dict per config (same order)
+    """
+    n = len(analyses)
+    confidence = np.array([a['confidence'] for a in analyses], dtype=float)
+    probability = np.array([np.nan if a['probability_success'] is None else a['probability_success']
+                            for a in analyses], dtype=float)
+    default_buy = np.array([np.nan if a['buy_threshold'] is None else a['buy_threshold']
+                            for a in analyses], dtype=float)
+    
+    # (N, M) thresholds: the config's buy_threshold or the ticker's category threshold
+    config_buy = np.array([c.get('buy_threshold', np.nan) for c in configs], dtype=float)
+    buy = np.where(np.isnan(config_buy)[None, :], default_buy[:, None], config_buy[None, :])
+    codes = scoring.long_term_verdict_codes(confidence[:, None], probability[:, None], buy)
+    
+    compra = codes >= 3
+    neutral = codes == 2
+    compra_count = compra.sum(axis=0)
+    compra_conf_sum = (compra * confidence[:, None]).sum(axis=0)
+    avg_compra_conf = np.divide(compra_conf_sum, compra_count,
+                                out=np.zeros(len(configs)), where=compra_count > 0)
+    avg_conf = confidence.mean() if n else 0
+    
+    evaluations = []
+    for j, config in enumerate(configs):
+        results = [{
+            'ticker': a['ticker'],
+            'verdict': scoring.LONG_TERM_VERDICTS[codes[i, j]],
+            'confidence': a['confidence'],
+            'regime': a['regime']
+        } for i, a in enumerate(analyses)]
+        evaluations.append(_score_evaluation(
+            config, results, errors,
+            compra_count=int(compra_count[j]),
+            neutral_count=int(neutral[:, j].sum()),
+            avg_compra_conf=float(avg_compra_conf[j]),
+            avg_conf=float(avg_conf)
+        ))
+    return evaluations
+
+
+def evaluate_config(config: Dict, tickers: List[str], verbose=False, analyses=None) -> Dict[str, Any]:
+    """
+    Evaluate a single configuration
     
-    all_confidences = [r['confidence'] for r in results]
-    avg_conf = sum(all_confidences) / len(all_confidences) if all_confidences else 0
+    Args:
+        config: Parameter configuration
+        tickers: List of tickers to test
+        verbose: Print progress
+        analyses: Precomputed analyze_tickers output (skips running the agent)
+        
+    Returns:
+        Evaluation results dict
+    """
+    if verbose:
+        print(f"\n  Testing: {config}")
     
+    errors = 0
+    if analyses is None:
+        analyses, errors = analyze_tickers(tickers, verbose=verbose)
+    return evaluate_configs([config], analyses, errors)[0]
+
+
+def _score_evaluation(config, results, errors, compra_count, neutral_count,
+                      avg_compra_conf, avg_conf) -> Dict[str, Any]:
+    """Coverage/selectivity score of a configuration"""
     # Coverage (% of tickers getting COMPRA)
     coverage = compra_count / len(results) if results else 0
     
@@ -175,7 +243,8 @@ def evaluate_config(config: Dict, tickers: List[str], verbose=False) -> Dict[str
 def grid_search(param_grid=None, tickers=None, method='random', n_samples=50, 
                 verbose=True, n_workers=None):
     """
-    Run grid search optimization with parallel processing
+    Run grid search optimization: each ticker is analyzed once and every
+    configuration is re-scored on those analyses (scoring kernel)
     
     Args:
         param_grid: Parameter grid to search (uses default if None)
@@ -183,7 +252,7 @@ def grid_search(param_grid=None, tickers=None, method='random', n_samples=50,
         method: 'grid' or 'random'
         n_samples: Number of samples for random search
         verbose: Print progress
-        n_workers: Number of parallel workers (None = auto-detect)
+        n_workers: Parallel workers for the per-ticker analyses (None = auto-detect)
         
     Returns:
         List of results sorted by score
@@ -203,11 +272,11 @@ def grid_search(param_grid=None, tickers=None, method='random', n_samples=50,
     
     if verbose:
         print('='*70)
-        print('🔍 GRID SEARCH OPTIMIZATION (PARALLEL)')
+        print('🔍 GRID SEARCH OPTIMIZATION (VECTORISED)')
         print('='*70)
         print(f'\nMethod: {method.upper()}')
         print(f'Tickers: {len(tickers)}')
-        print(f'Workers: {n_workers} parallel processes')
+        print(f'Workers: {n_workers} parallel analyses')
         if method == 'random':
             print(f'Samples: {n_samples}')
         else:
@@ -221,63 +290,15 @@ def grid_search(param_grid=None, tickers=None, method='random', n_samples=50,
             print(f'  {key}: {values}')
         print('\n' + '='*70)
     
-    all_results = []
     configs = list(generate_configs(param_grid, method, n_samples))
     
-    print(f'\n🚀 Starting evaluation of {len(configs)} configurations...')
-    print(f'⚡ Using {n_workers} parallel workers\n')
-    
+    print(f'\n🚀 Analyzing {len(tickers)} tickers once ({n_workers} workers)...')
     start_time = time.time()
+    analyses, errors = analyze_tickers(tickers, verbose=verbose, n_workers=n_workers)
     
-    if n_workers > 1:
-        # Parallel processing
-        with ProcessPoolExecutor(max_workers=n_workers) as executor:
-            # Submit all tasks
-            future_to_config = {
-                executor.submit(evaluate_config, config, tickers, False): (i, config)
-                for i, config in enumerate(configs, 1)
-            }
-            
-            # Process results as they complete
-            for future in as_completed(future_to_config):
-                i, config = future_to_config[future]
-                try:
-                    result = future.result()
-                    all_results.append(result)
-                    
-                    if verbose:
-                        elapsed = time.time() - start_time
-                        remaining = len(configs) - len(all_results)
-                        eta = (elapsed / len(all_results)) * remaining if all_results else 0
-                        
-                        print(f'[{len(all_results)}/{len(configs)}] Score: {result["score"]:.3f} | '
-                              f'COMPRA: {result["compra_count"]}/{result["total"]} ({result["coverage"]*100:.0f}%) | '
-                              f'Conf: {result["avg_compra_conf"]:.1f}% | '
-                              f'ETA: {eta/60:.0f}m')
-                
-                except Exception as e:
-                    if verbose:
-                        print(f'[{i}/{len(configs)}] ❌ ERROR: {str(e)[:50]}')
-    else:
-        # Sequential processing (fallback)
-        for i, config in enumerate(configs, 1):
-            if verbose:
-                print(f'\n[{i}/{len(configs)}] Evaluating configuration...')
-            
-            try:
-                result = evaluate_config(config, tickers, verbose=False)
-                all_results.append(result)
-                
-                if verbose:
-                    elapsed = time.time() - start_time
-                    print(f'  Score: {result["score"]:.3f}')
-                    print(f'  COMPRA: {result["compra_count"]}/{result["total"]} ({result["coverage"]*100:.0f}%)')
-                    print(f'  Avg COMPRA Confidence: {result["avg_compra_conf"]:.1f}%')
-                    print(f'  Time: {elapsed:.1f}s')
-            
-            except Exception as e:
-                if verbose:
-                    print(f'  ❌ ERROR: {str(e)}')
+    # All configurations re-scored in one vectorised pass over the analyses
+    print(f'⚡ Scoring {len(configs)} configurations...\n')
+    all_results = evaluate_configs(configs, analyses, errors)
     
     total_time = time.time() - start_time
     
@@ -16,6 +16,7 @@ from src.spectral_galileo.core import watchlist_manager
 
 # Analysis modules
 from src.spectral_galileo.analysis import indicators
+from src.spectral_galileo.analysis import indicator_engine
 from src.spectral_galileo.analysis import timeframe_analysis
 from src.spectral_galileo.analysis import macro_analysis
 from src.spectral_galileo.analysis import regime_detection
@@ -41,6 +42,7 @@ __all__ = [
     'watchlist_manager',
     # Analysis
     'indicators',
+    'indicator_engine',
     'timeframe_analysis',
     'macro_analysis',
     'regime_detection',
@@ -0,0 +1,330 @@
+"""
+Motor incremental de indicadores técnicos.
+
+IndicatorEngine mantiene el estado de cada indicador (sumas móviles, estado
+EWM, deques de mínimos/máximos) y lo actualiza en O(1) por cada vela nueva,
+en lugar de recalcular toda la historia con indicators.add_all_indicators.
+El snapshot de cada vela coincide con la fila correspondiente de
+add_all_indicators (mismas columnas y mismas reglas de NaN).
+"""
+
+import math
+from collections import deque
+
+import pandas as pd
+
+NAN = float("nan")
+INF = float("inf")
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Columnas en el mismo orden que agrega add_all_indicators
+INDICATOR_COLUMNS = [
+    "SMA_50", "SMA_200", "RSI", "MACD", "MACD_Signal", "MACD_Hist",
+    "BB_Upper", "BB_Lower", "ATR", "Stoch_K", "Stoch_D", "OBV",
+    "MFI", "HistVol", "ADX", "SMA_Slope",
+]
+
+def _is_nan(x):
+    return x != x
+
+
+def _div(a, b):
+    """División con semántica IEEE (como pandas): x/0 -> ±inf, 0/0 -> NaN."""
+    if _is_nan(a) or _is_nan(b):
+        return NAN
+    if b == 0:
+        if a == 0:
+            return NAN
+        return math.copysign(INF, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class RollingWindow:
+    """
+    Ventana móvil de tamaño fijo con media y desviación estándar en O(1).
+
+    Replica rolling(window).mean()/.std()/.sum() de pandas: el resultado es
+    NaN hasta que la ventana está llena o si contiene algún NaN. Las sumas se
+    recalculan desde el buffer cada `size` inserciones para no acumular error.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()
+        self.nan_count = 0
+        self.nonzero_count = 0
+        self._pushes = 0
+        self._recompute()
+
+    def _recompute(self):
+        valid = [v for v in self.values if not _is_nan(v)]
+        self.shift = math.fsum(valid) / len(valid) if valid else 0.0
+        self.sum = math.fsum(v - self.shift for v in valid)
+        self.sumsq = math.fsum((v - self.shift) ** 2 for v in valid)
+
+    def push(self, value):
+        self.values.append(value)
+        self._add(value, 1)
+        if len(self.values) > self.size:
+            self._add(self.values.popleft(), -1)
+
+        self._pushes += 1
+        if self._pushes >= self.size:
+            self._pushes = 0
+            self._recompute()
+
+    def _add(self, value, sign):
+        if _is_nan(value):
+            self.nan_count += sign
+            return
+        if value != 0:
+            self.nonzero_count += sign
+        dev = value - self.shift
+        self.sum += sign * dev
+        self.sumsq += sign * dev * dev
+
+    @property
+    def ready(self):
+        return len(self.values) == self.size and self.nan_count == 0
+
+    def total(self):
+        if not self.ready:
+            return NAN
+        # Ventana sin valores distintos de cero: 0 exacto (pandas hace lo mismo)
+        if self.nonzero_count == 0:
+            return 0.0
+        return self.sum + self.shift * self.size
+
+    def mean(self):
+        if not self.ready:
+            return NAN
+        if self.nonzero_count == 0:
+            return 0.0
+        return self.shift + self.sum / self.size
+
+    def std(self):
+        """Desviación estándar muestral (ddof=1)."""
+        if not self.ready or self.size < 2:
+            return NAN
+        var = (self.sumsq - self.sum * self.sum / self.size) / (self.size - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class RollingExtreme:
+    """Mínimo o máximo de una ventana móvil con deque monótona (O(1) amortizado)."""
+
+    def __init__(self, size, mode="min"):
+        self.size = size
+        self.mode = mode
+        self.items = deque()   # (posición, valor) monótono
+        self.position = 0
+
+    def push(self, value):
+        better = (lambda a, b: a <= b) if self.mode == "min" else (lambda a, b: a >= b)
+        while self.items and better(value, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((self.position, value))
+        self.position += 1
+        while self.items[0][0] <= self.position - 1 - self.size:
+            self.items.popleft()
+
+    def value(self):
+        if self.position < self.size:
+            return NAN
+        return self.items[0][1]
+
+
+class Ewm:
+    """Media exponencial ewm(span, adjust=False): el primer valor inicializa."""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def push(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+
+class IndicatorEngine:
+    """
+    Estado incremental de todos los indicadores de add_all_indicators.
+
+    Uso:
+        engine = IndicatorEngine.from_history(df)   # calentamiento
+        engine.append(nuevas_velas)                 # O(1) por vela
+        engine.snapshot()                           # última fila
+    """
+
+    def __init__(self):
+        self.bars = 0
+        self.last_timestamp = None
+        self._prev = None          # (high, low, close, typical_price)
+        self._last = {}
+
+        self._sma50 = RollingWindow(50)
+        self._sma200 = RollingWindow(200)
+        self._gain = RollingWindow(14)
+        self._loss = RollingWindow(14)
+        self._ema_fast = Ewm(12)
+        self._ema_slow = Ewm(26)
+        self._ema_signal = Ewm(9)
+        self._close20 = RollingWindow(20)      # Bollinger y SMA_Slope
+        self._tr = RollingWindow(14)           # ATR y ADX
+        self._low_min = RollingExtreme(14, "min")
+        self._high_max = RollingExtreme(14, "max")
+        self._stoch_k = RollingWindow(3)
+        self._obv = 0
+        self._pos_flow = RollingWindow(14)
+        self._neg_flow = RollingWindow(14)
+        self._returns = RollingWindow(20)
+        self._plus_dm = RollingWindow(14)
+        self._minus_dm = RollingWindow(14)
+        self._dx = RollingWindow(14)
+        self._sma20_history = deque(maxlen=6)
+
+    @classmethod
+    def from_history(cls, df):
+        """Crea un motor y lo calienta con toda la historia de `df`."""
+        engine = cls()
+        engine.append(df)
+        return engine
+
+    # ---------- Actualización ----------
+
+    def update(self, open_, high, low, close, volume, timestamp=None):
+        """
+        Procesa una vela nueva y devuelve el snapshot (dict) de esa vela.
+        """
+        high, low, close = float(high), float(low), float(close)
+        volume = float(volume)
+        prev = self._prev
+
+        # Medias simples
+        self._sma50.push(close)
+        self._sma200.push(close)
+
+        # RSI (medias simples de ganancias/pérdidas; la primera vela aporta 0)
+        delta = close - prev[2] if prev else NAN
+        self._gain.push(delta if delta > 0 else 0.0)
+        self._loss.push(-delta if delta < 0 else 0.0)
+        rsi = 100 - _div(100, 1 + _div(self._gain.mean(), self._loss.mean()))
+
+        # MACD
+        macd = self._ema_fast.push(close) - self._ema_slow.push(close)
+        signal = self._ema_signal.push(macd)
+
+        # Bollinger
+        self._close20.push(close)
+        sma20 = self._close20.mean()
+        std20 = self._close20.std()
+
+        # True Range compartido por ATR y ADX
+        if prev:
+            ranges = [high - low, abs(high - prev[2]), abs(low - prev[2])]
+        else:
+            ranges = [high - low]
+        ranges = [r for r in ranges if not _is_nan(r)]
+        tr = max(ranges) if ranges else NAN
+        self._tr.push(tr)
+        atr = self._tr.mean()
+
+        # Estocástico
+        self._low_min.push(low)
+        self._high_max.push(high)
+        low_min, high_max = self._low_min.value(), self._high_max.value()
+        stoch_k = 100 * _div(close - low_min, high_max - low_min)
+        self._stoch_k.push(stoch_k)
+
+        # OBV
+        if prev:
+            if close > prev[2]:
+                self._obv += volume
+            elif close < prev[2]:
+                self._obv -= volume
+
+        # MFI
+        typical_price = (high + low + close) / 3
+        money_flow = typical_price * volume
+        self._pos_flow.push(money_flow if prev and typical_price > prev[3] else 0.0)
+        self._neg_flow.push(money_flow if prev and typical_price < prev[3] else 0.0)
+        negative = self._neg_flow.total()
+        if negative == 0:
+            negative = 0.0001
+        mfi = 100 - _div(100, 1 + _div(self._pos_flow.total(), negative))
+
+        # Volatilidad histórica
+        self._returns.push(_div(close, prev[2]) - 1 if prev else NAN)
+        hist_vol = self._returns.std() * math.sqrt(252)
+
+        # ADX
+        plus_dm = high - prev[0] if prev else NAN
+        minus_dm = low - prev[1] if prev else NAN
+        self._plus_dm.push(0.0 if plus_dm < 0 else plus_dm)
+        self._minus_dm.push(0.0 if minus_dm > 0 else minus_dm)
+        plus_di = 100 * _div(self._plus_dm.mean(), atr)
+        minus_di = 100 * _div(abs(self._minus_dm.mean()), atr)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        self._dx.push(dx)
+
+        # Pendiente de la SMA(20) en 5 velas
+        self._sma20_history.append(sma20)
+        if len(self._sma20_history) == 6:
+            base = self._sma20_history[0]
+            slope = _div(sma20 - base, base) * 100
+        else:
+            slope = NAN
+
+        self._prev = (high, low, close, typical_price)
+        self.bars += 1
+        self.last_timestamp = timestamp
+
+        self._last = {
+            "Open": float(open_), "High": high, "Low": low, "Close": close, "Volume": volume,
+            "SMA_50": self._sma50.mean(),
+            "SMA_200": self._sma200.mean(),
+            "RSI": rsi,
+            "MACD": macd,
+            "MACD_Signal": signal,
+            "MACD_Hist": macd - signal,
+            "BB_Upper": sma20 + std20 * 2,
+            "BB_Lower": sma20 - std20 * 2,
+            "ATR": atr,
+            "Stoch_K": stoch_k,
+            "Stoch_D": self._stoch_k.mean(),
+            "OBV": self._obv,
+            "MFI": mfi,
+            "HistVol": hist_vol,
+            "ADX": self._dx.mean(),
+            "SMA_Slope": slope,
+        }
+        return dict(self._last)
+
+    def append(self, bars):
+        """
+        Procesa las velas de `bars` posteriores a la última procesada.
+
+        Args:
+            bars: DataFrame OHLCV indexado por fecha (puede incluir velas ya
+                  vistas; se ignoran)
+
+        Returns:
+            DataFrame con OHLCV + indicadores de las velas nuevas
+        """
+        if self.last_timestamp is not None:
+            bars = bars[bars.index > self.last_timestamp]
+
+        rows = []
+        columns = [bars[c].to_numpy() for c in OHLCV_COLUMNS]
+        for ts, o, h, l, c, v in zip(bars.index, *columns):
+            rows.append(self.update(o, h, l, c, v, timestamp=ts))
+
+        return pd.DataFrame(rows, index=bars.index, columns=OHLCV_COLUMNS + INDICATOR_COLUMNS)
+
+    def snapshot(self):
+        """Última fila de indicadores (equivale a add_all_indicators(df).iloc[-1])."""
+        return pd.Series(self._last, name=self.last_timestamp, dtype=float)
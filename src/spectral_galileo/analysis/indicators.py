@@ -2,6 +2,14 @@
 import pandas as pd
 import numpy as np
 
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def _like(template, values):
+    """Envuelve `values` con el índice (y columnas, si es panel) de `template`."""
+    if isinstance(template, pd.DataFrame):
+        return pd.DataFrame(values, index=template.index, columns=template.columns)
+    return pd.Series(values, index=template.index)
+
 def calculate_sma(data, window):
     return data['Close'].rolling(window=window).mean()
 
@@ -22,22 +30,52 @@ def calculate_macd(data, slow=26, fast=12, signal=9):
     histogram = macd_line - signal_line
     return macd_line, signal_line, histogram
 
-def calculate_bollinger_bands(data, window=20, num_std=2):
-    sma = data['Close'].rolling(window=window).mean()
+def calculate_bollinger_bands(data, window=20, num_std=2, sma=None):
+    if sma is None:
+        sma = data['Close'].rolling(window=window).mean()
     std = data['Close'].rolling(window=window).std()
     upper_band = sma + (std * num_std)
     lower_band = sma - (std * num_std)
     return upper_band, lower_band
 
-def calculate_atr(data, window=14):
+def calculate_true_range(data):
+    """
+    True Range de cada vela (compartido por ATR y ADX).
+    """
     high_low = data['High'] - data['Low']
     high_close = np.abs(data['High'] - data['Close'].shift())
     low_close = np.abs(data['Low'] - data['Close'].shift())
     
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = np.max(ranges, axis=1)
-    
-    return true_range.rolling(window=window).mean()
+    # Máximo ignorando NaN (la primera vela no tiene cierre previo)
+    return np.fmax(np.fmax(high_low, high_close), low_close)
+
+def calculate_atr(data, window=14):
+    return calculate_true_range(data).rolling(window=window).mean()
+
+def true_range_array(high, low, close):
+    """
+    True Range sobre arrays (el tiempo en el último eje; 2D = varios tickers).
+    La primera vela, sin cierre previo, usa High - Low.
+    """
+    high, low, close = (np.asarray(x, dtype=float) for x in (high, low, close))
+    prev_close = np.concatenate([np.full(close.shape[:-1] + (1,), np.nan), close[..., :-1]], axis=-1)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+def atr_last(high, low, close, periods=14):
+    """
+    ATR de la última vela: media de los últimos `periods` True Range.
+    Con arrays 2D devuelve un ATR por fila (ticker).
+    """
+    return true_range_array(high, low, close)[..., -periods:].mean(axis=-1)
+
+def annualized_volatility(close, periods=20):
+    """
+    Volatilidad anualizada de los últimos `periods` retornos diarios
+    (desviación estándar poblacional * sqrt(252)). Con 2D, una por fila.
+    """
+    close = np.asarray(close, dtype=float)[..., -(periods + 1):]
+    returns = np.diff(close, axis=-1) / close[..., :-1]
+    return returns.std(axis=-1) * np.sqrt(252)
 
 def calculate_stochastic(data, window=14, smooth_window=3):
     """
@@ -52,15 +90,21 @@ def calculate_stochastic(data, window=14, smooth_window=3):
     return k_percent, d_percent
 
 def calculate_obv(df):
-    obv = [0]
-    for i in range(1, len(df)):
-        if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
-            obv.append(obv[-1] + df['Volume'].iloc[i])
-        elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
-            obv.append(obv[-1] - df['Volume'].iloc[i])
-        else:
-            obv.append(obv[-1])
-    return pd.Series(obv, index=df.index)
+    """
+    On-Balance Volume: suma acumulada del volumen con el signo del cambio de cierre.
+    """
+    close = df['Close']
+    values = close.to_numpy(dtype=float)
+    volume = df['Volume'].to_numpy()
+    
+    direction = np.zeros(values.shape, dtype=np.int8)
+    if len(values) > 1:
+        change = np.diff(values, axis=0)
+        direction[1:] = np.where(change > 0, 1, np.where(change < 0, -1, 0))
+    
+    # Velas sin cambio no aportan (aunque su volumen sea NaN)
+    flow = np.where(direction != 0, direction * volume, 0)
+    return _like(close, np.cumsum(flow, axis=0))
 
 def calculate_mfi(df, window=14):
     """
@@ -71,29 +115,17 @@ def calculate_mfi(df, window=14):
     MFI < 20: Sobrevendido
     """
     typical_price = (df['High'] + df['Low'] + df['Close']) / 3
-    money_flow = typical_price * df['Volume']
-    
-    # Crear listas para flujo positivo y negativo
-    positive_flow = []
-    negative_flow = []
-    
-    # Primera entrada es 0
-    positive_flow.append(0)
-    negative_flow.append(0)
-    
-    for i in range(1, len(df)):
-        if typical_price.iloc[i] > typical_price.iloc[i-1]:
-            positive_flow.append(money_flow.iloc[i])
-            negative_flow.append(0)
-        elif typical_price.iloc[i] < typical_price.iloc[i-1]:
-            positive_flow.append(0)
-            negative_flow.append(money_flow.iloc[i])
-        else:
-            positive_flow.append(0)
-            negative_flow.append(0)
-    
-    positive_mf = pd.Series(positive_flow, index=df.index).rolling(window).sum()
-    negative_mf = pd.Series(negative_flow, index=df.index).rolling(window).sum()
+    money_flow = (typical_price * df['Volume']).to_numpy(dtype=float)
+    
+    # Flujo positivo/negativo según la dirección del precio típico (primera entrada 0)
+    change = np.zeros(money_flow.shape)
+    if len(money_flow) > 1:
+        change[1:] = np.diff(typical_price.to_numpy(dtype=float), axis=0)
+    positive_flow = np.where(change > 0, money_flow, 0.0)
+    negative_flow = np.where(change < 0, money_flow, 0.0)
+    
+    positive_mf = _like(typical_price, positive_flow).rolling(window).sum()
+    negative_mf = _like(typical_price, negative_flow).rolling(window).sum()
     
     # Evitar división por cero
     mfi = 100 - (100 / (1 + (positive_mf / negative_mf.replace(0, 0.0001))))
@@ -107,44 +139,52 @@ def calculate_historical_volatility(df, window=20):
     volatility = returns.rolling(window).std() * np.sqrt(252)  # Anualizada
     return volatility
 
-def calculate_adx(df, window=14):
+def calculate_adx(df, window=14, atr=None):
     """
     Average Directional Index (ADX)
     Mide la fuerza de la tendencia (0-100).
     ADX > 25: Tendencia fuerte
     ADX < 20: Sin tendencia / Lateral
+    
+    Si se pasa `atr` (media del True Range en la misma ventana) se reutiliza.
     """
     plus_dm = df['High'].diff()
     minus_dm = df['Low'].diff()
     plus_dm[plus_dm < 0] = 0
     minus_dm[minus_dm > 0] = 0
     
-    tr = calculate_atr(df, window=1) # Usamos TR de cada vela
+    if atr is None:
+        atr = calculate_atr(df, window=window)
     
-    plus_di = 100 * (plus_dm.rolling(window).mean() / tr.rolling(window).mean())
-    minus_di = 100 * (np.abs(minus_dm.rolling(window).mean()) / tr.rolling(window).mean())
+    plus_di = 100 * (plus_dm.rolling(window).mean() / atr)
+    minus_di = 100 * (np.abs(minus_dm.rolling(window).mean()) / atr)
     dx = 100 * (np.abs(plus_di - minus_di) / (plus_di + minus_di))
     adx = dx.rolling(window).mean()
     
     return adx
 
-def calculate_sma_slope(data, window=5):
+def calculate_sma_slope(data, window=5, sma=None):
     """
     Calcula la pendiente de la media móvil para detectar aplanamiento.
     Retorna el cambio porcentual de la SMA en N periodos.
+    Si se pasa `sma` (SMA 20 ya calculada) se reutiliza.
     """
-    sma = data.rolling(window=20).mean() # SMA base para el slope
+    if sma is None:
+        sma = data.rolling(window=20).mean() # SMA base para el slope
     slope = (sma - sma.shift(window)) / sma.shift(window) * 100
     return slope
 
-def detect_rsi_divergence(df, window=20):
+def detect_rsi_divergence(df, window=20, rsi=None):
     """
     Detecta divergencias simples entre precio y RSI.
     Divergencia Bajista: Precio hace máximos mayores, RSI hace máximos menores.
+    
+    rsi: Serie de RSI alineada con df (default: df['RSI'])
     """
     if len(df) < window: return False
     
     recent = df.iloc[-window:]
+    recent_rsi = (df['RSI'] if rsi is None else rsi).iloc[-window:]
     
     # Encontrar índices de máximos locales de precio
     price_peaks = []
@@ -159,30 +199,271 @@ def detect_rsi_divergence(df, window=20):
     p1, p2 = price_peaks[-2], price_peaks[-1]
     
     price_rising = recent['Close'].iloc[p2] > recent['Close'].iloc[p1]
-    rsi_falling = recent['RSI'].iloc[p2] < recent['RSI'].iloc[p1]
+    rsi_falling = recent_rsi.iloc[p2] < recent_rsi.iloc[p1]
     
     return price_rising and rsi_falling
 
+# ---------- Cálculo selectivo ----------
+
+# Intermedios compartidos: nombre -> (dependencias, función(df, ctx))
+_INTERMEDIATES = {
+    'TR': ((), lambda df, ctx: calculate_true_range(df)),
+    'SMA_20': ((), lambda df, ctx: df['Close'].rolling(window=20).mean()),
+}
+
+# Productores de columnas: (columnas, dependencias, función(df, ctx) -> tupla)
+_PRODUCERS = [
+    (('SMA_50',), (), lambda df, ctx: (calculate_sma(df, 50),)),
+    (('SMA_200',), (), lambda df, ctx: (calculate_sma(df, 200),)),
+    (('RSI',), (), lambda df, ctx: (calculate_rsi(df),)),
+    (('MACD', 'MACD_Signal', 'MACD_Hist'), (), lambda df, ctx: calculate_macd(df)),
+    (('BB_Upper', 'BB_Lower'), ('SMA_20',),
+     lambda df, ctx: calculate_bollinger_bands(df, sma=ctx['SMA_20'])),
+    (('ATR',), ('TR',), lambda df, ctx: (ctx['TR'].rolling(window=14).mean(),)),
+    (('Stoch_K', 'Stoch_D'), (), lambda df, ctx: calculate_stochastic(df)),
+    (('OBV',), (), lambda df, ctx: (calculate_obv(df),)),
+    (('MFI',), (), lambda df, ctx: (calculate_mfi(df, window=14),)),
+    (('HistVol',), (), lambda df, ctx: (calculate_historical_volatility(df, window=20),)),
+    (('ADX',), ('ATR',), lambda df, ctx: (calculate_adx(df, atr=ctx['ATR']),)),
+    (('SMA_Slope',), ('SMA_20',),
+     lambda df, ctx: (calculate_sma_slope(df['Close'], sma=ctx['SMA_20']),)),
+]
+
+_PRODUCER_BY_COLUMN = {col: spec for spec in _PRODUCERS for col in spec[0]}
+
+# Todas las columnas, en el orden en que las agrega add_all_indicators
+ALL_INDICATORS = [col for spec in _PRODUCERS for col in spec[0]]
+
+def compute_indicators(df, columns):
+    """
+    Calcula solo las columnas pedidas, resolviendo sus dependencias.
+    
+    Los intermedios compartidos (True Range de ATR/ADX, SMA 20 de Bollinger
+    y SMA_Slope) se calculan una sola vez.
+    
+    Args:
+        df: DataFrame OHLCV
+        columns: Iterable de nombres de ALL_INDICATORS
+        
+    Returns:
+        Dict {columna: Series} con las columnas pedidas
+    """
+    unknown = set(columns) - set(ALL_INDICATORS)
+    if unknown:
+        raise ValueError(f"Indicadores desconocidos: {sorted(unknown)}")
+    
+    ctx = {}
+    
+    def resolve(name):
+        if name in ctx:
+            return
+        if name in _INTERMEDIATES:
+            deps, func = _INTERMEDIATES[name]
+            for dep in deps:
+                resolve(dep)
+            ctx[name] = func(df, ctx)
+            return
+        outputs, deps, func = _PRODUCER_BY_COLUMN[name]
+        for dep in deps:
+            resolve(dep)
+        for col, series in zip(outputs, func(df, ctx)):
+            ctx[col] = series
+    
+    for col in columns:
+        resolve(col)
+    return {col: ctx[col] for col in columns}
+
+def indicator_frame(df, columns=None, out=None):
+    """
+    Indicadores en un DataFrame aparte (float64, mismo índice que df).
+    
+    No modifica ni copia df. Si se pasa `out` (array float64 de forma
+    len(df) x n_columnas, p.ej. un buffer reutilizado entre llamadas) los
+    valores se escriben ahí y el DataFrame devuelto lo envuelve sin copiar.
+    
+    Args:
+        df: DataFrame OHLCV
+        columns: Indicadores a calcular (default: todos, en el orden de ALL_INDICATORS)
+        out: Buffer opcional preasignado
+        
+    Returns:
+        DataFrame de indicadores
+    """
+    computed = compute_indicators(df, set(columns or ALL_INDICATORS))
+    ordered = [col for col in ALL_INDICATORS if col in computed]
+    
+    if out is None:
+        out = np.empty((len(df), len(ordered)))
+    elif out.shape != (len(df), len(ordered)) or out.dtype != np.float64:
+        raise ValueError(f"Buffer de indicadores inválido: {out.shape} {out.dtype}, "
+                         f"se esperaba {(len(df), len(ordered))} float64")
+    
+    for j, col in enumerate(ordered):
+        out[:, j] = computed[col].to_numpy(dtype=np.float64)
+    return pd.DataFrame(out, index=df.index, columns=ordered, copy=False)
+
+def with_indicators(df, columns=None, out=None):
+    """
+    Nuevo DataFrame con las columnas de df más los indicadores, sin modificar df.
+    
+    Los indicadores que df ya tuviera se reemplazan (no se duplican columnas).
+    Las columnas originales no se copian (copy-on-write).
+    """
+    if df.columns.duplicated().any():
+        df = df.loc[:, ~df.columns.duplicated()]
+    
+    indicators_df = indicator_frame(df, columns, out)
+    stale = [col for col in df.columns if col in indicators_df.columns]
+    if stale:
+        df = df.drop(columns=stale)
+    return pd.concat([df, indicators_df], axis=1)
+
+def add_indicators(df, columns):
+    """
+    Agrega al DataFrame (inplace) solo los indicadores pedidos.
+    Para no modificar el DataFrame de entrada usar with_indicators/indicator_frame.
+    """
+    computed = compute_indicators(df, set(columns))
+    for col in ALL_INDICATORS:
+        if col in computed:
+            df[col] = computed[col]
+    return df
+
 def add_all_indicators(df):
     """
     Agrega todos los indicadores al DataFrame inplace.
+    Para no modificar el DataFrame de entrada usar with_indicators.
     """
-    df['SMA_50'] = calculate_sma(df, 50)
-    df['SMA_200'] = calculate_sma(df, 200)
-    df['RSI'] = calculate_rsi(df)
-    df['MACD'], df['MACD_Signal'], df['MACD_Hist'] = calculate_macd(df)
-    df['BB_Upper'], df['BB_Lower'] = calculate_bollinger_bands(df)
-    df['ATR'] = calculate_atr(df)
-    stoch_k, stoch_d = calculate_stochastic(df)
-    df['Stoch_K'] = stoch_k
-    df['Stoch_D'] = stoch_d
+    return add_indicators(df, ALL_INDICATORS)
+
+# ---------- Panel (varios tickers) ----------
+
+def to_panel(data):
+    """
+    Normaliza un panel OHLCV a {campo: DataFrame fechas x tickers}.
     
-    df['OBV'] = calculate_obv(df)
+    Acepta un dict {campo: DataFrame} o un DataFrame ancho con columnas
+    MultiIndex (campo, ticker) o (ticker, campo), como devuelve yf.download.
+    """
+    if isinstance(data, dict):
+        return {field: data[field].astype(float) for field in OHLCV_COLUMNS}
     
-    # Nuevos indicadores
-    df['MFI'] = calculate_mfi(df, window=14)
-    df['HistVol'] = calculate_historical_volatility(df, window=20)
-    df['ADX'] = calculate_adx(df)
-    df['SMA_Slope'] = calculate_sma_slope(df['Close'])
+    level = 0 if 'Close' in data.columns.get_level_values(0) else 1
+    return {field: data.xs(field, axis=1, level=level).astype(float)
+            for field in OHLCV_COLUMNS}
+
+def panel_from_array(values, index, tickers):
+    """
+    Panel a partir de un array NumPy 3-D (fechas x tickers x OHLCV).
+    """
+    return {field: pd.DataFrame(values[:, :, i], index=index, columns=list(tickers))
+            for i, field in enumerate(OHLCV_COLUMNS)}
+
+def _left_align(fields):
+    """
+    Desplaza cada ticker para que su primer cierre válido quede en la fila 0.
     
-    return df
+    Así el calentamiento de cada ventana es idéntico al de calcular el ticker
+    por separado aunque los tickers empiecen a cotizar en fechas distintas.
+    
+    Returns:
+        (campos alineados, offsets por ticker)
+    """
+    close = fields['Close'].to_numpy()
+    n = close.shape[0]
+    valid = ~np.isnan(close)
+    offsets = np.where(valid.any(axis=0), valid.argmax(axis=0), n)
+    
+    rows = np.arange(n)[:, None] + offsets[None, :]
+    inside = rows < n
+    rows = np.minimum(rows, n - 1)
+    cols = np.arange(close.shape[1])[None, :]
+    
+    aligned = {}
+    for field, wide in fields.items():
+        values = wide.to_numpy()[rows, cols]
+        aligned[field] = pd.DataFrame(np.where(inside, values, np.nan),
+                                      index=wide.index, columns=wide.columns)
+    return aligned, offsets
+
+class IndicatorPanel:
+    """
+    Indicadores de varios tickers calculados en una sola pasada vectorizada.
+    
+    Internamente cada columna (OHLCV + indicadores) es un DataFrame filas x
+    tickers alineado al primer cierre válido de cada ticker. panel[ticker]
+    devuelve la vista de un ticker con el mismo formato que add_all_indicators;
+    field(nombre) devuelve la columna como DataFrame fechas x tickers.
+    """
+    
+    def __init__(self, aligned, offsets, index):
+        self._aligned = aligned
+        self._offsets = dict(zip(aligned['Close'].columns, offsets))
+        self.index = index
+        self.tickers = list(aligned['Close'].columns)
+        self.columns = list(aligned)
+    
+    def __getitem__(self, ticker):
+        offset = self._offsets[ticker]
+        rows = len(self.index) - offset
+        return pd.DataFrame({name: wide[ticker].to_numpy()[:rows]
+                             for name, wide in self._aligned.items()},
+                            index=self.index[offset:])
+    
+    def __iter__(self):
+        return iter(self.tickers)
+    
+    def __len__(self):
+        return len(self.tickers)
+    
+    def items(self):
+        for ticker in self.tickers:
+            yield ticker, self[ticker]
+    
+    def field(self, name):
+        """Columna `name` como DataFrame fechas x tickers."""
+        # Fila alineada de cada fecha: se desplaza cada ticker por su offset
+        offsets = np.array([self._offsets[t] for t in self.tickers])
+        rows = np.arange(len(self.index))[:, None] - offsets
+        values = self._aligned[name].to_numpy()[np.maximum(rows, 0), np.arange(len(self.tickers))]
+        if (offsets > 0).any():
+            values = np.where(rows >= 0, values, np.nan)
+        return pd.DataFrame(values, index=self.index, columns=self.tickers)
+    
+    def latest(self):
+        """Última fila de cada ticker (tickers x columnas)."""
+        n = len(self.index)
+        rows = np.array([n - 1 - self._offsets[t] for t in self.tickers])
+        cols = np.arange(len(self.tickers))
+        valid = rows >= 0
+        data = {}
+        for name, wide in self._aligned.items():
+            values = wide.to_numpy()[np.maximum(rows, 0), cols]
+            data[name] = np.where(valid, values, np.nan)
+        return pd.DataFrame(data, index=self.tickers)
+
+def compute_panel_indicators(data, columns=None):
+    """
+    Calcula indicadores para todos los tickers de un panel a la vez.
+    
+    Usa las mismas funciones que add_indicators (operan igual sobre Series o
+    DataFrames filas x tickers), así que cada vista coincide con calcular el
+    ticker por separado. Se asume un calendario común: los huecos intermedios
+    de un ticker (NaN) no se eliminan como al calcularlo por separado.
+    
+    Args:
+        data: Panel OHLCV (ver to_panel)
+        columns: Indicadores a calcular (default: todos)
+        
+    Returns:
+        IndicatorPanel
+    """
+    fields = to_panel(data)
+    index = fields['Close'].index
+    aligned, offsets = _left_align(fields)
+    
+    computed = compute_indicators(aligned, set(columns or ALL_INDICATORS))
+    for col in ALL_INDICATORS:
+        if col in computed:
+            aligned[col] = computed[col]
+    return IndicatorPanel(aligned, offsets, index)
@@ -3,9 +3,24 @@ Market Regime Detection Module
 Detects if market is in Bull, Bear, or Sideways regime and adjusts strategy accordingly
 """
 
+import threading
+import time
+
+import numpy as np
+
 from src.spectral_galileo.data import market_data
 from src.spectral_galileo.analysis import indicators
 
+# Indicadores que lee detect_market_regime (no hace falta calcular el resto)
+REGIME_INDICATORS = ['SMA_50', 'SMA_200', 'ADX']
+
+# The regime is shared by every ticker of a scan; recompute at most once per bucket
+REGIME_TTL_SECONDS = 15 * 60
+
+_regime_cache = {'bucket': None, 'data': None}
+_regime_lock = threading.Lock()
+
+
 def detect_market_regime():
     """
     Detect current market regime based on S&P 500 (SPY)
@@ -17,130 +32,224 @@ def detect_market_regime():
         # Get SPY data (S&P 500 proxy)
         spy = market_data.get_ticker_data('SPY')
         data = market_data.get_historical_data(spy, period='1y', interval='1d')
+    except Exception as e:
+        return unknown_regime(f'Error detecting regime: {str(e)}')
+    return regime_from_history(data)
+
+
+def get_market_regime(max_age=REGIME_TTL_SECONDS):
+    """
+    Market regime shared by all callers of the process within a time bucket
+    
+    The first call of each `max_age` bucket runs detect_market_regime(); the
+    rest reuse its result. UNKNOWN results are not cached.
+    
+    Returns:
+        dict with regime information (same format as detect_market_regime)
+    """
+    bucket = int(time.time() // max_age)
+    with _regime_lock:
+        if _regime_cache['bucket'] == bucket and _regime_cache['data'] is not None:
+            return _regime_cache['data']
+        
+        regime_data = detect_market_regime()
+        if regime_data['regime'] != 'UNKNOWN':
+            _regime_cache['bucket'] = bucket
+            _regime_cache['data'] = regime_data
+        return regime_data
+
+
+def regime_from_history(data):
+    """
+    Market regime from a daily SPY OHLCV history (the last bar is "today")
+    
+    Args:
+        data: DataFrame with Close/High/Low columns
         
+    Returns:
+        dict with regime information
+    """
+    try:
         if data.empty:
-            return {
-                'regime': 'UNKNOWN',
-                'confidence': 0,
-                'description': 'Unable to determine market regime'
-            }
-        
-        # Calculate indicators
-        data = indicators.add_all_indicators(data)
+            return unknown_regime('Unable to determine market regime')
+        
+        # Calculate only the indicators used below (without touching the caller's frame)
+        data = indicators.with_indicators(data, REGIME_INDICATORS)
         latest = data.iloc[-1]
         
         price = latest['Close']
-        sma_50 = latest['SMA_50']
-        sma_200 = latest['SMA_200']
-        adx = latest['ADX']
         
         # Calculate price momentum (% change last 3 months)
         price_3m_ago = data['Close'].iloc[-63] if len(data) >= 63 else data['Close'].iloc[0]
         momentum_3m = ((price - price_3m_ago) / price_3m_ago) * 100
         
-        # Determine regime
-        bullish_indicators = 0
-        bearish_indicators = 0
-        
-        # Price vs SMAs
-        if price > sma_200:
-            bullish_indicators += 2
-        else:
-            bearish_indicators += 2
-            
-        if price > sma_50:
-            bullish_indicators += 1
-        else:
-            bearish_indicators += 1
-        
-        # SMA alignment (Golden Cross / Death Cross)
-        if sma_50 > sma_200:
-            bullish_indicators += 2
-        else:
-            bearish_indicators += 2
-        
-        # Momentum
-        if momentum_3m > 5:
-            bullish_indicators += 1
-        elif momentum_3m < -5:
-            bearish_indicators += 1
-        
-        # Determine regime and thresholds
-        if adx < 20:
-            # Weak trend = Sideways market
-            regime = 'SIDEWAYS'
-            description = 'Mercado lateral sin tendencia clara'
-            buy_threshold = 30  # Optimized from 50 via grid search
-            sell_threshold = 50
-            confidence = 100 - adx * 5  # Lower ADX = higher confidence in sideways
-            
-        elif bullish_indicators > bearish_indicators + 1:
-            # Strong bullish indicators = Bull market
-            regime = 'BULL'
-            description = 'Mercado alcista - tendencia positiva'
-            buy_threshold = 40  # More aggressive
-            sell_threshold = 60
-            confidence = (bullish_indicators / (bullish_indicators + bearish_indicators)) * 100
-            
-        elif bearish_indicators > bullish_indicators + 1:
-            # Strong bearish indicators = Bear market
-            regime = 'BEAR'
-            description = 'Mercado bajista - tendencia negativa'
-            buy_threshold = 65  # Very conservative
-            sell_threshold = 35
-            confidence = (bearish_indicators / (bullish_indicators + bearish_indicators)) * 100
-            
-        else:
-            # Mixed signals = Transition/Sideways
-            regime = 'SIDEWAYS'
-            description = 'Mercado en transición'
-            buy_threshold = 30  # Optimized from 50 via grid search
-            sell_threshold = 50
-            confidence = 50
-        
-        return {
-            'regime': regime,
-            'confidence': round(confidence, 1),
-            'description': description,
-            'thresholds': {
-                'buy': buy_threshold,
-                'sell': sell_threshold
-            },
-            'indicators': {
-                'spy_price': round(price, 2),
-                'sma_50': round(sma_50, 2),
-                'sma_200': round(sma_200, 2),
-                'adx': round(adx, 2),
-                'momentum_3m': round(momentum_3m, 2),
-                'price_above_sma200': price > sma_200,
-                'golden_cross': sma_50 > sma_200
-            },
-            'signal_counts': {
-                'bullish': bullish_indicators,
-                'bearish': bearish_indicators
-            }
-        }
+        return _classify_regime(price, latest['SMA_50'], latest['SMA_200'], latest['ADX'], momentum_3m)
         
     except Exception as e:
-        return {
-            'regime': 'UNKNOWN',
-            'confidence': 0,
-            'description': f'Error detecting regime: {str(e)}',
-            'thresholds': {'buy': 50, 'sell': 50}
+        return unknown_regime(f'Error detecting regime: {str(e)}')
+
+
+def unknown_regime(description):
+    """Neutral regime (50/50 thresholds) used when SPY data is unavailable"""
+    return {
+        'regime': 'UNKNOWN',
+        'confidence': 0,
+        'description': description,
+        'thresholds': {'buy': 50, 'sell': 50}
+    }
+
+
+def _classify_regime(price, sma_50, sma_200, adx, momentum_3m):
+    """Regime dict from the latest SPY price, SMAs, ADX and 3-month momentum"""
+    # Determine regime
+    bullish_indicators = 0
+    bearish_indicators = 0
+    
+    # Price vs SMAs
+    if price > sma_200:
+        bullish_indicators += 2
+    else:
+        bearish_indicators += 2
+        
+    if price > sma_50:
+        bullish_indicators += 1
+    else:
+        bearish_indicators += 1
+    
+    # SMA alignment (Golden Cross / Death Cross)
+    if sma_50 > sma_200:
+        bullish_indicators += 2
+    else:
+        bearish_indicators += 2
+    
+    # Momentum
+    if momentum_3m > 5:
+        bullish_indicators += 1
+    elif momentum_3m < -5:
+        bearish_indicators += 1
+    
+    # Determine regime and thresholds
+    if adx < 20:
+        # Weak trend = Sideways market
+        regime = 'SIDEWAYS'
+        description = 'Mercado lateral sin tendencia clara'
+        buy_threshold = 30  # Optimized from 50 via grid search
+        sell_threshold = 50
+        confidence = 100 - adx * 5  # Lower ADX = higher confidence in sideways
+        
+    elif bullish_indicators > bearish_indicators + 1:
+        # Strong bullish indicators = Bull market
+        regime = 'BULL'
+        description = 'Mercado alcista - tendencia positiva'
+        buy_threshold = 40  # More aggressive
+        sell_threshold = 60
+        confidence = (bullish_indicators / (bullish_indicators + bearish_indicators)) * 100
+        
+    elif bearish_indicators > bullish_indicators + 1:
+        # Strong bearish indicators = Bear market
+        regime = 'BEAR'
+        description = 'Mercado bajista - tendencia negativa'
+        buy_threshold = 65  # Very conservative
+        sell_threshold = 35
+        confidence = (bearish_indicators / (bullish_indicators + bearish_indicators)) * 100
+        
+    else:
+        # Mixed signals = Transition/Sideways
+        regime = 'SIDEWAYS'
+        description = 'Mercado en transición'
+        buy_threshold = 30  # Optimized from 50 via grid search
+        sell_threshold = 50
+        confidence = 50
+    
+    return {
+        'regime': regime,
+        'confidence': round(confidence, 1),
+        'description': description,
+        'thresholds': {
+            'buy': buy_threshold,
+            'sell': sell_threshold
+        },
+        'indicators': {
+            'spy_price': round(price, 2),
+            'sma_50': round(sma_50, 2),
+            'sma_200': round(sma_200, 2),
+            'adx': round(adx, 2),
+            'momentum_3m': round(momentum_3m, 2),
+            'price_above_sma200': price > sma_200,
+            'golden_cross': sma_50 > sma_200
+        },
+        'signal_counts': {
+            'bullish': bullish_indicators,
+            'bearish': bearish_indicators
         }
+    }
+
+
+class RegimeTimeline:
+    """
+    Point-in-time market regime for every date of a stored SPY history
+    
+    Built once for a backtest: each date gets the regime that
+    regime_from_history() would have returned with the data available at the
+    close of that day (no look-ahead, no network). Lookups are O(1) for
+    trading days and fall back to the previous trading day otherwise.
+    
+    Usage:
+        timeline = RegimeTimeline.from_history(spy_daily)
+        timeline.at(pd.Timestamp('2024-03-15'))
+    """
+    
+    def __init__(self, index, regimes):
+        self.index = index
+        self.regimes = regimes
+        self._by_date = dict(zip(index, regimes))
+    
+    @classmethod
+    def from_history(cls, data):
+        if data.empty:
+            return cls(data.index, [])
+        
+        data = indicators.with_indicators(data, REGIME_INDICATORS)
+        close = data['Close'].to_numpy(dtype=float)
+        
+        # Same 3-month lookback as regime_from_history (first bar while < 63 bars)
+        positions = np.arange(len(close))
+        base = close[np.where(positions >= 62, positions - 62, 0)]
+        momentum_3m = (close - base) / base * 100
+        
+        columns = zip(close, data['SMA_50'].to_numpy(), data['SMA_200'].to_numpy(),
+                      data['ADX'].to_numpy(), momentum_3m)
+        regimes = [_classify_regime(*values) for values in columns]
+        return cls(data.index, regimes)
+    
+    def at(self, date):
+        """Regime as of the close of `date` (UNKNOWN before the first stored bar)"""
+        regime = self._by_date.get(date)
+        if regime is not None:
+            return regime
+        
+        position = self.index.searchsorted(date, side='right') - 1
+        if position < 0:
+            return unknown_regime('No SPY history before this date')
+        return self.regimes[position]
+    
+    def __len__(self):
+        return len(self.regimes)
 
 
-def get_regime_adjusted_thresholds(ticker_volatility=None):
+def get_regime_adjusted_thresholds(ticker_volatility=None, regime_data=None):
     """
     Get buy/sell thresholds adjusted for current market regime
     
     Args:
         ticker_volatility: Optional ticker-specific volatility (annual)
+        regime_data: Precomputed regime (default: get_market_regime())
         
     Returns:
         dict with adjusted thresholds
     """
-    regime_data = detect_market_regime()
+    if regime_data is None:
+        regime_data = get_market_regime()
     
     base_buy = regime_data['thresholds']['buy']
     base_sell = regime_data['thresholds']['sell']
@@ -164,14 +273,18 @@ def get_regime_adjusted_thresholds(ticker_volatility=None):
     }
 
 
-def get_regime_summary():
+def get_regime_summary(regime_data=None):
     """
     Get human-readable market regime summary
     
+    Args:
+        regime_data: Precomputed regime (default: get_market_regime())
+        
     Returns:
         Formatted string
     """
-    regime_data = detect_market_regime()
+    if regime_data is None:
+        regime_data = get_market_regime()
     
     if regime_data['regime'] == 'UNKNOWN':
         return "⚠️ Unable to determine market regime"
@@ -0,0 +1,464 @@
+"""
+Pure scoring kernel for the short-term model (Phase 4A) and the verdict mapping.
+
+The short-term verdict only depends on a few numbers of the latest bar (RSI,
+MACD vs signal, Stochastic %K, 20-day annualised volatility), the stock
+category and the parameters (thresholds, weights). Extracting them once as a
+feature vector lets parameter sweeps re-score without running FinancialAgent
+again: score_features() scores one vector, score_batch() scores N feature
+vectors x M parameter sets in a single NumPy pass.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# Feature vector layout (see feature_vector / features_from_frame)
+FEATURES = ('rsi', 'macd', 'macd_signal', 'stoch_k', 'volatility', 'category', 'is_etf')
+RSI, MACD, MACD_SIGNAL, STOCH_K, VOLATILITY, CATEGORY, IS_ETF = range(len(FEATURES))
+
+# Optimized thresholds per category (Phase 3.3c - Final Adjustment)
+# Adjusted to 27% for mega-caps to capture GOOGL 29.2%, NVDA 27%
+# Target: ~20% COMPRA rate with 31-32% average confidence
+CATEGORY_THRESHOLDS = {
+    'mega_cap_stable': (27.0, 73.0),     # Was 30 - captures GOOGL 29.2%, NVDA 27%
+    'mega_cap_volatile': (27.0, 73.0),   # Was 28 - consistency with stable
+    'high_growth': (22.0, 78.0),         # Was 25 - more opportunities
+    'defensive': (27.0, 73.0),           # Was 30 - already performing well
+    'financial': (28.0, 72.0),           # Was 32 - captures MA
+    'high_volatility': (25.0, 75.0),     # Was 28
+    'normal': (26.0, 74.0)               # Was 30 - captures MCD
+}
+CATEGORIES = tuple(CATEGORY_THRESHOLDS)
+_CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+
+# Tickers with their own category (the rest are split by volatility)
+MEGA_CAP_TECH = ('AAPL', 'MSFT', 'GOOGL', 'META', 'AMZN', 'NVDA')
+HIGH_GROWTH = ('TSLA', 'PLTR', 'SNOW', 'COIN', 'RBLX', 'U', 'DDOG')
+DEFENSIVE = ('JNJ', 'PG', 'KO', 'PEP', 'WMT', 'COST', 'UNH', 'LLY')
+FINANCIAL = ('JPM', 'BAC', 'GS', 'MS', 'V', 'MA', 'AXP')
+_CATEGORY_TABLE = np.array([CATEGORY_THRESHOLDS[c] for c in CATEGORIES])
+
+# Tunable parameters. None/NaN thresholds = dynamic per category
+DEFAULT_PARAMS = {
+    'buy_threshold': None,
+    'sell_threshold': None,
+    'w_rsi': 0.50,     # Momentum líder
+    'w_macd': 0.35,    # Confirmación de tendencia
+    'w_stoch': 0.15,   # Confirmación rápida
+}
+
+# Long-term verdicts by code (long_term_verdict_codes)
+LONG_TERM_VERDICTS = ("FUERTE VENTA 💀", "VENTA 🔴", "NEUTRAL ⚪", "COMPRA 🟢", "FUERTE COMPRA 🚀")
+
+# ============================================================
+# PHASE 4A: Scoring Functions Optimized (Backtesting Validated)
+# ============================================================
+
+def calculate_rsi_momentum_score(rsi: float) -> float:
+    """
+    RSI Momentum Interpretation (Phase 2 Validated)
+    
+    CRITICAL FIX: Oversold zones = BUY opportunities
+    NOT: RSI > 50 = bullish (this was inverted logic)
+    
+    Validation: +74% improvement contribution in backtesting
+    """
+    if rsi < 30:
+        return 80  # Oversold = Strong BUY
+    elif rsi < 40:
+        return 70  # Weak oversold = BUY
+    elif rsi < 60:
+        return 50  # Neutral
+    elif rsi < 70:
+        return 30  # Weak overbought = SELL
+    else:
+        return 20  # Overbought = Strong SELL
+
+def calculate_macd_score(macd_status: str) -> float:
+    """
+    MACD Trend Confirmation
+    
+    Bullish crossover = momentum positivo
+    Bearish crossover = momentum negativo
+    """
+    if macd_status == 'Bullish':
+        return 75  # Strong uptrend
+    elif macd_status == 'Bearish':
+        return 25  # Strong downtrend
+    else:
+        return 50  # Neutral / No clear trend
+
+def calculate_stochastic_score(stoch_k: float) -> float:
+    """
+    Stochastic Momentum Oscillator
+    
+    Similar a RSI pero más sensible a movimientos recientes
+    """
+    if stoch_k < 20:
+        return 75  # Oversold
+    elif stoch_k < 50:
+        return 55  # Weak oversold
+    elif stoch_k < 80:
+        return 45  # Weak overbought
+    else:
+        return 25  # Overbought
+
+def calculate_volatility_score_nonlinear(volatility: float) -> float:
+    """
+    Volatility Risk Adjustment (Non-Linear)
+    
+    Penalizes extreme volatility exponentially (>8%)
+    Rewards low volatility moderately (<4%)
+    
+    Phase 4A Enhancement: Non-linear scoring
+    """
+    vol_pct = volatility * 100
+    
+    # Extreme volatility (exponential penalty)
+    if vol_pct > 15.0:
+        return 30  # Very extreme (MSTR, crypto-like)
+    elif vol_pct > 10.0:
+        return 35  # Extreme (TSLA spikes)
+    elif vol_pct > 8.0:
+        return 40  # High
+    
+    # Moderate volatility
+    elif vol_pct > 6.0:
+        return 45  # Slightly elevated
+    elif vol_pct > 4.0:
+        return 50  # Normal
+    
+    # Low volatility (slight reward)
+    elif vol_pct > 2.0:
+        return 52  # Low vol (defensive stocks)
+    else:
+        return 55  # Very low vol (KO, PG)
+
+def categorize_stock_for_thresholds(volatility: float, ticker: str = None) -> str:
+    """
+    Phase 3.3: Enhanced Stock Categorization for Dynamic Thresholds
+    
+    Optimized via grid search - differentiated thresholds by stock type
+    
+    Returns: Category for dynamic threshold selection
+    """
+    vol_pct = volatility * 100
+    
+    # Category 1: Mega-cap tech (highest quality, stricter thresholds)
+    if ticker and ticker.upper() in MEGA_CAP_TECH:
+        if vol_pct < 35:
+            return 'mega_cap_stable'
+        else:
+            return 'mega_cap_volatile'
+    
+    # Category 2: High-growth tech (more lenient for opportunities)
+    if ticker and ticker.upper() in HIGH_GROWTH:
+        return 'high_growth'
+    
+    # Category 3: Defensive/Blue-chip (stable, medium thresholds)
+    if ticker and ticker.upper() in DEFENSIVE:
+        return 'defensive'
+    
+    # Category 4: Financial services
+    if ticker and ticker.upper() in FINANCIAL:
+        return 'financial'
+    
+    # Category 5: High volatility (generic)
+    if vol_pct > 45:
+        return 'high_volatility'
+    
+    # Category 6: Normal
+    return 'normal'
+
+def dynamic_thresholds_short_term(volatility: float, ticker: str = None) -> tuple:
+    """
+    Phase 3.3: Category-Specific Dynamic Thresholds (Grid Search Optimized)
+    
+    Thresholds optimized based on:
+    - Grid search results (30 configs, 40 tickers)
+    - Stock category characteristics
+    - Historical performance analysis
+    
+    Returns:
+        (buy_threshold, sell_threshold)
+    """
+    category = categorize_stock_for_thresholds(volatility, ticker)
+    return CATEGORY_THRESHOLDS[category]
+
+def calculate_confidence_short_term(rsi_score: float, macd_score: float, 
+                                   stoch_score: float, volatility: float) -> float:
+    """
+    ST Confidence Score (Indicator Alignment + Volatility)
+    
+    High confidence = All indicators agree + Low volatility
+    Low confidence = Indicators diverge + High volatility
+    
+    Phase 4A Enhancement: Transparency for UX
+    
+    Returns:
+        Confidence percentage (0-100)
+    """
+    # Indicator alignment (70%) + volatility factor (30%), same kernel as the batch path
+    return float(confidence_batch(rsi_score, macd_score, stoch_score, volatility))
+
+
+# ============================================================
+# Feature vectors
+# ============================================================
+
+def feature_vector(latest, annual_volatility: float, ticker: str = None, is_etf: bool = False) -> np.ndarray:
+    """
+    Feature vector (FEATURES layout) from the latest indicator row.
+    
+    Args:
+        latest: Row with RSI, MACD, MACD_Signal and Stoch_K (Series or dict)
+        annual_volatility: Annualised volatility of the last 20 daily returns
+    """
+    category = categorize_stock_for_thresholds(annual_volatility, ticker)
+    return np.array([
+        latest['RSI'], latest['MACD'], latest['MACD_Signal'], latest['Stoch_K'],
+        annual_volatility, CATEGORIES.index(category), float(is_etf),
+    ], dtype=float)
+
+
+def features_from_frame(data: pd.DataFrame, ticker: str = None, is_etf: bool = False) -> np.ndarray:
+    """
+    Feature vectors for every bar of a frame with indicators (T x len(FEATURES)),
+    point-in-time: row t only uses data up to bar t.
+    """
+    close = data['Close'].to_numpy(dtype=float)
+    returns = pd.Series(close).pct_change()
+    volatility = (returns.rolling(20).std(ddof=0) * np.sqrt(252)).to_numpy()
+    
+    features = np.empty((len(data), len(FEATURES)))
+    features[:, RSI] = data['RSI'].to_numpy(dtype=float)
+    features[:, MACD] = data['MACD'].to_numpy(dtype=float)
+    features[:, MACD_SIGNAL] = data['MACD_Signal'].to_numpy(dtype=float)
+    features[:, STOCH_K] = data['Stoch_K'].to_numpy(dtype=float)
+    features[:, VOLATILITY] = volatility
+    features[:, CATEGORY] = categorize_batch(volatility, ticker)
+    features[:, IS_ETF] = float(is_etf)
+    return features
+
+
+def categorize_batch(volatility, ticker: str = None) -> np.ndarray:
+    """Category index (into CATEGORIES) for an array of volatilities of one ticker"""
+    vol_pct = np.asarray(volatility, dtype=float) * 100
+    symbol = ticker.upper() if ticker else None
+    
+    # Mismas reglas que categorize_stock_for_thresholds (NaN cae en la rama "else")
+    if symbol in MEGA_CAP_TECH:
+        index = np.where(vol_pct < 35, _CATEGORY_INDEX['mega_cap_stable'],
+                         _CATEGORY_INDEX['mega_cap_volatile'])
+    elif symbol in HIGH_GROWTH:
+        index = np.full(vol_pct.shape, _CATEGORY_INDEX['high_growth'])
+    elif symbol in DEFENSIVE:
+        index = np.full(vol_pct.shape, _CATEGORY_INDEX['defensive'])
+    elif symbol in FINANCIAL:
+        index = np.full(vol_pct.shape, _CATEGORY_INDEX['financial'])
+    else:
+        index = np.where(vol_pct > 45, _CATEGORY_INDEX['high_volatility'], _CATEGORY_INDEX['normal'])
+    return index.astype(float)
+
+
+# ============================================================
+# Scoring
+# ============================================================
+
+def _resolve_params(params):
+    """DEFAULT_PARAMS overridden by the known keys of params (None threshold -> NaN)"""
+    resolved = dict(DEFAULT_PARAMS)
+    if params:
+        resolved.update({key: params[key] for key in DEFAULT_PARAMS if key in params})
+    for key in ('buy_threshold', 'sell_threshold'):
+        if resolved[key] is None:
+            resolved[key] = math.nan
+    return resolved
+
+
+def score_features(features, params: dict = None) -> dict:
+    """
+    Short-term score of one feature vector (pure: same inputs, same output).
+    
+    Args:
+        features: Vector with the FEATURES layout
+        params: Overrides of DEFAULT_PARAMS (extra keys are ignored)
+    
+    Returns:
+        Dict with the component scores, final_score (0-100), confidence (0-100),
+        buy/sell thresholds, signal ('BUY'/'SELL'/'HOLD') and verdict
+    """
+    p = _resolve_params(params)
+    rsi, macd, macd_signal, stoch_k, volatility, category, is_etf = features
+    
+    rsi_score = calculate_rsi_momentum_score(rsi)
+    macd_status = 'Bullish' if macd > macd_signal else 'Bearish' if macd < macd_signal else 'Neutral'
+    macd_score = calculate_macd_score(macd_status)
+    stoch_score = calculate_stochastic_score(stoch_k)
+    
+    technical_score = (
+        rsi_score * p['w_rsi'] +
+        macd_score * p['w_macd'] +
+        stoch_score * p['w_stoch']
+    )
+    vol_score = calculate_volatility_score_nonlinear(volatility)
+    
+    # ETF Mode: 90% technical, 10% volatility (sin fundamentales)
+    if is_etf:
+        final_score = technical_score * 0.90 + vol_score * 0.10
+    else:
+        final_score = technical_score * 0.85 + vol_score * 0.15
+    
+    confidence = calculate_confidence_short_term(rsi_score, macd_score, stoch_score, volatility)
+    
+    buy_threshold, sell_threshold = CATEGORY_THRESHOLDS[CATEGORIES[int(category)]]
+    if not math.isnan(p['buy_threshold']):
+        buy_threshold = p['buy_threshold']
+    if not math.isnan(p['sell_threshold']):
+        sell_threshold = p['sell_threshold']
+    
+    if final_score < buy_threshold:
+        signal = 'BUY'
+    elif final_score > sell_threshold:
+        signal = 'SELL'
+    else:
+        signal = 'HOLD'
+    
+    return {
+        'rsi_score': rsi_score,
+        'macd_status': macd_status,
+        'macd_score': macd_score,
+        'stoch_score': stoch_score,
+        'technical_score': technical_score,
+        'vol_score': vol_score,
+        'final_score': final_score,
+        'confidence': confidence,
+        'buy_threshold': buy_threshold,
+        'sell_threshold': sell_threshold,
+        'signal': signal,
+        'verdict': short_term_verdict(signal, final_score, confidence),
+    }
+
+
+def score_batch(features, params=None) -> dict:
+    """
+    Vectorised score_features: N feature vectors x M parameter sets at once.
+    
+    Args:
+        features: Array (N, len(FEATURES)) or a single vector
+        params: A dict or a list of M dicts of DEFAULT_PARAMS overrides
+    
+    Returns:
+        Dict of (N, M) arrays: final_score, confidence, buy_threshold,
+        sell_threshold and signal (1 BUY, 0 HOLD, -1 SELL)
+    """
+    features = np.atleast_2d(np.asarray(features, dtype=float))
+    param_sets = [params] if params is None or isinstance(params, dict) else list(params)
+    resolved = [_resolve_params(p) for p in param_sets]
+    p = {key: np.array([r[key] for r in resolved], dtype=float)[None, :] for key in DEFAULT_PARAMS}
+    
+    # (N, 1) columns broadcast against (1, M) parameters
+    rsi = features[:, RSI, None]
+    macd = features[:, MACD, None]
+    macd_signal = features[:, MACD_SIGNAL, None]
+    stoch_k = features[:, STOCH_K, None]
+    volatility = features[:, VOLATILITY, None]
+    is_etf = features[:, IS_ETF, None] > 0
+    
+    rsi_score = np.select([rsi < 30, rsi < 40, rsi < 60, rsi < 70], [80, 70, 50, 30], 20)
+    macd_score = np.select([macd > macd_signal, macd < macd_signal], [75, 25], 50)
+    stoch_score = np.select([stoch_k < 20, stoch_k < 50, stoch_k < 80], [75, 55, 45], 25)
+    
+    technical_score = rsi_score * p['w_rsi'] + macd_score * p['w_macd'] + stoch_score * p['w_stoch']
+    vol_score = volatility_score_batch(volatility)
+    final_score = np.where(is_etf,
+                           technical_score * 0.90 + vol_score * 0.10,
+                           technical_score * 0.85 + vol_score * 0.15)
+    
+    confidence = confidence_batch(rsi_score, macd_score, stoch_score, volatility)
+    confidence = np.broadcast_to(confidence, final_score.shape)
+    
+    category = _CATEGORY_TABLE[features[:, CATEGORY].astype(int)]
+    buy_threshold = np.where(np.isnan(p['buy_threshold']), category[:, :1], p['buy_threshold'])
+    sell_threshold = np.where(np.isnan(p['sell_threshold']), category[:, 1:], p['sell_threshold'])
+    
+    signal = np.select([final_score < buy_threshold, final_score > sell_threshold], [1, -1], 0)
+    
+    return {
+        'final_score': final_score,
+        'confidence': confidence,
+        'buy_threshold': buy_threshold,
+        'sell_threshold': sell_threshold,
+        'signal': signal,
+    }
+
+
+def volatility_score_batch(volatility) -> np.ndarray:
+    """Vectorised calculate_volatility_score_nonlinear"""
+    vol_pct = np.asarray(volatility, dtype=float) * 100
+    return np.select(
+        [vol_pct > 15.0, vol_pct > 10.0, vol_pct > 8.0, vol_pct > 6.0, vol_pct > 4.0, vol_pct > 2.0],
+        [30, 35, 40, 45, 50, 52], 55)
+
+
+def confidence_batch(rsi_score, macd_score, stoch_score, volatility) -> np.ndarray:
+    """Vectorised calculate_confidence_short_term"""
+    # np.fmax behaves like the scalar max(0, x): NaN (e.g. volatility without data) gives 0
+    scores = np.stack(np.broadcast_arrays(rsi_score, macd_score, stoch_score), axis=-1)
+    alignment_factor = np.fmax(0, 1 - scores.std(axis=-1) / 50)
+    
+    vol_pct = np.asarray(volatility, dtype=float) * 100
+    vol_factor = np.select([vol_pct > 15, vol_pct > 10, vol_pct > 8], [0.3, 0.5, 0.7],
+                           np.fmax(0, 1 - vol_pct / 10))
+    
+    confidence = (alignment_factor * 0.70 + vol_factor * 0.30) * 100
+    return np.clip(confidence, 0, 100)
+
+
+# ============================================================
+# Verdicts
+# ============================================================
+
+def short_term_verdict(signal: str, final_score: float, confidence: float) -> str:
+    """
+    Verdict of the short-term model: the signal weighted by confidence
+    (Phase 4A Step 2). High confidence + BUY = FUERTE COMPRA; low confidence
+    downgrades to a weaker signal.
+    """
+    if signal == 'BUY':
+        if final_score < 30 and confidence >= 85:
+            return "FUERTE COMPRA 🚀"
+        elif confidence >= 70:
+            return "COMPRA 🟢"
+        return "COMPRA 🟢 (⚠️ Confianza Media)"
+    if signal == 'SELL':
+        if final_score > 70 and confidence >= 85:
+            return "FUERTE VENTA 💀"
+        elif confidence >= 70:
+            return "VENTA 🔴"
+        return "VENTA 🔴 (⚠️ Confianza Media)"
+    return "NEUTRAL ⚪ (HOLD)"
+
+
+def long_term_verdict(confidence: float, probability_success: float, buy_threshold: float) -> str:
+    """Verdict of the long-term model (Phase 3.3b)"""
+    code = long_term_verdict_codes(confidence, probability_success, buy_threshold)
+    return LONG_TERM_VERDICTS[int(code)]
+
+
+def long_term_verdict_codes(confidence, probability_success, buy_threshold) -> np.ndarray:
+    """
+    Vectorised long-term verdict as indices into LONG_TERM_VERDICTS.
+    Arguments broadcast, e.g. confidence (N, 1) against buy_threshold (1, M).
+    """
+    confidence = np.asarray(confidence, dtype=float)
+    probability = np.nan_to_num(np.asarray(probability_success, dtype=float), nan=0.0)
+    buy_threshold = np.asarray(buy_threshold, dtype=float)
+    return np.select(
+        [(confidence >= buy_threshold + 5) & (probability >= 80),
+         confidence >= buy_threshold,
+         confidence >= 5,
+         confidence >= -10],
+        [4, 3, 2, 1], 0)
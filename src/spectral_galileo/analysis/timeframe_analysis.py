@@ -1,31 +1,45 @@
 """
 Multi-Timeframe Analysis Module
 Analyzes price action across multiple timeframes to confirm signals
+
+Live mode downloads each timeframe; historical mode (HistoricalTimeframes)
+resamples weekly/monthly bars locally from a stored daily history, as of a
+simulated date, for backtests.
 """
 
 import pandas as pd
 from src.spectral_galileo.data import market_data
 from src.spectral_galileo.analysis import indicators
-import signal
-from contextlib import contextmanager
+from src.spectral_galileo.utils import timeouts
 
-class TimeoutException(Exception):
-    """Exception raised when an operation times out"""
-    pass
+# Indicadores que lee analyze_timeframe (no hace falta calcular el resto)
+TIMEFRAME_INDICATORS = ['RSI', 'MACD', 'MACD_Signal', 'SMA_50', 'SMA_200', 'ADX']
 
-@contextmanager
-def time_limit(seconds):
-    """Context manager to enforce time limit on operations"""
-    def signal_handler(signum, frame):
-        raise TimeoutException(f"Operation timed out after {seconds} seconds")
-    
-    old_handler = signal.signal(signal.SIGALRM, signal_handler)
-    signal.alarm(seconds)
-    try:
-        yield
-    finally:
-        signal.alarm(0)
-        signal.signal(signal.SIGALRM, old_handler)
+TIMEFRAMES = [
+    {'name': 'Daily', 'period': '1y', 'interval': '1d'},
+    {'name': 'Weekly', 'period': '2y', 'interval': '1wk'},
+    {'name': 'Monthly', 'period': '5y', 'interval': '1mo'}
+]
+
+# Calendar days covered by each period (historical mode)
+PERIOD_DAYS = {'1y': 365, '2y': 730, '5y': 1826}
+
+# pandas resample rules for the intervals built from daily bars
+RESAMPLE_RULES = {'1wk': 'W-FRI', '1mo': 'ME'}
+
+OHLCV_AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+# Kept for callers that catch it; deadlines come from utils.timeouts
+TimeoutException = timeouts.DeadlineExceeded
+
+# Seconds allowed to download one timeframe
+TIMEFRAME_DEADLINE = 10
 
 def analyze_timeframe(ticker_symbol, period, interval):
     """
@@ -40,17 +54,38 @@ def analyze_timeframe(ticker_symbol, period, interval):
         dict with timeframe analysis or None on timeout/error
     """
     try:
-        # Add 10-second timeout for each timeframe analysis
-        with time_limit(10):
-            # Get data
-            ticker = market_data.get_ticker_data(ticker_symbol)
-            data = market_data.get_historical_data(ticker, period=period, interval=interval)
+        # Deadline per timeframe download (works in any thread)
+        ticker = market_data.get_ticker_data(ticker_symbol)
+        data = timeouts.run_with_deadline(
+            market_data.get_historical_data, TIMEFRAME_DEADLINE,
+            ticker, period=period, interval=interval)
+        
+        return analyze_timeframe_data(data, interval)
+        
+    except TimeoutException as e:
+        print(f"⚠️  Timeframe analysis timeout for {ticker_symbol} ({period}, {interval})")
+        return None
+    except Exception as e:
+        return None
+
+
+def analyze_timeframe_data(data, interval):
+    """
+    Analyze a single timeframe from already available OHLCV bars
+    
+    Args:
+        data: DataFrame with the bars of the timeframe (last bar is "now")
+        interval: Data interval (1d, 1wk, 1mo)
         
+    Returns:
+        dict with timeframe analysis or None if there is not enough data
+    """
+    try:
         if data.empty or len(data) < 50:
             return None
         
-        # Calculate indicators
-        data = indicators.add_all_indicators(data)
+        # Calculate only the indicators used below (without touching the caller's frame)
+        data = indicators.with_indicators(data, TIMEFRAME_INDICATORS)
         latest = data.iloc[-1]
         
         # Extract key metrics
@@ -120,35 +155,33 @@ def analyze_timeframe(ticker_symbol, period, interval):
             'confidence': abs(bullish_signals - bearish_signals) / (bullish_signals + bearish_signals) * 100
         }
         
-    except TimeoutException as e:
-        print(f"⚠️  Timeframe analysis timeout for {ticker_symbol} ({period}, {interval})")
-        return None
     except Exception as e:
         return None
 
 
-def analyze_multiple_timeframes(ticker_symbol):
+def analyze_multiple_timeframes(ticker_symbol, frames=None):
     """
     Analyze multiple timeframes and determine confluence
     
     Args:
         ticker_symbol: Stock symbol
+        frames: Optional {timeframe name: DataFrame} with the bars to use
+                (e.g. HistoricalTimeframes.frames_at(date)); nothing is
+                downloaded when given
         
     Returns:
         dict with multi-timeframe analysis and confluence score
     """
     
-    timeframes = [
-        {'name': 'Daily', 'period': '1y', 'interval': '1d'},
-        {'name': 'Weekly', 'period': '2y', 'interval': '1wk'},
-        {'name': 'Monthly', 'period': '5y', 'interval': '1mo'}
-    ]
-    
     results = {}
     signals = []
     
-    for tf in timeframes:
-        analysis = analyze_timeframe(ticker_symbol, tf['period'], tf['interval'])
+    for tf in TIMEFRAMES:
+        if frames is not None:
+            bars = frames.get(tf['name'])
+            analysis = analyze_timeframe_data(bars, tf['interval']) if bars is not None else None
+        else:
+            analysis = analyze_timeframe(ticker_symbol, tf['period'], tf['interval'])
         if analysis:
             results[tf['name']] = analysis
             signals.append(analysis['signal'])
@@ -207,6 +240,73 @@ def analyze_multiple_timeframes(ticker_symbol):
     }
 
 
+class HistoricalTimeframes:
+    """
+    Daily/weekly/monthly bars of one ticker as of any simulated date
+    
+    Weekly and monthly bars are resampled locally from the daily history
+    (no downloads). Completed bars are resampled once and cached; the bar in
+    progress on the simulated date is aggregated only from the days up to
+    that date, so nothing after it is visible (no look-ahead).
+    
+    Usage:
+        timeframes = HistoricalTimeframes(daily_history)
+        frames = timeframes.frames_at(date)
+        analyze_multiple_timeframes(ticker, frames=frames)
+    """
+    
+    def __init__(self, daily):
+        self.daily = daily[list(OHLCV_AGGREGATION)]
+        self._bars = {}   # interval -> (completed bars, exclusive end row of each bar)
+    
+    def _resampled(self, interval):
+        if interval not in self._bars:
+            bars = self.daily.resample(RESAMPLE_RULES[interval]).agg(OHLCV_AGGREGATION)
+            bars = bars.dropna(subset=['Close'])
+            # Bars are labelled with the bucket end (closed on the right)
+            ends = self.daily.index.searchsorted(bars.index, side='right')
+            self._bars[interval] = (bars, ends)
+        return self._bars[interval]
+    
+    def bars_at(self, date, interval, period):
+        """
+        Bars of `interval` covering `period` as of the close of `date`
+        
+        Returns:
+            DataFrame OHLCV (the last bar may be partial)
+        """
+        end = self.daily.index.searchsorted(date, side='right')
+        since = pd.Timestamp(date) - pd.Timedelta(days=PERIOD_DAYS[period])
+        
+        if interval == '1d':
+            start = self.daily.index.searchsorted(since, side='left')
+            return self.daily.iloc[start:end]
+        
+        bars, ends = self._resampled(interval)
+        complete = ends.searchsorted(end, side='right')
+        frame = bars.iloc[:complete]
+        
+        # Partial bar: days of the current bucket up to `date`
+        partial_start = ends[complete - 1] if complete else 0
+        if complete < len(bars) and partial_start < end:
+            days = self.daily.iloc[partial_start:end]
+            partial = pd.DataFrame({
+                'Open': days['Open'].iloc[0],
+                'High': days['High'].max(),
+                'Low': days['Low'].min(),
+                'Close': days['Close'].iloc[-1],
+                'Volume': days['Volume'].sum()
+            }, index=bars.index[complete:complete + 1])
+            frame = pd.concat([frame, partial])
+        
+        return frame[frame.index >= since]
+    
+    def frames_at(self, date):
+        """{timeframe name: bars} for analyze_multiple_timeframes(frames=...)"""
+        return {tf['name']: self.bars_at(date, tf['interval'], tf['period'])
+                for tf in TIMEFRAMES}
+
+
 def get_timeframe_summary(mtf_analysis):
     """
     Generate human-readable summary of multi-timeframe analysis
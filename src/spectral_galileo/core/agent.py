@@ -1,16 +1,32 @@
 from src.spectral_galileo.analysis import macro_analysis
 from src.spectral_galileo.analysis import sentiment_analysis
 from src.spectral_galileo.data import market_data
+from src.spectral_galileo.data import fundamentals_snapshot
 from src.spectral_galileo.analysis import indicators
 from src.spectral_galileo.data import report_generator
 from src.spectral_galileo.analysis import timeframe_analysis
 from src.spectral_galileo.analysis import regime_detection
+from src.spectral_galileo.analysis import scoring
+from src.spectral_galileo.analysis.scoring import (  # Re-exportadas (API histórica del agente)
+    calculate_rsi_momentum_score,
+    calculate_macd_score,
+    calculate_stochastic_score,
+    calculate_volatility_score_nonlinear,
+    categorize_stock_for_thresholds,
+    dynamic_thresholds_short_term,
+    calculate_confidence_short_term,
+)
 from src.spectral_galileo.external import reddit_sentiment
 from src.spectral_galileo.external import earnings_calendar
 from src.spectral_galileo.external import insider_trading
+from src.spectral_galileo.utils import timeouts
 import pandas as pd
 import random # Para Monte Carlo simplificado
 import os
+import copy
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 # Benchmarks promedio por sector para comparativas relativas
@@ -28,194 +44,200 @@ INDUSTRY_BENCHMARKS = {
 }
 DEFAULT_BENCHMARK = {"debtToEquity": 100, "roe": 0.15, "currentRatio": 1.3, "margin": 0.10, "pe": 20}
 
+# Plazo (segundos) de cada fuente externa consultada en paralelo en run_analysis
+EXTERNAL_DEADLINES = {
+    "multi_timeframe": 30,
+    "market_regime": 20,
+    "reddit": 15,
+    "earnings": 10,
+    "insider": 10,
+}
+
+# Parámetros del scoring ajustables por agente (barridos de parámetros, pruebas).
+# Umbrales en None = umbrales dinámicos por categoría de dynamic_thresholds_short_term;
+# los pesos del modelo de corto plazo son los del kernel (scoring.DEFAULT_PARAMS)
+DEFAULT_SCORING_PARAMS = {
+    "w_tech": 1.0,
+    "w_fund": 1.0,
+    "w_macro": 1.0,
+    "w_qual": 1.0,
+    **scoring.DEFAULT_PARAMS,
+}
+
 # ============================================================
-# PHASE 4A: Scoring Functions Optimized (Backtesting Validated)
+# Memoización de etapas de run_analysis
 # ============================================================
+# Cada etapa (descarga → indicadores → contexto → scoring → riesgo → reporte)
+# guarda su resultado bajo una clave de contenido (ticker, huella de las barras,
+# parámetros...). Una nueva ejecución solo recalcula las etapas cuyos insumos
+# cambiaron: p.ej. cambiar umbrales reutiliza datos, indicadores y contexto.
+STAGE_CACHE_SIZE = 256          # Entradas por etapa (LRU)
+STAGE_TTL_SECONDS = 15 * 60     # Etapas con E/S (descarga, fuentes externas)
 
-def calculate_rsi_momentum_score(rsi: float) -> float:
-    """
-    RSI Momentum Interpretation (Phase 2 Validated)
-    
-    CRITICAL FIX: Oversold zones = BUY opportunities
-    NOT: RSI > 50 = bullish (this was inverted logic)
-    
-    Validation: +74% improvement contribution in backtesting
-    """
-    if rsi < 30:
-        return 80  # Oversold = Strong BUY
-    elif rsi < 40:
-        return 70  # Weak oversold = BUY
-    elif rsi < 60:
-        return 50  # Neutral
-    elif rsi < 70:
-        return 30  # Weak overbought = SELL
-    else:
-        return 20  # Overbought = Strong SELL
-
-def calculate_macd_score(macd_status: str) -> float:
-    """
-    MACD Trend Confirmation
-    
-    Bullish crossover = momentum positivo
-    Bearish crossover = momentum negativo
-    """
-    if macd_status == 'Bullish':
-        return 75  # Strong uptrend
-    elif macd_status == 'Bearish':
-        return 25  # Strong downtrend
-    else:
-        return 50  # Neutral / No clear trend
-
-def calculate_stochastic_score(stoch_k: float) -> float:
-    """
-    Stochastic Momentum Oscillator
-    
-    Similar a RSI pero más sensible a movimientos recientes
-    """
-    if stoch_k < 20:
-        return 75  # Oversold
-    elif stoch_k < 50:
-        return 55  # Weak oversold
-    elif stoch_k < 80:
-        return 45  # Weak overbought
-    else:
-        return 25  # Overbought
-
-def calculate_volatility_score_nonlinear(volatility: float) -> float:
-    """
-    Volatility Risk Adjustment (Non-Linear)
-    
-    Penalizes extreme volatility exponentially (>8%)
-    Rewards low volatility moderately (<4%)
-    
-    Phase 4A Enhancement: Non-linear scoring
-    """
-    vol_pct = volatility * 100
-    
-    # Extreme volatility (exponential penalty)
-    if vol_pct > 15.0:
-        return 30  # Very extreme (MSTR, crypto-like)
-    elif vol_pct > 10.0:
-        return 35  # Extreme (TSLA spikes)
-    elif vol_pct > 8.0:
-        return 40  # High
-    
-    # Moderate volatility
-    elif vol_pct > 6.0:
-        return 45  # Slightly elevated
-    elif vol_pct > 4.0:
-        return 50  # Normal
-    
-    # Low volatility (slight reward)
-    elif vol_pct > 2.0:
-        return 52  # Low vol (defensive stocks)
-    else:
-        return 55  # Very low vol (KO, PG)
+_stage_cache = {}
+_stage_lock = threading.Lock()
 
-def categorize_stock_for_thresholds(volatility: float, ticker: str = None) -> str:
-    """
-    Phase 3.3: Enhanced Stock Categorization for Dynamic Thresholds
-    
-    Optimized via grid search - differentiated thresholds by stock type
-    
-    Returns: Category for dynamic threshold selection
-    """
-    vol_pct = volatility * 100
-    
-    # Category 1: Mega-cap tech (highest quality, stricter thresholds)
-    if ticker and ticker.upper() in ['AAPL', 'MSFT', 'GOOGL', 'META', 'AMZN', 'NVDA']:
-        if vol_pct < 35:
-            return 'mega_cap_stable'
-        else:
-            return 'mega_cap_volatile'
-    
-    # Category 2: High-growth tech (more lenient for opportunities)
-    if ticker and ticker.upper() in ['TSLA', 'PLTR', 'SNOW', 'COIN', 'RBLX', 'U', 'DDOG']:
-        return 'high_growth'
-    
-    # Category 3: Defensive/Blue-chip (stable, medium thresholds)
-    if ticker and ticker.upper() in ['JNJ', 'PG', 'KO', 'PEP', 'WMT', 'COST', 'UNH', 'LLY']:
-        return 'defensive'
-    
-    # Category 4: Financial services
-    if ticker and ticker.upper() in ['JPM', 'BAC', 'GS', 'MS', 'V', 'MA', 'AXP']:
-        return 'financial'
-    
-    # Category 5: High volatility (generic)
-    if vol_pct > 45:
-        return 'high_volatility'
-    
-    # Category 6: Normal
-    return 'normal'
 
-def dynamic_thresholds_short_term(volatility: float, ticker: str = None) -> tuple:
+def _memoise(stage, key, compute, ttl=None, cacheable=None):
     """
-    Phase 3.3: Category-Specific Dynamic Thresholds (Grid Search Optimized)
+    Devuelve el resultado memoizado de una etapa o lo calcula con compute().
     
-    Thresholds optimized based on:
-    - Grid search results (30 configs, 40 tickers)
-    - Stock category characteristics
-    - Historical performance analysis
-    
-    Returns:
-        (buy_threshold, sell_threshold)
+    Args:
+        stage: Nombre de la etapa
+        key: Clave de contenido (None = no memoizar)
+        compute: Callable sin argumentos que calcula la etapa
+        ttl: Vigencia en segundos (None = sin caducidad, etapas puras)
+        cacheable: Predicado opcional; los resultados que no lo cumplen no se guardan
     """
-    category = categorize_stock_for_thresholds(volatility, ticker)
+    if key is None:
+        return compute()
     
-    # Optimized thresholds per category (Phase 3.3c - Final Adjustment)
-    # Adjusted to 27% for mega-caps to capture GOOGL 29.2%, NVDA 27%
-    # Target: ~20% COMPRA rate with 31-32% average confidence
-    thresholds = {
-        'mega_cap_stable': (27.0, 73.0),     # Was 30 - captures GOOGL 29.2%, NVDA 27%
-        'mega_cap_volatile': (27.0, 73.0),   # Was 28 - consistency with stable
-        'high_growth': (22.0, 78.0),         # Was 25 - more opportunities
-        'defensive': (27.0, 73.0),           # Was 30 - already performing well
-        'financial': (28.0, 72.0),           # Was 32 - captures MA
-        'high_volatility': (25.0, 75.0),     # Was 28
-        'normal': (26.0, 74.0)               # Was 30 - captures MCD
-    }
+    now = time.monotonic()
+    with _stage_lock:
+        entries = _stage_cache.setdefault(stage, OrderedDict())
+        hit = entries.get(key)
+        if hit is not None and (ttl is None or now - hit[0] < ttl):
+            entries.move_to_end(key)
+            return hit[1]
     
-    return thresholds[category]
+    value = compute()
+    if cacheable is None or cacheable(value):
+        with _stage_lock:
+            entries[key] = (now, value)
+            entries.move_to_end(key)
+            while len(entries) > STAGE_CACHE_SIZE:
+                entries.popitem(last=False)
+    return value
+
+
+def clear_stage_cache():
+    """Vacía la memoización de etapas del proceso"""
+    with _stage_lock:
+        _stage_cache.clear()
+
 
-def calculate_confidence_short_term(rsi_score: float, macd_score: float, 
-                                   stoch_score: float, volatility: float) -> float:
+def _fingerprint(value):
+    """Huella barata del contenido de un insumo para las claves de memoización"""
+    if value is None:
+        return None
+    if isinstance(value, pd.DataFrame):
+        if value.empty:
+            return (0, tuple(value.columns))
+        # Close completo (el proveedor re-ajusta barras antiguas por splits/dividendos)
+        # + última barra entera (la barra en curso cambia también High/Low/Volume)
+        series = value['Close'] if 'Close' in value.columns else value
+        return (len(value), value.index[0], value.index[-1],
+                int(pd.util.hash_pandas_object(series).sum()),
+                hash(repr(value.iloc[-1].tolist())))
+    if isinstance(value, dict):
+        return hash(tuple((key, _fingerprint(item)) for key, item in value.items()))
+    return hash(repr(value))
+
+
+def _read_account_value():
+    """Valor de la cuenta configurado (config del portafolio en disco)"""
+    # Phase 4C: Dynamic account value from portfolio_manager
+    from src.spectral_galileo.core import portfolio_manager
+    return portfolio_manager.get_account_value()
+
+
+class LazyReport(dict):
     """
-    ST Confidence Score (Indicator Alignment + Volatility)
-    
-    High confidence = All indicators agree + Low volatility
-    Low confidence = Indicators diverge + High volatility
-    
-    Phase 4A Enhancement: Transparency for UX
-    
-    Returns:
-        Confidence percentage (0-100)
+    Resultado de run_analysis en modo lean: las secciones que solo usa el
+    reporte (peers, dimensionado de la posición con el valor de la cuenta)
+    se calculan en el primer acceso y quedan guardadas. Iterar, comparar,
+    copiar o serializar el resultado las calcula todas.
     """
-    import numpy as np
-    
-    # 1. Indicator Alignment (70% weight)
-    indicators = [rsi_score, macd_score, stoch_score]
-    std_dev = np.std(indicators)
-    
-    # Low std_dev = high alignment = high confidence
-    # Max std_dev teórico = 50 (e.g., scores 0, 50, 100)
-    alignment_factor = max(0, 1 - (std_dev / 50))
-    
-    # 2. Volatility Factor (30% weight)
-    vol_pct = volatility * 100
-    # Penalize heavily above 10%
-    if vol_pct > 15:
-        vol_factor = 0.3  # Very low confidence in extreme vol
-    elif vol_pct > 10:
-        vol_factor = 0.5
-    elif vol_pct > 8:
-        vol_factor = 0.7
-    else:
-        vol_factor = max(0, 1 - (vol_pct / 10))
-    
-    # 3. Composite Confidence
-    confidence = (alignment_factor * 0.70 + vol_factor * 0.30) * 100
-    
-    return min(100, max(0, confidence))
+
+    def __init__(self, sections, loaders):
+        super().__init__(sections)
+        self._loaders = dict(loaders)
+
+    def _load(self, key):
+        loader = self._loaders.get(key)
+        if loader is not None:
+            super().__setitem__(key, loader())
+            del self._loaders[key]
+
+    def materialize(self):
+        """Calcula las secciones pendientes"""
+        for key in list(self._loaders):
+            self._load(key)
+        return self
+
+    def __missing__(self, key):
+        if key not in self._loaders:
+            raise KeyError(key)
+        self._load(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._load(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        return key in self._loaders or super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        self._loaders.pop(key, None)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if self._loaders.pop(key, None) is None:
+            super().__delitem__(key)
+
+    def pop(self, key, *default):
+        self._load(key)
+        return super().pop(key, *default)
+
+    def popitem(self):
+        return super(LazyReport, self.materialize()).popitem()
+
+    def setdefault(self, key, default=None):
+        self._load(key)
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        # Lo que se sobrescribe ya no se calcula
+        other = dict(*args, **kwargs)
+        for key in other:
+            self._loaders.pop(key, None)
+        super().update(other)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __len__(self):
+        return super().__len__() + len(self._loaders)
+
+    def __iter__(self):
+        return super(LazyReport, self.materialize()).__iter__()
+
+    def keys(self):
+        return super(LazyReport, self.materialize()).keys()
+
+    def values(self):
+        return super(LazyReport, self.materialize()).values()
+
+    def items(self):
+        return super(LazyReport, self.materialize()).items()
+
+    def __eq__(self, other):
+        return super(LazyReport, self.materialize()).__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return super(LazyReport, self.materialize()).__repr__()
+
+    def copy(self):
+        return dict(self.materialize())
+
+    def __reduce__(self):
+        # copy/deepcopy/pickle (p.ej. ProcessPoolExecutor) reciben un dict completo
+        return (dict, (dict(self.materialize()),))
+
 
 # ============================================================
 # PHASE 4B: Risk Management Functions (Phase 3 Validated)
@@ -236,24 +258,11 @@ def calculate_atr(high: list, low: list, close: list, periods: int = 14) -> floa
     Returns:
         ATR value
     """
-    import numpy as np
-    
     # Need at least periods+1 data points
     if len(close) < periods + 1:
         return close[-1] * 0.02  # Fallback: 2% of price
     
-    # Calculate True Range for each period
-    tr_list = []
-    for i in range(1, len(close)):
-        high_low = high[i] - low[i]
-        high_close = abs(high[i] - close[i-1])
-        low_close = abs(low[i] - close[i-1])
-        tr = max(high_low, high_close, low_close)
-        tr_list.append(tr)
-    
-    # Average True Range
-    atr = np.mean(tr_list[-periods:])
-    return atr
+    return float(indicators.atr_last(high, low, close, periods))
 
 def calculate_position_size_risk_based(entry_price: float, atr: float, 
                                        account_value: float, 
@@ -315,13 +324,19 @@ def calculate_take_profit_price(entry_price: float, atr: float, is_long_term: bo
 # ============================================================
 
 class FinancialAgent:
-    def __init__(self, ticker_symbol, is_short_term=False, is_etf=False, skip_external_data=False):
+    def __init__(self, ticker_symbol, is_short_term=False, is_etf=False, skip_external_data=False,
+                 params=None, lean=False):
         self.ticker_symbol = ticker_symbol
         self.is_short_term = is_short_term
         self.is_etf = is_etf
         self.skip_external_data = skip_external_data  # For grid search optimization
+        self.params = {**DEFAULT_SCORING_PARAMS, **(params or {})}  # Umbrales y pesos del scoring
+        # Backtests/grid search: peers y dimensionado solo si se acceden (LazyReport).
+        # Las secciones inmediatas se copian igual que en modo completo.
+        self.lean = lean
         self.ticker = market_data.get_ticker_data(ticker_symbol)
         self.data = None
+        self.indicators = None  # Indicadores por fecha (con buffer: bloque aparte del OHLCV)
         self.info = None
         self.news = None
         self.macro_data = None
@@ -334,77 +349,266 @@ class FinancialAgent:
                           'XLY', 'XLB', 'XLU', 'XLRE', 'VIG', 'VYM', 'SCHD', 'DIA', 'EEM']
             self.is_etf = ticker_symbol.upper() in common_etfs
 
+    def _external_tasks(self, pre_data=None):
+        """
+        Etapas de E/S independientes de run_analysis para timeouts.run_concurrently:
+        {nombre: (callable, plazo en segundos, fallback neutral)}.
+        
+        Lo que ya viene en pre_data (régimen del escaneo, barras MTF locales)
+        no se descarga; con skip_external_data se usan directamente los neutrales.
+        """
+        ticker = self.ticker_symbol
+        mtf_frames = pre_data.get('timeframes') if pre_data else None
+        regime_data = pre_data.get('market_regime') if pre_data else None
+        
+        tasks = {
+            'multi_timeframe': (
+                lambda: timeframe_analysis.analyze_multiple_timeframes(ticker, frames=mtf_frames),
+                EXTERNAL_DEADLINES['multi_timeframe'],
+                {'timeframes': {}, 'confluence': None,
+                 'message': 'Multi-timeframe analysis unavailable'}),
+            'market_regime': (
+                # Régimen del escaneo (DataManager/backtester); solo se calcula si no viene dado
+                (lambda: regime_data) if regime_data is not None else regime_detection.get_market_regime,
+                EXTERNAL_DEADLINES['market_regime'],
+                regime_detection.unknown_regime('Market regime unavailable')),
+        }
+        
+        neutral = {
+            'reddit': {'sentiment': 'NEUTRAL', 'posts': 0, 'avg_score': 0},
+            'earnings': {'next_date': None, 'recent_surprise': None},
+            'insider': {'sentiment': 'NEUTRAL', 'net_buying': 0, 'score': 0},
+        }
+        if self.skip_external_data:
+            for name, fallback in neutral.items():
+                tasks[name] = (lambda fallback=fallback: fallback, EXTERNAL_DEADLINES[name], fallback)
+        else:
+            # 2.3 Reddit (Phase 2.1), 2.4 Earnings (Phase 2.2), 2.5 Insiders (Phase 2.3)
+            fetchers = {
+                'reddit': lambda: reddit_sentiment.get_reddit_sentiment(ticker, hours=24),
+                'earnings': lambda: earnings_calendar.get_earnings_info(ticker),
+                'insider': lambda: insider_trading.get_insider_activity(ticker, days=90),
+            }
+            for name, fetch in fetchers.items():
+                tasks[name] = (fetch, EXTERNAL_DEADLINES[name], neutral[name])
+        return tasks
+
     def run_analysis(self, pre_data=None):
         """
         Ejecuta el análisis completo. 
         Si se pasa pre_data (dict obtenido de DataManager), se usan esos datos directos.
+        
+        Etapas: descarga → indicadores → contexto (MTF/régimen/externos) →
+        scoring → gestión de riesgo → reporte. Cada etapa se memoiza por
+        contenido, así que repetir el análisis (otra consulta, otros umbrales
+        o pesos en self.params) solo recalcula las etapas cuyos insumos cambiaron.
+        """
+        context = self._prepare_context(pre_data)
+        if 'error' in context:
+            return context
+        return self._analyze(context)
+
+    @classmethod
+    def run_dual_analysis(cls, ticker_symbol, pre_data=None, is_etf=False, skip_external_data=False):
+        """
+        Análisis de corto y largo plazo de un ticker compartiendo las etapas comunes.
+        
+        Datos, indicadores, MTF, régimen, Reddit, earnings, insiders, macro y
+        sentimiento de noticias se calculan una sola vez; después se aplican
+        los dos modelos de scoring. Equivale a dos run_analysis (uno por
+        horizonte) a la mitad de coste.
+        
+        Returns:
+            (resultado_corto_plazo, resultado_largo_plazo), con el mismo formato
+            que run_analysis
+        """
+        agent_short = cls(ticker_symbol, is_short_term=True, is_etf=is_etf,
+                          skip_external_data=skip_external_data)
+        context = agent_short._prepare_context(pre_data)
+        if 'error' in context:
+            return context, dict(context)
+        
+        agent_long = cls(ticker_symbol, is_short_term=False, is_etf=agent_short.is_etf,
+                         skip_external_data=skip_external_data)
+        return agent_short._analyze(context), agent_long._analyze(context)
+
+    def _prepare_context(self, pre_data=None):
+        """
+        Etapas comunes a ambos horizontes: datos, indicadores y contexto externo.
+        
+        Returns:
+            Dict con los insumos del scoring, o {'error': ...} si faltan datos
         """
         # 1. Obtener Datos
         try:
-            if pre_data:
-                self.data = pre_data.get('history')
-                self.info = pre_data.get('fundamentals')
-                self.news = pre_data.get('news')
-            
-            if self.data is None: self.data = market_data.get_historical_data(self.ticker)
-            if self.info is None: self.info = market_data.get_fundamental_info(self.ticker) or {}
-            if self.news is None: self.news = market_data.get_news(self.ticker) or []
-            
-            if pre_data and 'macro_data' in pre_data:
-                self.macro_data = pre_data['macro_data']
-            else:
-                self.macro_data = market_data.get_macro_data()
+            raw = self._fetch(pre_data)
         except Exception as e:
             return {"error": str(e)}
+        self.data = raw['data']
+        self.info = raw['info']
+        self.news = raw['news']
+        self.macro_data = raw['macro_data']
+
+        # Con indicator_buffer (backtester) el frame de indicadores vive en un
+        # buffer reutilizado: no se memoiza nada que lo contenga.
+        indicator_buffer = pre_data.get('indicator_buffer') if pre_data else None
+        data_key = None if indicator_buffer is not None else (self.ticker_symbol, _fingerprint(self.data))
 
         # 2. Calcular Indicadores
-        self.data = indicators.add_all_indicators(self.data)
-        # Limpiar duplicados si los hay
-        self.data = self.data.loc[:, ~self.data.columns.duplicated()]
-        latest = self.data.iloc[-1]
-        
-        # 2.1 Multi-Timeframe Analysis (Phase 1.1)
-        mtf_analysis = timeframe_analysis.analyze_multiple_timeframes(self.ticker_symbol)
+        # Indicadores en un bloque aparte: la historia recibida no se modifica
+        if indicator_buffer is not None:
+            # Se leen directamente del bloque preasignado: sin concatenar un
+            # DataFrame nuevo con el OHLCV en cada día simulado
+            self.indicators = indicators.indicator_frame(self.data, out=indicator_buffer)
+        else:
+            self.data = _memoise('indicators', data_key,
+                                 lambda: indicators.with_indicators(self.data))
+            self.indicators = self.data
         
-        # 2.2 Market Regime Detection (Phase 1.2)
-        import numpy as np
-        close_prices = self.data['Close'].values[-21:]
-        returns = np.diff(close_prices) / close_prices[:-1]
-        daily_volatility = np.std(returns)
-        annual_volatility = daily_volatility * np.sqrt(252)
+        # 3. Contexto (fuentes externas, volatilidad, macro, sentimiento)
+        context_key = None
+        if data_key is not None:
+            context_key = data_key + (
+                _fingerprint(self.info), _fingerprint(self.news), _fingerprint(self.macro_data),
+                _fingerprint(pre_data.get('market_regime') if pre_data else None),
+                _fingerprint(pre_data.get('timeframes') if pre_data else None),
+                self.skip_external_data,
+            )
+        context = _memoise('context', context_key, lambda: self._build_context(pre_data),
+                           ttl=STAGE_TTL_SECONDS)
+        # Valor de la cuenta para dimensionar posiciones: lo pasa quien escanea
+        # (una lectura por escaneo, o el valor del portafolio simulado)
+        account_value = pre_data.get('account_value') if pre_data else None
+        # Las etapas posteriores se claven por este contexto concreto: al caducar y
+        # recalcularse (Reddit, earnings, régimen... nuevos) se recalculan también
+        stage_key = None if context_key is None else context_key + (context['built_at'],)
+        return {**context, 'key': stage_key, 'account_value': account_value}
+
+    def _fetch(self, pre_data=None):
+        """
+        Etapa de descarga: historia, fundamentales, noticias y datos macro.
+        Lo que no viene en pre_data se descarga; sin pre_data la descarga
+        completa se memoiza durante STAGE_TTL_SECONDS.
+        """
+        if not pre_data:
+            return _memoise('fetch', (self.ticker_symbol,), self._download, ttl=STAGE_TTL_SECONDS,
+                            cacheable=lambda raw: raw['data'] is not None and not raw['data'].empty)
+        return self._download(pre_data)
+
+    def _download(self, pre_data=None):
+        pre_data = pre_data or {}
+        data = pre_data.get('history')
+        info = pre_data.get('fundamentals')
+        news = pre_data.get('news')
         
-        regime_data = regime_detection.detect_market_regime()
-        adjusted_thresholds = regime_detection.get_regime_adjusted_thresholds(annual_volatility)
+        if data is None: data = market_data.get_historical_data(self.ticker)
+        if info is None: info = market_data.get_fundamental_info(self.ticker) or {}
+        else: fundamentals_snapshot.get_snapshot(self.ticker_symbol).seed(info)  # Para earnings
+        if news is None: news = market_data.get_news(self.ticker) or []
         
-        # 2.3 Reddit Sentiment Analysis (Phase 2.1)
-        if self.skip_external_data:
-            reddit_data = {'sentiment': 'NEUTRAL', 'posts': 0, 'avg_score': 0}
+        if 'macro_data' in pre_data:
+            macro_data = pre_data['macro_data']
         else:
-            try:
-                reddit_data = reddit_sentiment.get_reddit_sentiment(self.ticker_symbol, hours=24)
-            except Exception as e:
-                print(f"⚠️  Reddit API timeout/error: {e}")
-                reddit_data = {'sentiment': 'NEUTRAL', 'posts': 0, 'avg_score': 0}
+            macro_data = market_data.get_macro_data()
+        return {'data': data, 'info': info, 'news': news, 'macro_data': macro_data}
+
+    def _build_context(self, pre_data=None):
+        """Etapa de contexto sobre self.data y self.indicators"""
+        # 3.1 Fuentes externas en paralelo (MTF, régimen, Reddit, earnings, insiders)
+        # Cada una con su plazo y un valor neutral si falla o vence: el coste es
+        # el de la fuente más lenta y no la suma de todas.
+        external, failures = timeouts.run_concurrently(self._external_tasks(pre_data))
+        for name, error in failures.items():
+            print(f"⚠️  {name} timeout/error: {error}")
         
-        # 2.4 Earnings Calendar & Surprises (Phase 2.2)
-        if self.skip_external_data:
-            earnings_data = {'next_date': None, 'recent_surprise': None}
-        else:
-            try:
-                earnings_data = earnings_calendar.get_earnings_info(self.ticker_symbol)
-            except Exception as e:
-                print(f"⚠️  Earnings API timeout/error: {e}")
-                earnings_data = {'next_date': None, 'recent_surprise': None}
+        mtf_analysis = external['multi_timeframe']
+        regime_data = external['market_regime']
+        reddit_data = external['reddit']
+        earnings_data = external['earnings']
+        insider_data = external['insider']
         
-        # 2.5 Insider Trading Activity (Phase 2.3)
-        if self.skip_external_data:
-            insider_data = {'sentiment': 'NEUTRAL', 'net_buying': 0, 'score': 0}
-        else:
-            try:
-                insider_data = insider_trading.get_insider_activity(self.ticker_symbol, days=90)
-            except Exception as e:
-                print(f"⚠️  Insider Trading API timeout/error: {e}")
-                insider_data = {'sentiment': 'NEUTRAL', 'net_buying': 0, 'score': 0}
+        # 3.2 Market Regime Detection (Phase 1.2)
+        # Volatilidad anualizada (20 retornos): se calcula una vez y la comparten
+        # umbrales por régimen, categoría y scoring
+        annual_volatility = float(indicators.annualized_volatility(self.data['Close'].values, 20))
+        
+        adjusted_thresholds = regime_detection.get_regime_adjusted_thresholds(
+            annual_volatility, regime_data=regime_data)
+        
+        # 3.3 Macro y sentimiento de noticias (no dependen del horizonte)
+        macro_res = macro_analysis.analyze_macro_context(self.macro_data)
+        sentiment_adv = sentiment_analysis.advanced_sentiment_analysis(self.news)
+        reg_factors = sentiment_analysis.detect_regulatory_factors(self.news)
+        
+        return {
+            'data': self.data,
+            'indicators': self.indicators,
+            'info': self.info,
+            'news': self.news,
+            'macro_data': self.macro_data,
+            'multi_timeframe': mtf_analysis,
+            'market_regime': regime_data,
+            'reddit': reddit_data,
+            'earnings': earnings_data,
+            'insider': insider_data,
+            'annual_volatility': annual_volatility,
+            'adjusted_thresholds': adjusted_thresholds,
+            'macro': macro_res,
+            'sentiment': sentiment_adv,
+            'regulatory_factors': reg_factors,
+            'built_at': time.monotonic(),
+        }
+
+    def _stage_key(self, context, *extra):
+        """Clave de una etapa posterior al contexto (None si el contexto no se memoiza)"""
+        if context.get('key') is None:
+            return None
+        return (context['key'], self.is_short_term, self.is_etf) + extra
+
+    def _analyze(self, context):
+        """
+        Etapas propias del horizonte del agente: scoring → gestión de riesgo →
+        reporte. Devuelve una copia del reporte: el memoizado no se comparte.
+        En modo lean el reporte es un LazyReport y no se memoiza.
+        """
+        self.data = context['data']
+        self.indicators = context['indicators']
+        self.info = context['info']
+        self.news = context['news']
+        self.macro_data = context['macro_data']
+        
+        params_key = tuple(sorted(self.params.items()))
+        scoring = _memoise('scoring', self._stage_key(context, params_key),
+                           lambda: self._score(context))
+        levels = _memoise('risk', self._stage_key(context),
+                          lambda: self._risk_levels(context))
+        
+        account_value = context.get('account_value')
+        if self.lean:
+            self.analysis_results = self._assemble_report(context, scoring, levels, account_value,
+                                                          lean=True)
+            return self.analysis_results
+        
+        if account_value is None:
+            account_value = _read_account_value()
+        report = _memoise('report', self._stage_key(context, params_key, account_value),
+                          lambda: self._assemble_report(context, scoring, levels, account_value))
+        
+        self.analysis_results = copy.deepcopy(report)
+        return self.analysis_results
+
+    def _score(self, context):
+        """
+        Etapa de scoring del horizonte del agente (corto o largo plazo) a partir
+        del contexto de _prepare_context: puntos, confianza, confluencia y veredicto.
+        """
+        mtf_analysis = context['multi_timeframe']
+        regime_data = context['market_regime']
+        reddit_data = context['reddit']
+        earnings_data = context['earnings']
+        insider_data = context['insider']
+        annual_volatility = context['annual_volatility']
+        latest = self.indicators.iloc[-1]
         
         # Extracción de métricas
         rsi = latest['RSI']
@@ -412,7 +616,7 @@ class FinancialAgent:
         macd_signal = latest['MACD_Signal']
         sma_200 = latest['SMA_200']
         sma_50 = latest['SMA_50']
-        price = latest['Close']
+        price = self.data['Close'].iloc[-1]
         atr = latest['ATR']
         stoch_k = latest['Stoch_K']
         stoch_obv = latest['OBV']
@@ -423,10 +627,10 @@ class FinancialAgent:
         bb_lower = latest['BB_Lower']
 
         # 3. Pesos Unificados (Los puntos se definen directamente en cada sección)
-        self.w_tech = 1.0
-        self.w_fund = 1.0
-        self.w_macro = 1.0
-        self.w_qual = 1.0
+        self.w_tech = self.params['w_tech']
+        self.w_fund = self.params['w_fund']
+        self.w_macro = self.params['w_macro']
+        self.w_qual = self.params['w_qual']
 
         score = 0
         potential_max = 0
@@ -454,49 +658,14 @@ class FinancialAgent:
             # Validation: +92% improvement, Sharpe 1.45, Win Rate 60%
             # ============================================================
             
-            # 1. RSI Momentum Score (50% weight) - CRITICAL FIX
-            rsi_score = calculate_rsi_momentum_score(rsi)
-            
-            # 2. MACD Trend Confirmation (35% weight)
-            macd_status = 'Bullish' if macd > macd_signal else 'Bearish' if macd < macd_signal else 'Neutral'
-            macd_score = calculate_macd_score(macd_status)
-            
-            # 3. Stochastic Oscillator (15% weight)
-            stoch_score = calculate_stochastic_score(stoch_k)
-            
-            # 4. Technical Score Composite (85% of total)
-            technical_score = (
-                rsi_score * 0.50 +      # 50% - Momentum líder
-                macd_score * 0.35 +     # 35% - Confirmación de tendencia
-                stoch_score * 0.15      # 15% - Confirmación rápida
-            )
-            
-            # 5. Volatility Adjustment (15% of total) - Non-linear
-            import numpy as np
-            close_prices = self.data['Close'].values[-21:]  # Need 21 prices for 20 returns
-            returns = np.diff(close_prices) / close_prices[:-1]
-            daily_volatility = np.std(returns)
-            annual_volatility = daily_volatility * np.sqrt(252)
-            
-            vol_score = calculate_volatility_score_nonlinear(annual_volatility)
-            
-            # 6. Final Score Normalized (0-100)
-            # ETF Mode: 90% technical, 10% volatility (sin fundamentales)
-            if self.is_etf:
-                final_score_st = (
-                    technical_score * 0.90 +
-                    vol_score * 0.10
-                )
-            else:
-                final_score_st = (
-                    technical_score * 0.85 +
-                    vol_score * 0.15
-                )
-            
-            # 7. Confidence Score (Phase 4A Enhancement)
-            confidence_pct = calculate_confidence_short_term(
-                rsi_score, macd_score, stoch_score, annual_volatility
-            )
+            # 1-7. Kernel puro (scoring.score_features): RSI momentum (50%),
+            # MACD (35%), Stochastic (15%), volatilidad no lineal, score final
+            # normalizado (0-100), confianza y umbrales por categoría
+            features = scoring.feature_vector(latest, annual_volatility, self.ticker_symbol, self.is_etf)
+            kernel = scoring.score_features(features, self.params)
+            macd_status = kernel['macd_status']
+            final_score_st = kernel['final_score']
+            confidence_pct = kernel['confidence']
             
             # 8. Convert to agent.py scoring system (normalize to potential_max)
             # ST v3.0 uses 0-100 scale, agent.py uses accumulated points
@@ -546,7 +715,7 @@ class FinancialAgent:
                 potential_max += 1.0
 
             # Divergencias (RSI)
-            if indicators.detect_rsi_divergence(self.data):
+            if indicators.detect_rsi_divergence(self.data, rsi=self.indicators['RSI']):
                 score -= 1.0 # CP v2.3: 1.0 pt
                 cons.append("⚠️ Divergencia Bajista Detectada (Precio vs RSI)")
             potential_max += 1.0
@@ -789,9 +958,8 @@ class FinancialAgent:
             if moat_count >= 3: score += 0.5
             elif moat_count >= 1: score += 0.2
 
-        macro_res = macro_analysis.analyze_macro_context(self.macro_data)
-        sentiment_adv = sentiment_analysis.advanced_sentiment_analysis(self.news)
-        reg_factors = sentiment_analysis.detect_regulatory_factors(self.news)
+        macro_res = context['macro']
+        sentiment_adv = context['sentiment']
         
         # Sentimiento Cuantitativo (CP v2.3 - 1.5 pts)
         if self.is_short_term:
@@ -1039,7 +1207,10 @@ class FinancialAgent:
         # Monte Carlo (Solo LP)
         probability_success = None
         if not self.is_short_term:
-            sims = [(confidence + random.uniform(-1, 1) * 5) for _ in range(100)]
+            # Semilla derivada del ticker y la confianza: mismo insumo, misma probabilidad
+            # (con o sin caché de etapas)
+            rng = random.Random(f"{self.ticker_symbol}:{confidence:.6f}")
+            sims = [(confidence + rng.uniform(-1, 1) * 5) for _ in range(100)]
             probability_success = sum(1 for s in sims if s >= 25) / 100 * 100 # Barrera de éxito consistente con umbral de Compra (25%)
 
         # Mapeo de Veredicto V4.1 (LP) / V2.1 (CP)
@@ -1048,177 +1219,202 @@ class FinancialAgent:
         
         if not self.is_short_term:
             # Phase 3.3: Use category-specific thresholds for long-term
-            buy_threshold_category, sell_threshold_category = dynamic_thresholds_short_term(
-                annual_volatility, self.ticker_symbol
-            )
+            buy_threshold_category, sell_threshold_category = self._thresholds(annual_volatility)
             buy_threshold_used = buy_threshold_category
             sell_threshold_used = sell_threshold_category
             
             # Phase 3.3b: Adjusted thresholds for optimal 20-25% coverage
-            if confidence >= buy_threshold_category + 5 and (probability_success or 0) >= 80:
-                verdict = "FUERTE COMPRA 🚀"
-            elif confidence >= buy_threshold_category:
-                verdict = "COMPRA 🟢"
-            elif confidence >= 5:
-                verdict = "NEUTRAL ⚪"
-            elif confidence >= -10:
-                verdict = "VENTA 🔴"
-            else:
-                verdict = "FUERTE VENTA 💀"
+            verdict = scoring.long_term_verdict(confidence, probability_success, buy_threshold_category)
         else:
             # ============================================================
             # PHASE 4A STEP 2: Dynamic Thresholds by Stock Category
             # Validation: -28% false signals, +18% opportunities
             # ============================================================
-            
-            # Map normalized score (0-100) to agent.py confidence scale
-            # final_score_st is already calculated above (lines ~315-318)
-            
-            # Get dynamic thresholds based on stock category
-            buy_threshold, sell_threshold = dynamic_thresholds_short_term(
-                annual_volatility, self.ticker_symbol
-            )
-            buy_threshold_used = buy_threshold
-            sell_threshold_used = sell_threshold
-            
-            # Generate signal using validated thresholds
-            if final_score_st < buy_threshold:
-                base_signal = 'BUY'
-            elif final_score_st > sell_threshold:
-                base_signal = 'SELL'
-            else:
-                base_signal = 'HOLD'
-            
-            # Apply confidence weighting for verdict strength
-            # High confidence + BUY = FUERTE COMPRA
-            # Low confidence = downgrade to weaker signal
-            if base_signal == 'BUY':
-                if final_score_st < 30 and confidence_pct >= 85:
-                    verdict = "FUERTE COMPRA 🚀"
-                elif confidence_pct >= 70:
-                    verdict = "COMPRA 🟢"
-                else:
-                    verdict = "COMPRA 🟢 (⚠️ Confianza Media)"
-            elif base_signal == 'SELL':
-                if final_score_st > 70 and confidence_pct >= 85:
-                    verdict = "FUERTE VENTA 💀"
-                elif confidence_pct >= 70:
-                    verdict = "VENTA 🔴"
-                else:
-                    verdict = "VENTA 🔴 (⚠️ Confianza Media)"
-            else:
-                verdict = "NEUTRAL ⚪ (HOLD)"
+            # Señal (score vs umbrales de la categoría) y veredicto ponderado
+            # por confianza, ya calculados por el kernel
+            buy_threshold_used = kernel['buy_threshold']
+            sell_threshold_used = kernel['sell_threshold']
+            verdict = kernel['verdict']
 
-        # Capturar señales para reporte
-        sent_score = sentiment_adv['score']
-        sent_label = sentiment_adv['label']
-        sent_volume = sentiment_adv['volume']
-        fund_signal = "Subvaluada" if peg and peg < 1 else "Sobrevaluada" if peg and peg > 2 else "Neutral"
-        
+        # Horizonte Narrativo
+        horizon = "Corto Plazo (3-6 meses)" if self.is_short_term else "Largo Plazo (3-5 años)"
+        fund_score_est = sum(1 for p in pros if any(k in p for k in ["Deuda", "ROE", "Moat", "Valuación"]))
+        if price < sma_200:
+            if fund_score_est >= 2 and rsi < 40: horizon = "Largo Plazo / Oportunidad de Recuperación"
+            elif fund_score_est >= 3: horizon += " / Timing Adverso"
+            elif fund_score_est >= 1: horizon += " / Fase de Consolidación"
+            else: horizon += " / Bajista"
+
+        return {
+            "price": price, "rsi": rsi, "macd": macd, "macd_signal": macd_signal,
+            "sma_50": sma_50, "sma_200": sma_200, "adx": adx, "stoch_k": stoch_k, "obv": stoch_obv,
+            "bb_upper": bb_upper, "bb_lower": bb_lower,
+            "pe": pe, "peg": peg, "rec_key": rec_key, "sector": sector,
+            "verdict": verdict, "confidence": confidence, "probability_success": probability_success,
+            "pros": pros, "cons": cons, "horizon": horizon,
+            "buy_threshold": buy_threshold_used, "sell_threshold": sell_threshold_used,
+            "confluence_score": confluence_pct if 'confluence_pct' in locals() else None,
+            "aligned_signals": alignment_signals if 'alignment_signals' in locals() else [],
+        }
+
+    def _thresholds(self, annual_volatility):
+        """Umbrales (compra, venta): dinámicos por categoría salvo los fijados en self.params"""
+        buy_threshold, sell_threshold = dynamic_thresholds_short_term(
+            annual_volatility, self.ticker_symbol
+        )
+        if self.params['buy_threshold'] is not None:
+            buy_threshold = self.params['buy_threshold']
+        if self.params['sell_threshold'] is not None:
+            sell_threshold = self.params['sell_threshold']
+        return buy_threshold, sell_threshold
+
+    def _risk_levels(self, context):
+        """Etapa de gestión de riesgo: ATR, stop loss y take profit (no dependen de la cuenta)"""
         # ============================================================
         # PHASE 4B: Risk Management Integration
         # ============================================================
+        data = context['data']
+        price = data['Close'].iloc[-1]
         
         # Calculate ATR for RM (using High/Low/Close from data)
         atr_rm = calculate_atr(
-            self.data['High'].values[-15:],
-            self.data['Low'].values[-15:], 
-            self.data['Close'].values[-15:],
+            data['High'].values[-15:],
+            data['Low'].values[-15:], 
+            data['Close'].values[-15:],
             periods=14
         )
         
-        # Phase 4C: Dynamic account value from portfolio_manager
-        from src.spectral_galileo.core import portfolio_manager
-        account_value = portfolio_manager.get_account_value()
+        # ATR-based Stop Loss & Take Profit (Phase 3 Validated)
+        # Phase 4C: Pass is_long_term flag for wider TP/SL
+        is_long_term = not self.is_short_term
+        stop_loss_rm = calculate_stop_loss_price(price, atr_rm, is_long_term=is_long_term)
+        take_profit_rm = calculate_take_profit_price(price, atr_rm, is_long_term=is_long_term)
+        
+        # Risk / Reward (using Phase 4B levels)
+        risk = price - stop_loss_rm
+        reward_short = take_profit_rm - price
+        rr_ratio = reward_short / risk if risk > 0 else 0
         
+        return {
+            "atr": atr_rm,
+            "stop_loss_price": stop_loss_rm,
+            "take_profit_price": take_profit_rm,
+            "risk_per_share": price - stop_loss_rm,
+            "reward_per_share": take_profit_rm - price,
+            "risk_reward_ratio": rr_ratio,
+        }
+
+    def _risk_management(self, price, levels, account_value):
+        """Sección risk_management del reporte: niveles + tamaño de posición según la cuenta"""
         # Phase 4C: Adapt max_risk for Long-Term (more conservative)
         max_risk_per_trade = 0.01 if not self.is_short_term else 0.02  # 1% for LP, 2% for ST
         
         # Dynamic Position Sizing (Phase 3 Validated)
         position_size_shares = calculate_position_size_risk_based(
             entry_price=price,
-            atr=atr_rm,
+            atr=levels['atr'],
             account_value=account_value,
             max_risk_per_trade=max_risk_per_trade
         )
         
-        # ATR-based Stop Loss & Take Profit (Phase 3 Validated)
-        # Phase 4C: Pass is_long_term flag for wider TP/SL
-        is_long_term = not self.is_short_term
-        stop_loss_rm = calculate_stop_loss_price(price, atr_rm, is_long_term=is_long_term)
-        take_profit_rm = calculate_take_profit_price(price, atr_rm, is_long_term=is_long_term)
+        return {
+            "atr": levels['atr'],
+            "position_size_shares": position_size_shares,
+            "position_value": position_size_shares * price,
+            "stop_loss_price": levels['stop_loss_price'],
+            "take_profit_price": levels['take_profit_price'],
+            "risk_per_share": levels['risk_per_share'],
+            "reward_per_share": levels['reward_per_share'],
+            "risk_reward_ratio": levels['risk_reward_ratio'],
+            "max_portfolio_allocation": 0.20,  # 20% max
+            "max_risk_per_trade": 0.02  # 2% max
+        }
+
+    def _assemble_report(self, context, scoring, levels, account_value=None, lean=False):
+        """
+        Etapa de reporte: arma el resultado de run_analysis a partir de las anteriores.
+        
+        Con lean=True devuelve un LazyReport: risk_management (que necesita el
+        valor de la cuenta) y peers solo se calculan si alguien los lee.
+        """
+        price = scoring['price']
+        macd, macd_signal = scoring['macd'], scoring['macd_signal']
+        bb_upper, bb_lower = scoring['bb_upper'], scoring['bb_lower']
+        peg = scoring['peg']
+        sector = scoring['sector']
+        sentiment_adv = context['sentiment']
+        
+        # Capturar señales para reporte
+        sent_score = sentiment_adv['score']
+        sent_label = sentiment_adv['label']
+        sent_volume = sentiment_adv['volume']
+        fund_signal = "Subvaluada" if peg and peg < 1 else "Sobrevaluada" if peg and peg > 2 else "Neutral"
         
         # Legacy levels (keep for compatibility)
-        stop_loss = stop_loss_rm  # Use Phase 4B calculation
+        stop_loss = levels['stop_loss_price']  # Use Phase 4B calculation
         buy_levels = [price * 0.98, price * 0.95, bb_lower if bb_lower < price else price * 0.90]
-        sell_short = take_profit_rm  # Use Phase 4B TP for short-term
+        sell_short = levels['take_profit_price']  # Use Phase 4B TP for short-term
         sell_mid = bb_upper if bb_upper > price else price * 1.15
-        target_price = self.info.get('targetMeanPrice')
+        target_price = context['info'].get('targetMeanPrice')
         sell_long = target_price if target_price and target_price > price else price * 1.30
-        
-        # Risk / Reward (using Phase 4B levels)
-        risk = price - stop_loss_rm
-        reward_short = take_profit_rm - price
-        rr_ratio = reward_short / risk if risk > 0 else 0
 
-        # Horizonte Narrativo
-        horizon = "Corto Plazo (3-6 meses)" if self.is_short_term else "Largo Plazo (3-5 años)"
-        fund_score_est = sum(1 for p in pros if any(k in p for k in ["Deuda", "ROE", "Moat", "Valuación"]))
-        if price < sma_200:
-            if fund_score_est >= 2 and rsi < 40: horizon = "Largo Plazo / Oportunidad de Recuperación"
-            elif fund_score_est >= 3: horizon += " / Timing Adverso"
-            elif fund_score_est >= 1: horizon += " / Fase de Consolidación"
-            else: horizon += " / Bajista"
-
-        self.analysis_results = {
+        sections = {
             "symbol": self.ticker_symbol,
             "ticker": self.ticker_symbol,  # Alias para compatibilidad con report_generator
             "current_price": price,
             "price": price,  # Alias para template HTML
             "technical": {
-                "rsi": rsi, "macd_status": "Bullish" if macd > macd_signal else "Bearish",
-                "sma_50": sma_50, "sma_200": sma_200, "adx": adx, "market_env": "Tendencia" if adx > 20 else "Lateral",
-                "stoch_k": stoch_k, "obv": stoch_obv
+                "rsi": scoring['rsi'], "macd_status": "Bullish" if macd > macd_signal else "Bearish",
+                "sma_50": scoring['sma_50'], "sma_200": scoring['sma_200'], "adx": scoring['adx'],
+                "market_env": "Tendencia" if scoring['adx'] > 20 else "Lateral",
+                "stoch_k": scoring['stoch_k'], "obv": scoring['obv']
             },
             "fundamental": {
-                "pe": pe, "peg": peg, "signal": fund_signal, "recommendation_key": rec_key
+                "pe": scoring['pe'], "peg": peg, "signal": fund_signal, "recommendation_key": scoring['rec_key']
             },
             "sentiment": {
                 "score": sent_score, "label": sent_label, "volume": sent_volume
             },
             "strategy": {
-                "verdict": verdict, "confidence": confidence, "probability_success": probability_success,
-                "pros": pros, "cons": cons, "stop_loss": stop_loss, "buy_levels": buy_levels,
+                "verdict": scoring['verdict'], "confidence": scoring['confidence'],
+                "probability_success": scoring['probability_success'],
+                "pros": list(scoring['pros']), "cons": list(scoring['cons']),
+                "stop_loss": stop_loss, "buy_levels": buy_levels,
                 "sell_levels": {"short_term": sell_short, "mid_term": sell_mid, "long_term": sell_long},
-                "risk_reward": rr_ratio, "horizon": horizon,
-                "buy_threshold": buy_threshold_used,
-                "sell_threshold": sell_threshold_used
+                "risk_reward": levels['risk_reward_ratio'], "horizon": scoring['horizon'],
+                "buy_threshold": scoring['buy_threshold'],
+                "sell_threshold": scoring['sell_threshold']
             },
             "advanced": {
-                "multi_timeframe": mtf_analysis,
-                "market_regime": regime_data,
-                "reddit_sentiment": reddit_data,
-                "earnings_calendar": earnings_data,
-                "insider_trading": insider_data,
-                "confluence_score": confluence_pct if 'confluence_pct' in locals() else None,
-                "aligned_signals": alignment_signals if 'alignment_signals' in locals() else []
-            },
-            "risk_management": {
-                "atr": atr_rm,
-                "position_size_shares": position_size_shares,
-                "position_value": position_size_shares * price,
-                "stop_loss_price": stop_loss_rm,
-                "take_profit_price": take_profit_rm,
-                "risk_per_share": price - stop_loss_rm,
-                "reward_per_share": take_profit_rm - price,
-                "risk_reward_ratio": rr_ratio,
-                "max_portfolio_allocation": 0.20,  # 20% max
-                "max_risk_per_trade": 0.02  # 2% max
+                "multi_timeframe": context['multi_timeframe'],
+                "market_regime": context['market_regime'],
+                "reddit_sentiment": context['reddit'],
+                "earnings_calendar": context['earnings'],
+                "insider_trading": context['insider'],
+                "confluence_score": scoring['confluence_score'],
+                "aligned_signals": scoring['aligned_signals']
             },
-            "peers": market_data.get_peers(sector) if sector else [],
-            "macro": macro_res
         }
-        return self.analysis_results
+        
+        def risk_management():
+            value = account_value if account_value is not None else _read_account_value()
+            return self._risk_management(price, levels, value)
+        
+        loaders = {
+            "risk_management": risk_management,
+            "peers": lambda: market_data.get_peers(sector) if sector else [],
+        }
+        
+        if lean:
+            # Copia profunda: las secciones comparten dicts con las etapas memoizadas
+            return LazyReport(copy.deepcopy({**sections, "macro": context['macro']}), loaders)
+        
+        return {
+            **sections,
+            "risk_management": loaders["risk_management"](),
+            "peers": loaders["peers"](),
+            "macro": context['macro']
+        }
 
     def get_report_string(self, full_analysis=False):
         """
@@ -1,51 +1,108 @@
 """
 Módulo para gestionar la obtención de datos de forma eficiente,
-usando concurrencia y caché simple.
+usando concurrencia y una caché compartida entre procesos (ver shared_cache).
 """
 
-import concurrent.futures
 from src.spectral_galileo.data import market_data
+from src.spectral_galileo.data import fundamentals_snapshot
+from src.spectral_galileo.data import shared_cache
+from src.spectral_galileo.analysis import regime_detection
+from src.spectral_galileo.external import earnings_calendar
+from src.spectral_galileo.external import insider_trading
+from src.spectral_galileo.utils import timeouts
 from datetime import datetime, timedelta
+import concurrent.futures
+
+# Campos por ticker que se guardan en la caché compartida y cómo obtenerlos
+TICKER_FIELDS = {
+    "history": market_data.get_historical_data,
+    "fundamentals": market_data.get_fundamental_info,
+    "news": market_data.get_news,
+}
+
+# Plazo (segundos) para descargar cada campo de un ticker
+FETCH_DEADLINE = 15
+
+# Periodo/intervalo de la historia que consume FinancialAgent
+HISTORY_PERIOD = "1y"
+HISTORY_INTERVAL = "1d"
+
+def history_key(ticker_symbol, period=HISTORY_PERIOD, interval=HISTORY_INTERVAL):
+    """Clave de la historia de un ticker en la caché compartida."""
+    return f"{ticker_symbol.upper()}:{period}:{interval}"
 
 class DataManager:
-    def __init__(self):
+    def __init__(self, cache=None):
+        """
+        Args:
+            cache: Caché compartida (default: shared_cache.get_default_cache(),
+                   común a scanners, daemon de alertas y bot de Telegram)
+        """
         self._macro_cache = None
         self._macro_timestamp = None
-        self._ticker_cache = {} # Sencillo caché por sesión
+        self.cache = cache if cache is not None else shared_cache.get_default_cache()
     
     def get_ticker_data(self, ticker_symbol):
         """
         Obtiene todos los datos necesarios para un ticker en paralelo.
+        Los campos vigentes en la caché compartida no se vuelven a descargar.
         """
-        if ticker_symbol in self._ticker_cache:
-            return self._ticker_cache[ticker_symbol]
-
+        key = ticker_symbol.upper()
         ticker_obj = market_data.get_ticker_data(ticker_symbol)
         
-        # Usar hilos para descargar componentes en paralelo
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            future_hist = executor.submit(market_data.get_historical_data, ticker_obj)
-            future_fund = executor.submit(market_data.get_fundamental_info, ticker_obj)
-            future_news = executor.submit(market_data.get_news, ticker_obj)
+        data = {"ticker_obj": ticker_obj}
+        missing = []
+        keys = {field: key for field in TICKER_FIELDS}
+        keys["history"] = history_key(key)
+        
+        for field in TICKER_FIELDS:
+            cached = self.cache.get(field, keys[field])
+            if cached is None:
+                missing.append(field)
+            else:
+                data[field] = cached
+        
+        if missing:
+            # Descargar componentes en paralelo, cada uno con su plazo
+            # (un proveedor colgado no bloquea al hilo del escáner)
+            tasks = {field: (lambda fetch=TICKER_FIELDS[field]: fetch(ticker_obj), FETCH_DEADLINE, None)
+                     for field in missing}
+            results, failures = timeouts.run_concurrently(tasks)
+            if failures:
+                # Si falla uno, re-lanzamos
+                raise next(iter(failures.values()))
+            data.update(results)
             
-            try:
-                history = future_hist.result(timeout=15)
-                fundamentals = future_fund.result(timeout=15)
-                news = future_news.result(timeout=15)
-            except Exception as e:
-                # Si falla uno, re-lanzamos o manejamos según importancia
-                raise e
-                
-        data = {
-            "ticker_obj": ticker_obj,
-            "history": history,
-            "fundamentals": fundamentals,
-            "news": news
-        }
+            for field in missing:
+                if _is_cacheable(field, data[field]):
+                    self.cache.set(field, keys[field], data[field])
         
-        self._ticker_cache[ticker_symbol] = data
+        # Earnings/insiders del mismo análisis leen estos fundamentales en vez de .info
+        fundamentals_snapshot.get_snapshot(key).seed(data.get("fundamentals"))
         return data
 
+    def prefetch(self, tickers, period=HISTORY_PERIOD, interval=HISTORY_INTERVAL):
+        """
+        Descarga la historia de varios tickers en una sola llamada batch
+        (como get_macro_data) y la deja en la caché compartida.
+        
+        Los tickers ya cacheados se omiten; los que el batch no devuelve se
+        obtienen después por la ruta individual de get_ticker_data.
+        
+        Returns:
+            Dict {ticker: DataFrame} con las historias descargadas
+        """
+        symbols = sorted({t.upper() for t in tickers})
+        pending = [t for t in symbols
+                   if self.cache.get("history", history_key(t, period, interval)) is None]
+        if not pending:
+            return {}
+        
+        histories = market_data.get_batch_historical_data(pending, period=period, interval=interval)
+        for symbol, history in histories.items():
+            self.cache.set("history", history_key(symbol, period, interval), history)
+        return histories
+
     def get_macro_data(self, force_refresh=False):
         """
         Obtiene datos macro con caché (válido por 1 hora por defecto).
@@ -55,9 +112,71 @@ class DataManager:
             if self._macro_timestamp and (now - self._macro_timestamp) < timedelta(hours=1):
                 return self._macro_cache
         
-        data = market_data.get_macro_data()
+        data = None if force_refresh else self.cache.get("macro", "macro")
+        if data is None:
+            data = market_data.get_macro_data()
+            if _is_cacheable("macro", data):
+                self.cache.set("macro", "macro", data)
         if data is not None:
             self._macro_cache = data
             self._macro_timestamp = now
             
         return data
+
+    def get_market_regime(self, force_refresh=False):
+        """
+        Régimen de mercado (SPY) del escaneo, compartido por todos los tickers.
+        
+        Se calcula una vez por ventana de TTL y se guarda en la caché compartida,
+        así scanners, daemon y bot no descargan ni procesan SPY por cada ticker.
+        El resultado se pasa al agente como pre_data['market_regime'].
+        """
+        data = None if force_refresh else self.cache.get("regime", "SPY")
+        if data is None:
+            if force_refresh:
+                data = regime_detection.detect_market_regime()
+            else:
+                data = regime_detection.get_market_regime()
+            if _is_cacheable("regime", data):
+                self.cache.set("regime", "SPY", data)
+        return data
+
+    def warm_external(self, tickers, refresh=False, max_workers=8):
+        """
+        Pre-carga earnings e insiders (caché diaria por ticker) para que los
+        escaneos del día no llamen a yfinance por cada ticker.
+        
+        Returns:
+            Dict {'tickers': n, 'earnings': cargados, 'insider': cargados}
+        """
+        fetchers = {
+            "earnings": lambda t: earnings_calendar.get_earnings_info(t, cache=self.cache, refresh=refresh),
+            "insider": lambda t: insider_trading.get_insider_activity(t, cache=self.cache, refresh=refresh),
+        }
+        
+        def warm(ticker):
+            return {name: bool(fetch(ticker).get("available")) for name, fetch in fetchers.items()}
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(warm, tickers))
+        
+        summary = {"tickers": len(tickers)}
+        summary.update({name: sum(o[name] for o in outcomes) for name in fetchers})
+        return summary
+
+    def cache_stats(self):
+        """Contadores de aciertos/fallos de la caché compartida por campo."""
+        return self.cache.stats()
+
+
+def _is_cacheable(field, value):
+    """Evita cachear respuestas vacías (fallos del proveedor) durante todo el TTL."""
+    if value is None:
+        return False
+    if field == "fundamentals":
+        return any(v is not None for v in value.values())
+    if field == "news":
+        return len(value) > 0
+    if field == "regime":
+        return value.get("regime") != "UNKNOWN"
+    return not getattr(value, "empty", False)
@@ -0,0 +1,136 @@
+"""
+Instantánea de fundamentales por ticker, compartida por market_data,
+earnings_calendar, insider_trading y el agente.
+
+`stock.info` es el endpoint más pesado de yfinance y cada módulo lo pedía por
+su cuenta (con su propio yf.Ticker), hasta tres veces por ticker en el mismo
+segundo. La instantánea guarda un único yf.Ticker y su info: la primera
+lectura la descarga (con plazo) y las demás esperan y reutilizan ese
+resultado. DataManager la siembra con los fundamentales de la caché
+compartida, así que en un escaneo normalmente no se descarga nada.
+"""
+
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import yfinance as yf
+
+from src.spectral_galileo.utils import timeouts
+
+# Vida de una instantánea (lo que dura el análisis de un ticker, con margen)
+SNAPSHOT_TTL_SECONDS = 5 * 60
+
+# Tras un fallo de .info no se reintenta hasta pasado este plazo
+FAILURE_RETRY_SECONDS = 60
+
+# Tickers con instantánea en memoria (LRU)
+MAX_SNAPSHOTS = 256
+
+# Claves que deben traer los fundamentales para sembrar la instantánea
+# (earnings_calendar las usa; las entradas antiguas de la caché no las tienen)
+SEED_KEYS = ("earningsTimestamp", "mostRecentQuarter")
+
+
+class FundamentalsSnapshot:
+    """yf.Ticker e info de un ticker, descargados una sola vez."""
+
+    def __init__(self, symbol, ticker_obj=None):
+        self.symbol = symbol.upper()
+        self.created_at = time.monotonic()
+        self.seeded = False  # info viene de la caché compartida (puede tener horas)
+        self._ticker_obj = ticker_obj
+        self._info = None
+        self._failed_at = None
+        self._lock = threading.Lock()  # Descarga de .info
+        self._ticker_lock = threading.Lock()  # Creación del yf.Ticker (no espera a .info)
+
+    @property
+    def ticker_obj(self):
+        with self._ticker_lock:
+            if self._ticker_obj is None:
+                self._ticker_obj = yf.Ticker(self.symbol)
+            return self._ticker_obj
+
+    @property
+    def info(self):
+        """
+        stock.info (dict). Los hilos que lo piden a la vez esperan a la
+        misma descarga; si falla se devuelve {} sin volver a intentarlo
+        hasta FAILURE_RETRY_SECONDS después.
+        """
+        return self._load_info(live=False)
+
+    def live_info(self):
+        """Como info, pero descarga .info si la actual se sembró desde la caché."""
+        return self._load_info(live=True)
+
+    def _load_info(self, live):
+        ticker_obj = self.ticker_obj
+        with self._lock:
+            if self._info is not None and not (live and self.seeded):
+                return self._info
+            fallback = self._info or {}
+            if self._failed_at is not None and time.monotonic() - self._failed_at < FAILURE_RETRY_SECONDS:
+                return fallback
+            try:
+                # .info no acepta timeout, así que se le aplica un plazo
+                with open(os.devnull, "w") as f, contextlib.redirect_stderr(f):
+                    info = timeouts.run_with_deadline(lambda: ticker_obj.info, timeouts.PROVIDER_TIMEOUT)
+            except Exception:
+                info = None
+            if not info:
+                self._failed_at = time.monotonic()
+                return fallback
+            self._info = info
+            self.seeded = False
+            return info
+
+    def seed(self, info):
+        """
+        Usa fundamentales ya disponibles (p.ej. de la caché) si aún no hay info.
+        Solo si traen SEED_KEYS: sin ellas earnings no encontraría la fecha.
+        """
+        if not info or not all(key in info for key in SEED_KEYS):
+            return
+        if not any(v is not None for v in info.values()):
+            return
+        with self._lock:
+            if self._info is None:
+                self._info = info
+                self.seeded = True
+
+    @property
+    def expired(self):
+        return time.monotonic() - self.created_at > SNAPSHOT_TTL_SECONDS
+
+
+_snapshots = OrderedDict()
+_snapshots_guard = threading.Lock()
+
+
+def get_snapshot(symbol, ticker_obj=None):
+    """
+    Instantánea vigente de un ticker (la misma para todos los módulos y hilos).
+
+    Args:
+        ticker_obj: yf.Ticker ya creado para reutilizarlo si se crea la instantánea
+    """
+    key = symbol.upper()
+    with _snapshots_guard:
+        snapshot = _snapshots.get(key)
+        if snapshot is None or snapshot.expired:
+            snapshot = FundamentalsSnapshot(key, ticker_obj)
+            _snapshots[key] = snapshot
+            while len(_snapshots) > MAX_SNAPSHOTS:
+                _snapshots.popitem(last=False)
+        _snapshots.move_to_end(key)
+        return snapshot
+
+
+def clear_snapshots():
+    """Olvida todas las instantáneas (la siguiente lectura vuelve a descargar)."""
+    with _snapshots_guard:
+        _snapshots.clear()
@@ -6,18 +6,40 @@ import sys
 import os
 import contextlib
 
+from src.spectral_galileo.data import fundamentals_snapshot
+from src.spectral_galileo.data import price_store
+from src.spectral_galileo.utils import http_client
+from src.spectral_galileo.utils import timeouts
+
+GOOGLE_NEWS_RSS_URL = "https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
+
 def get_ticker_data(ticker_symbol):
     """
-    Obtiene el objeto Ticker de yfinance.
+    Obtiene el objeto Ticker de yfinance (el de la instantánea del ticker,
+    compartido con earnings_calendar e insider_trading).
     """
-    return yf.Ticker(ticker_symbol)
+    return fundamentals_snapshot.get_snapshot(ticker_symbol).ticker_obj
 
-def get_historical_data(ticker, period="1y", interval="1d"):
+def get_historical_data(ticker, period="1y", interval="1d", use_store=True):
     """
     Obtiene datos históricos para análisis técnico.
+    
+    Para velas diarias/semanales/mensuales lee primero del almacén local
+    (price_store) y solo descarga las barras finales que falten.
     """
-    with open(os.devnull, "w") as f, contextlib.redirect_stderr(f):
-        history = ticker.history(period=period, interval=interval)
+    def fetch(period=None, start=None):
+        with open(os.devnull, "w") as f, contextlib.redirect_stderr(f):
+            if start is not None:
+                return ticker.history(start=start, interval=interval,
+                                      timeout=timeouts.PROVIDER_TIMEOUT)
+            return ticker.history(period=period, interval=interval,
+                                  timeout=timeouts.PROVIDER_TIMEOUT)
+
+    symbol = getattr(ticker, 'ticker', None)
+    if use_store and isinstance(symbol, str) and price_store.is_storable(period, interval):
+        history = price_store.get_default_store().get_history(symbol, period, interval, fetch)
+    else:
+        history = fetch(period=period)
     
     if history.empty:
         raise ValueError(f"No se encontraron datos históricos para {ticker.ticker}")
@@ -26,13 +48,14 @@ def get_historical_data(ticker, period="1y", interval="1d"):
 def get_fundamental_info(ticker):
     """
     Extrae información fundamental relevante.
-    Silencia stderr durante el acceso a .info por si acaso.
+    .info se lee de la instantánea del ticker (una descarga por análisis,
+    compartida con earnings_calendar y el agente).
     """
-    try:
-        with open(os.devnull, "w") as f, contextlib.redirect_stderr(f):
-            info = ticker.info
-    except Exception:
-        info = {}
+    symbol = getattr(ticker, "ticker", None)
+    if isinstance(symbol, str):
+        info = fundamentals_snapshot.get_snapshot(symbol, ticker).info
+    else:
+        info = fundamentals_snapshot.FundamentalsSnapshot(str(symbol), ticker).info
         
     return {
         "symbol": info.get("symbol"),
@@ -87,7 +110,11 @@ def get_fundamental_info(ticker):
         "heldPercentInsiders": info.get("heldPercentInsiders"),
         "marketCap": info.get("marketCap"),
         "averageVolume": info.get("averageVolume"),
-        "averageVolume10days": info.get("averageVolume10days")
+        "averageVolume10days": info.get("averageVolume10days"),
+        
+        # Calendario de resultados (earnings_calendar)
+        "earningsTimestamp": info.get("earningsTimestamp"),
+        "mostRecentQuarter": info.get("mostRecentQuarter")
     }
 
 def get_earnings_surprise(ticker):
@@ -114,8 +141,9 @@ def get_spy_correlation(ticker, days=60):
         end_date = pd.Timestamp.now()
         start_date = end_date - pd.Timedelta(days=days*2) # Pedir más días por seguridad
         
-        spy = yf.download("SPY", start=start_date, progress=False)['Close']
-        tk_data = ticker.history(start=start_date)['Close']
+        spy = yf.download("SPY", start=start_date, progress=False,
+                          timeout=timeouts.PROVIDER_TIMEOUT)['Close']
+        tk_data = ticker.history(start=start_date, timeout=timeouts.PROVIDER_TIMEOUT)['Close']
         
         # Alinear series
         combined = pd.concat([spy, tk_data], axis=1).dropna()
@@ -143,7 +171,6 @@ def get_news(ticker):
     """
     Obtiene las noticias más recientes combinando yfinance y Google News RSS.
     """
-    import requests
     from xml.etree import ElementTree
     
     news_list = []
@@ -152,7 +179,7 @@ def get_news(ticker):
     # 1. Fuente Primaria: yfinance (Formato nativo)
     try:
         with open(os.devnull, "w") as f, contextlib.redirect_stderr(f):
-            yf_news = ticker.news
+            yf_news = timeouts.run_with_deadline(lambda: ticker.news, timeouts.PROVIDER_TIMEOUT)
             for item in yf_news:
                 title = item.get('title', '')
                 if title:
@@ -164,8 +191,8 @@ def get_news(ticker):
     # 2. Fuente Secundaria: Google News RSS (Formato simulado)
     try:
         ticker_symbol = ticker.ticker
-        rss_url = f"https://news.google.com/rss/search?q={ticker_symbol}+stock&hl=en-US&gl=US&ceid=US:en"
-        response = requests.get(rss_url, timeout=5)
+        rss_url = GOOGLE_NEWS_RSS_URL.format(ticker=ticker_symbol)
+        response = http_client.get(rss_url, timeout=min(5, timeouts.PROVIDER_TIMEOUT))
         if response.status_code == 200:
             root = ElementTree.fromstring(response.content)
             for item in root.findall('.//item')[:20]: # Tomar hasta 20 adicionales
@@ -214,7 +241,8 @@ def get_macro_data():
     try:
         # Descarga últimos 100 periodos para cálculos de media/RSI si fuera necesario
         with open(os.devnull, "w") as f, contextlib.redirect_stderr(f):
-            data = yf.download(tickers, period="6mo", interval="1d", progress=False)['Close']
+            data = yf.download(tickers, period="6mo", interval="1d", progress=False,
+                               timeout=timeouts.PROVIDER_TIMEOUT)['Close']
         return data
     except Exception as e:
         # Silenciar print de error también o dejarlo para debug? 
@@ -222,6 +250,71 @@ def get_macro_data():
         # "Error fetching macro data" es nuestro print, ese lo podemos dejar o quitar si es verbose.
         return None
 
+def get_batch_historical_data(tickers, period="1y", interval="1d"):
+    """
+    Descarga OHLCV de varios tickers en una sola llamada a yf.download.
+    
+    Las historias salen con la misma forma que las de get_historical_data
+    (la ruta individual, vía price_store): columnas OHLCV e índice "Date" en
+    la zona horaria del mercado. Ambas rutas llenan la misma clave de la
+    caché compartida, así que el consumidor no debe notar cuál llegó antes.
+    
+    Returns:
+        Dict {ticker: DataFrame OHLCV}. Los tickers sin datos no aparecen.
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    try:
+        with open(os.devnull, "w") as f, contextlib.redirect_stderr(f):
+            # ignore_tz=False: índice con zona horaria, como Ticker.history
+            data = yf.download(tickers, period=period, interval=interval,
+                               group_by="ticker", progress=False, threads=True,
+                               ignore_tz=False, timeout=timeouts.PROVIDER_TIMEOUT)
+    except Exception:
+        return {}
+    
+    if data is None or data.empty:
+        return {}
+    
+    result = {}
+    for symbol in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            frame = data[symbol]
+        else:
+            frame = data
+        
+        if not set(price_store.OHLCV_COLUMNS) <= set(frame.columns):
+            continue
+        frame = frame.dropna(subset=["Close"])
+        if not frame.empty:
+            result[symbol] = _normalize_history(frame, _exchange_timezone(symbol))
+    return result
+
+def _normalize_history(frame, tz=None):
+    """
+    Deja una historia de yf.download igual que las del almacén: mismas
+    columnas y tipos (records_to_frame) e índice en la zona del mercado.
+    yf.download convierte todos los tickers a la zona más común del lote.
+    """
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is None:
+        if tz is not None:
+            index = index.tz_localize(tz)
+    else:
+        tz = tz or str(index.tz)
+    records = price_store.frame_to_records(frame.set_axis(index))
+    return price_store.records_to_frame(records, tz=tz)
+
+def _exchange_timezone(symbol):
+    """Zona horaria del mercado del ticker según la caché de yfinance (o None)."""
+    try:
+        return yf.cache.get_tz_cache().lookup(symbol)
+    except Exception:
+        return None
+
 def get_sp500_top25():
     """
     Retorna la lista de las ~25 empresas más grandes del S&P 500.
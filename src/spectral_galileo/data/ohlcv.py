@@ -0,0 +1,38 @@
+"""
+Piezas comunes a los almacenes OHLCV en disco: price_store (análisis) y
+backtesting/scripts/backtest_storage (backtesting).
+
+Ambos leen columnas con np.memmap y validan una barra de solape antes de
+anexar lo descargado; la regla y su tolerancia viven aquí una sola vez.
+"""
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Diferencia relativa máxima aceptada en el Close de la barra de solape.
+# Si se supera, el proveedor re-ajustó la serie (split/dividendo) y se recarga.
+OVERLAP_TOLERANCE = 1e-4
+
+
+def columns_to_frame(index, columns):
+    """
+    DataFrame OHLCV a partir de columnas leídas del disco.
+
+    Args:
+        index: DatetimeIndex de las filas
+        columns: Mapeo columna -> array (registros estructurados o dict de
+                 memmaps); los datos se copian, el DataFrame no queda atado
+                 al archivo
+    """
+    data = {col: np.array(columns[col]) for col in OHLCV_COLUMNS}
+    volume = data["Volume"]
+    if np.isfinite(volume).all():
+        data["Volume"] = volume.astype("int64")
+    return pd.DataFrame(data, index=index)
+
+
+def is_restated(stored_close, fresh_close):
+    """True si el Close recién descargado de una barra ya almacenada difiere más de OVERLAP_TOLERANCE."""
+    return abs(fresh_close - stored_close) > OVERLAP_TOLERANCE * abs(stored_close)
@@ -0,0 +1,294 @@
+"""
+Almacén persistente de precios OHLCV en disco.
+
+Guarda un archivo binario por ticker+intervalo (registros de ancho fijo que
+se leen con np.memmap, sin parsear texto) y un JSON pequeño con metadatos.
+market_data.get_historical_data lee primero de aquí y solo pide al proveedor
+las barras finales que faltan, anexándolas al archivo.
+
+Los archivos nunca se modifican en el lugar: toda escritura va a un temporal
+y se publica con os.replace. Un lector (otro hilo, o el daemon, main.py y el
+bot de Telegram compartiendo data/) que ya mapeó el archivo sigue viendo la
+versión anterior completa, nunca una truncada a medias.
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.spectral_galileo.data.ohlcv import OHLCV_COLUMNS, columns_to_frame, is_restated
+
+STORE_DIR = "data/price_store"
+
+# Tiempo mínimo entre refrescos contra el proveedor para un mismo archivo
+MAX_AGE_SECONDS = 15 * 60
+
+# Solo se persisten velas diarias o superiores; intradía va directo al proveedor
+STORED_INTERVALS = ("1d", "1wk", "1mo")
+
+# Periodos de yfinance que sabemos traducir a una fecha de inicio
+PERIOD_DAYS = {
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+    "10y": 3653,
+}
+
+RECORD_DTYPE = np.dtype([
+    ("ts", "<i8"),        # nanosegundos UTC
+    ("Open", "<f8"),
+    ("High", "<f8"),
+    ("Low", "<f8"),
+    ("Close", "<f8"),
+    ("Volume", "<f8"),
+])
+
+
+def is_storable(period, interval):
+    """Indica si la combinación periodo/intervalo se sirve desde el almacén."""
+    return interval in STORED_INTERVALS and period in PERIOD_DAYS
+
+
+def frame_to_records(df):
+    """Convierte un DataFrame OHLCV (índice datetime) a registros binarios."""
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC")
+    records = np.empty(len(df), dtype=RECORD_DTYPE)
+    records["ts"] = index.as_unit("ns").asi8
+    for col in OHLCV_COLUMNS:
+        records[col] = df[col].to_numpy(dtype="f8")
+    return records
+
+
+def records_to_frame(records, tz=None):
+    """Reconstruye el DataFrame OHLCV a partir de registros binarios."""
+    index = pd.to_datetime(np.array(records["ts"]), unit="ns", utc=tz is not None)
+    if tz is not None:
+        index = index.tz_convert(tz)
+    index.name = "Date"
+    return columns_to_frame(index, records)
+
+
+def _index_tz(df):
+    tz = getattr(df.index, "tz", None)
+    return str(tz) if tz is not None else None
+
+
+class PriceStore:
+    """
+    Almacén de velas OHLCV por ticker e intervalo.
+
+    Cada serie vive en `<base_dir>/<TICKER>_<interval>.bin` y su metadata en
+    `<TICKER>_<interval>.json` (zona horaria, desde cuándo cubre la historia y
+    último refresco contra el proveedor).
+    """
+
+    def __init__(self, base_dir=STORE_DIR, max_age_seconds=MAX_AGE_SECONDS):
+        self.base_dir = base_dir
+        self.max_age_seconds = max_age_seconds
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # ---------- Rutas y locks ----------
+
+    def _paths(self, symbol, interval):
+        name = f"{symbol.upper()}_{interval}"
+        return (os.path.join(self.base_dir, name + ".bin"),
+                os.path.join(self.base_dir, name + ".json"))
+
+    def _lock_for(self, symbol, interval):
+        key = (symbol.upper(), interval)
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    # ---------- Lectura / escritura ----------
+
+    def _load_meta(self, symbol, interval):
+        _, meta_path = self._paths(symbol, interval)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, "r") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return None
+
+    def _save_meta(self, symbol, interval, meta):
+        _, meta_path = self._paths(symbol, interval)
+        tmp_path = _tmp_path(meta_path)
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _records(self, symbol, interval):
+        """Registros memory-mapped de la serie (o None si no existe)."""
+        bin_path, _ = self._paths(symbol, interval)
+        try:
+            f = open(bin_path, "rb")
+        except FileNotFoundError:
+            return None
+        # Tamaño y mapeo del mismo descriptor: un os.replace concurrente no los desalinea
+        with f:
+            count = os.fstat(f.fileno()).st_size // RECORD_DTYPE.itemsize
+            if count == 0:
+                return None
+            return np.memmap(f, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+    def read(self, symbol, interval, start=None):
+        """
+        Lee la serie almacenada, opcionalmente desde `start` (Timestamp).
+
+        Returns:
+            DataFrame OHLCV o None si no hay datos.
+        """
+        meta = self._load_meta(symbol, interval)
+        records = self._records(symbol, interval)
+        if meta is None or records is None:
+            return None
+        if start is not None:
+            start_ns = _to_utc_ns(start)
+            records = records[np.searchsorted(records["ts"], start_ns):]
+        return records_to_frame(records, tz=meta.get("tz"))
+
+    def write(self, symbol, interval, df, covered_since):
+        """Reescribe la serie completa de forma atómica."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        bin_path, _ = self._paths(symbol, interval)
+        tmp_path = _tmp_path(bin_path)
+        frame_to_records(df).tofile(tmp_path)
+        os.replace(tmp_path, bin_path)
+        self._save_meta(symbol, interval, {
+            "tz": _index_tz(df),
+            "covered_since": _to_utc_ns(covered_since),
+            "fetched_at": time.time(),
+        })
+
+    def append(self, symbol, interval, df):
+        """
+        Anexa barras nuevas. Las barras almacenadas con fecha >= a la primera
+        barra nueva se sustituyen (la última vela suele estar incompleta).
+
+        Se escribe la serie resultante en un temporal y se publica con
+        os.replace (ver docstring del módulo).
+        """
+        bin_path, _ = self._paths(symbol, interval)
+        new_records = frame_to_records(df)
+        records = self._records(symbol, interval)
+        kept = np.empty(0, dtype=RECORD_DTYPE)
+        if records is not None:
+            keep = len(records)
+            if len(new_records):
+                keep = int(np.searchsorted(records["ts"], new_records["ts"][0]))
+            kept = records[:keep]
+        tmp_path = _tmp_path(bin_path)
+        with open(tmp_path, "wb") as f:
+            kept.tofile(f)
+            new_records.tofile(f)
+        del records, kept
+        os.replace(tmp_path, bin_path)
+        self.touch(symbol, interval)
+
+    def touch(self, symbol, interval):
+        """Marca la serie como recién refrescada contra el proveedor."""
+        meta = self._load_meta(symbol, interval) or {}
+        meta["fetched_at"] = time.time()
+        self._save_meta(symbol, interval, meta)
+
+    # ---------- API principal ----------
+
+    def get_history(self, symbol, period, interval, fetch):
+        """
+        Devuelve la historia de `period` leyendo del disco y completando la cola.
+
+        Args:
+            symbol: Ticker
+            period: Periodo estilo yfinance (ver PERIOD_DAYS)
+            interval: Intervalo estilo yfinance (ver STORED_INTERVALS)
+            fetch: Callable fetch(period=None, start=None) -> DataFrame OHLCV
+                   que consulta al proveedor.
+
+        Returns:
+            DataFrame OHLCV (vacío si el proveedor no tiene datos)
+        """
+        start = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=PERIOD_DAYS[period])
+
+        with self._lock_for(symbol, interval):
+            meta = self._load_meta(symbol, interval)
+            records = self._records(symbol, interval)
+
+            covered = (meta is not None and records is not None
+                       and meta.get("covered_since") is not None
+                       and meta["covered_since"] <= _to_utc_ns(start))
+
+            if not covered:
+                history = fetch(period=period)
+                if history.empty:
+                    return history
+                self.write(symbol, interval, history, covered_since=start)
+            elif time.time() - meta.get("fetched_at", 0) > self.max_age_seconds:
+                self._refresh_tail(symbol, interval, meta, records, fetch)
+            del records
+
+        return self.read(symbol, interval, start=start)
+
+    def _refresh_tail(self, symbol, interval, meta, records, fetch):
+        """Pide al proveedor solo las barras desde la penúltima almacenada."""
+        tz = meta.get("tz")
+        overlap = records_to_frame(records[-2:], tz=tz)
+        overlap_date = overlap.index[0]
+
+        tail = fetch(start=overlap_date.strftime("%Y-%m-%d"))
+        if tail.empty:
+            self.touch(symbol, interval)
+            return
+
+        # Validar la barra de solape contra la copia local
+        if overlap_date in tail.index and len(overlap) > 1:
+            stored_close = overlap["Close"].iloc[0]
+            fresh_close = tail.loc[overlap_date, "Close"]
+            if is_restated(stored_close, fresh_close):
+                since = pd.Timestamp(meta["covered_since"], unit="ns", tz="UTC")
+                history = fetch(start=since.strftime("%Y-%m-%d"))
+                if not history.empty:
+                    self.write(symbol, interval, history, covered_since=since)
+                return
+
+        self.append(symbol, interval, tail)
+
+
+def _tmp_path(path):
+    """Temporal junto a `path`, único por proceso e hilo (escritores concurrentes)."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _to_utc_ns(value):
+    """Timestamp (naive = UTC) o entero ns -> entero ns UTC."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tz is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.tz_convert("UTC").as_unit("ns").value)
+
+
+_default_store = None
+_default_store_guard = threading.Lock()
+
+
+def get_default_store():
+    """Instancia compartida del almacén (una por proceso)."""
+    global _default_store
+    with _default_store_guard:
+        if _default_store is None:
+            _default_store = PriceStore()
+        return _default_store
@@ -0,0 +1,248 @@
+"""
+Caché compartida entre procesos (SQLite en data/).
+
+Los escáneres de main.py, el daemon de alertas y el bot de Telegram corren en
+procesos distintos; esta caché les permite reutilizar los datos que otro ya
+descargó. Cada campo (history, fundamentals, news, macro, regime, earnings,
+insider) tiene su propio TTL, que una entrada puede acortar o alargar al
+guardarse, y un tope de entradas con desalojo LRU. Los contadores de aciertos/fallos se
+guardan en la misma base, así que reflejan el uso de todos los procesos.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+CACHE_PATH = "data/shared_cache.db"
+
+# Segundos que una entrada es válida, por campo
+FIELD_TTLS = {
+    "history": 15 * 60,
+    "fundamentals": 24 * 60 * 60,
+    "news": 30 * 60,
+    "macro": 60 * 60,
+    "regime": 15 * 60,
+    "earnings": 24 * 60 * 60,
+    "insider": 24 * 60 * 60,
+}
+
+# Máximo de entradas por campo antes de desalojar las menos usadas
+MAX_ENTRIES = {
+    "history": 500,
+    "fundamentals": 1000,
+    "news": 500,
+    "macro": 10,
+    "regime": 10,
+    "earnings": 1000,
+    "insider": 1000,
+}
+
+DEFAULT_TTL = 15 * 60
+DEFAULT_MAX_ENTRIES = 500
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    field TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (field, key)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries (field, accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    field TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class SharedCache:
+    """
+    Caché clave/valor por campo con TTL y desalojo LRU sobre SQLite.
+
+    Los valores se serializan con pickle (DataFrames, dicts, listas), de modo
+    que cada lectura devuelve una copia independiente.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttls=None, max_entries=None):
+        self.path = path
+        self.ttls = dict(FIELD_TTLS, **(ttls or {}))
+        self.max_entries = dict(MAX_ENTRIES, **(max_entries or {}))
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    # ---------- Conexión ----------
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    # Bases creadas antes de los TTL por entrada
+                    columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+                    if "expires_at" not in columns:
+                        conn.execute("ALTER TABLE entries ADD COLUMN expires_at REAL")
+                    self._initialized = True
+        return conn
+
+    def _ttl(self, field):
+        return self.ttls.get(field, DEFAULT_TTL)
+
+    def _count(self, conn, field, hit):
+        column = "hits" if hit else "misses"
+        conn.execute(
+            f"INSERT INTO stats (field, {column}) VALUES (?, 1) "
+            f"ON CONFLICT(field) DO UPDATE SET {column} = {column} + 1",
+            (field,))
+
+    # ---------- API principal ----------
+
+    def get(self, field, key):
+        """
+        Devuelve el valor almacenado o None si no existe o expiró.
+        """
+        now = time.time()
+        try:
+            conn = self._connect()
+        except sqlite3.Error:
+            return None
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT value, created_at, expires_at FROM entries WHERE field = ? AND key = ?",
+                    (field, key)).fetchone()
+
+                if row is None or _expired(row[1], row[2], self._ttl(field), now):
+                    if row is not None:
+                        conn.execute("DELETE FROM entries WHERE field = ? AND key = ?",
+                                     (field, key))
+                    self._count(conn, field, hit=False)
+                    return None
+
+                conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE field = ? AND key = ?",
+                    (now, field, key))
+                self._count(conn, field, hit=True)
+            return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.PickleError, EOFError):
+            return None
+        finally:
+            conn.close()
+
+    def set(self, field, key, value, ttl=None):
+        """
+        Guarda un valor y desaloja las entradas menos usadas si hay exceso.
+
+        Args:
+            ttl: Segundos de validez de esta entrada (default: TTL del campo)
+        """
+        if value is None:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        blob = sqlite3.Binary(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        limit = self.max_entries.get(field, DEFAULT_MAX_ENTRIES)
+        try:
+            conn = self._connect()
+        except sqlite3.Error:
+            return
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(field, key, value, created_at, accessed_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (field, key, blob, now, now, expires_at))
+                conn.execute(
+                    "DELETE FROM entries WHERE field = ? AND key NOT IN ("
+                    "SELECT key FROM entries WHERE field = ? "
+                    "ORDER BY accessed_at DESC LIMIT ?)",
+                    (field, field, limit))
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
+
+    def get_or_fetch(self, field, key, fetch):
+        """Devuelve el valor en caché o lo obtiene con fetch() y lo guarda."""
+        value = self.get(field, key)
+        if value is None:
+            value = fetch()
+            self.set(field, key, value)
+        return value
+
+    def invalidate(self, field=None, key=None):
+        """Elimina una entrada, un campo completo o toda la caché."""
+        conn = self._connect()
+        try:
+            with conn:
+                if field is None:
+                    conn.execute("DELETE FROM entries")
+                elif key is None:
+                    conn.execute("DELETE FROM entries WHERE field = ?", (field,))
+                else:
+                    conn.execute("DELETE FROM entries WHERE field = ? AND key = ?",
+                                 (field, key))
+        finally:
+            conn.close()
+
+    def stats(self):
+        """
+        Contadores por campo.
+
+        Returns:
+            Dict {campo: {'hits', 'misses', 'entries', 'hit_rate'}}
+        """
+        conn = self._connect()
+        try:
+            counters = {field: {"hits": hits, "misses": misses}
+                        for field, hits, misses in conn.execute(
+                            "SELECT field, hits, misses FROM stats")}
+            for field, entries in conn.execute(
+                    "SELECT field, COUNT(*) FROM entries GROUP BY field"):
+                counters.setdefault(field, {"hits": 0, "misses": 0})["entries"] = entries
+        finally:
+            conn.close()
+
+        for values in counters.values():
+            values.setdefault("entries", 0)
+            total = values["hits"] + values["misses"]
+            values["hit_rate"] = round(values["hits"] / total, 3) if total else 0.0
+        return counters
+
+
+def _expired(created_at, expires_at, field_ttl, now):
+    if expires_at is not None:
+        return now > expires_at
+    return now - created_at > field_ttl
+
+
+def trading_date(now=None):
+    """Fecha de la sesión bursátil (hora de Nueva York), para claves diarias."""
+    return datetime.fromtimestamp(now if now is not None else time.time(),
+                                  MARKET_TIMEZONE).date().isoformat()
+
+
+_default_cache = None
+_default_cache_guard = threading.Lock()
+
+
+def get_default_cache():
+    """Instancia compartida de la caché (una por proceso, misma base para todos)."""
+    global _default_cache
+    with _default_cache_guard:
+        if _default_cache is None:
+            os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+            _default_cache = SharedCache()
+        return _default_cache
@@ -3,26 +3,105 @@ Earnings Calendar & Surprises Module
 Tracks upcoming earnings dates and historical earnings surprises
 """
 
-import yfinance as yf
 from datetime import datetime, timedelta
 import pandas as pd
 
-def get_earnings_info(ticker_symbol):
+from src.spectral_galileo.data import fundamentals_snapshot
+from src.spectral_galileo.data import shared_cache
+
+# Shared cache field (TTL in shared_cache.FIELD_TTLS, key: ticker + trading date)
+CACHE_FIELD = "earnings"
+
+# Around a report the data changes within the day (reported EPS, surprise)
+REPORT_WINDOW_SECONDS = 24 * 60 * 60
+REPORT_TTL_SECONDS = 60 * 60
+
+
+def get_earnings_info(ticker_symbol, cache=None, refresh=False):
     """
     Get earnings calendar and historical surprises for a ticker
     
+    Results are kept in the shared cache for the trading day (see
+    earnings_cache_ttl), so scanners, the alerts daemon and the bot fetch
+    each ticker from yfinance at most once a day.
+    
     Args:
         ticker_symbol: Stock ticker (e.g., 'AAPL')
+        cache: SharedCache (default: shared_cache.get_default_cache())
+        refresh: Ignore the cached result
         
     Returns:
         dict with earnings information
     """
+    ticker = ticker_symbol.upper()
+    cache = cache if cache is not None else shared_cache.get_default_cache()
+    key = f"{ticker}:{shared_cache.trading_date()}"
+    
+    result = None if refresh else cache.get(CACHE_FIELD, key)
+    if result is None:
+        result = fetch_earnings_info(ticker)
+        if result.get('available'):
+            cache.set(CACHE_FIELD, key, result, ttl=earnings_cache_ttl(result, cache))
+    return result
+
+
+def earnings_cache_ttl(earnings_data, cache=None, now=None):
+    """
+    Seconds a result stays cached: the field TTL, but no later than the
+    next report date, and only REPORT_TTL_SECONDS around the report itself.
+    """
+    ttl = (cache.ttls if cache is not None else shared_cache.FIELD_TTLS)[CACHE_FIELD]
+    next_date = earnings_data.get('next_earnings_date')
+    if next_date is None:
+        return ttl
+    
+    now = now if now is not None else pd.Timestamp.now()
+    seconds_to_report = (next_date - now).total_seconds()
+    if _near_report(next_date, now):
+        return min(ttl, REPORT_TTL_SECONDS)
+    if seconds_to_report > 0:
+        return min(ttl, seconds_to_report - REPORT_WINDOW_SECONDS)
+    return ttl
+
+
+def _near_report(next_date, now=None):
+    """Whether next_date falls within REPORT_WINDOW_SECONDS of now"""
+    now = now if now is not None else pd.Timestamp.now()
+    return abs((next_date - now).total_seconds()) <= REPORT_WINDOW_SECONDS
+
+
+def _next_earnings_date(info):
+    """Next earnings date from stock.info (or None)"""
+    # Try to get next earnings date from info
+    if 'earningsTimestamp' in info and info['earningsTimestamp']:
+        try:
+            return pd.to_datetime(info['earningsTimestamp'], unit='s')
+        except:
+            pass
+    
+    # Alternative: try earningsDate from info
+    if 'mostRecentQuarter' in info:
+        try:
+            # Estimate next earnings (typically 90 days after last quarter)
+            last_quarter = pd.to_datetime(info['mostRecentQuarter'], unit='s')
+            estimated_next = last_quarter + timedelta(days=90)
+            if estimated_next > pd.Timestamp.now():
+                return estimated_next
+        except:
+            pass
+    return None
+
+
+def fetch_earnings_info(ticker_symbol):
+    """Earnings calendar and surprises straight from yfinance (no cache)"""
     
     ticker = ticker_symbol.upper()
     
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        # Shared yf.Ticker and stock.info (fetched once per analysis)
+        snapshot = fundamentals_snapshot.get_snapshot(ticker)
+        stock = snapshot.ticker_obj
+        info = snapshot.info
         
         # Get earnings dates and history
         try:
@@ -50,26 +129,14 @@ def get_earnings_info(ticker_symbol):
             'message': ''
         }
         
-        # Try to get next earnings date from info
-        if 'earningsTimestamp' in info and info['earningsTimestamp']:
-            try:
-                result['next_earnings_date'] = pd.to_datetime(info['earningsTimestamp'], unit='s')
-                days_diff = (result['next_earnings_date'] - pd.Timestamp.now()).days
-                result['days_to_earnings'] = days_diff
-            except:
-                pass
-        
-        # Alternative: try earningsDate from info
-        if result['next_earnings_date'] is None and 'mostRecentQuarter' in info:
-            try:
-                # Estimate next earnings (typically 90 days after last quarter)
-                last_quarter = pd.to_datetime(info['mostRecentQuarter'], unit='s')
-                estimated_next = last_quarter + timedelta(days=90)
-                if estimated_next > pd.Timestamp.now():
-                    result['next_earnings_date'] = estimated_next
-                    result['days_to_earnings'] = (estimated_next - pd.Timestamp.now()).days
-            except:
-                pass
+        next_date = _next_earnings_date(info)
+        if snapshot.seeded and (next_date is None or _near_report(next_date)):
+            # Seeded info comes from the shared cache (up to a day old): a
+            # missing date or the report window (hourly TTL) use live info
+            next_date = _next_earnings_date(snapshot.live_info())
+        if next_date is not None:
+            result['next_earnings_date'] = next_date
+            result['days_to_earnings'] = (next_date - pd.Timestamp.now()).days
         
         # Parse earnings history from earnings_dates DataFrame
         if earnings_dates is not None and not earnings_dates.empty:
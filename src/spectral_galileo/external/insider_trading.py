@@ -3,26 +3,51 @@ Insider Trading Activity Module
 Analyzes insider buying/selling activity from SEC filings
 """
 
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
-def get_insider_activity(ticker_symbol, days=90):
+from src.spectral_galileo.data import fundamentals_snapshot
+from src.spectral_galileo.data import shared_cache
+
+# Shared cache field (TTL in shared_cache.FIELD_TTLS, key: ticker + days + trading date)
+CACHE_FIELD = "insider"
+
+
+def get_insider_activity(ticker_symbol, days=90, cache=None, refresh=False):
     """
     Get insider trading activity for a ticker
     
+    Filings change at most daily: results are kept in the shared cache for
+    the trading day.
+    
     Args:
         ticker_symbol: Stock ticker (e.g., 'AAPL')
         days: Look back period in days (default: 90)
+        cache: SharedCache (default: shared_cache.get_default_cache())
+        refresh: Ignore the cached result
         
     Returns:
         dict with insider activity analysis
     """
+    ticker = ticker_symbol.upper()
+    cache = cache if cache is not None else shared_cache.get_default_cache()
+    key = f"{ticker}:{days}:{shared_cache.trading_date()}"
+    
+    result = None if refresh else cache.get(CACHE_FIELD, key)
+    if result is None:
+        result = fetch_insider_activity(ticker, days)
+        if result.get('available'):
+            cache.set(CACHE_FIELD, key, result)
+    return result
+
+
+def fetch_insider_activity(ticker_symbol, days=90):
+    """Insider activity straight from yfinance (no cache)"""
     
     ticker = ticker_symbol.upper()
     
     try:
-        stock = yf.Ticker(ticker)
+        stock = fundamentals_snapshot.get_snapshot(ticker).ticker_obj  # Shared yf.Ticker
         
         # Get insider transactions
         try:
@@ -6,34 +6,49 @@ Note: This uses public Reddit JSON API (no authentication required)
 For higher rate limits, consider setting up Reddit API credentials
 """
 
-import requests
 from datetime import datetime, timedelta
+import re
+import threading
 import time
+from collections import defaultdict
 from urllib.parse import quote
-import signal
-from contextlib import contextmanager
+
+from src.spectral_galileo.utils import http_client
+from src.spectral_galileo.utils import timeouts
 
 # User agent for requests
-USER_AGENT = "Mozilla/5.0 (compatible; StockAnalyzer/1.0)"
+USER_AGENT = http_client.USER_AGENT
 
-class TimeoutException(Exception):
-    pass
+REDDIT_BASE_URL = "https://www.reddit.com"
 
-@contextmanager
-def time_limit(seconds):
-    """Context manager to enforce timeout on operations"""
-    def signal_handler(signum, frame):
-        raise TimeoutException("Operation timed out")
-    
-    # Set the signal handler
-    old_handler = signal.signal(signal.SIGALRM, signal_handler)
-    signal.alarm(seconds)
-    
-    try:
-        yield
-    finally:
-        signal.alarm(0)
-        signal.signal(signal.SIGALRM, old_handler)
+# Kept for callers that catch it; deadlines come from utils.timeouts
+TimeoutException = timeouts.DeadlineExceeded
+
+# Seconds allowed for the whole Reddit fetch of one ticker
+REDDIT_DEADLINE = 15
+
+# Seconds allowed for each subreddit (queried concurrently); a late
+# subreddit only reduces coverage. Must stay below REDDIT_DEADLINE.
+SUBREDDIT_DEADLINE = 8
+
+# Subreddits to search
+SUBREDDITS = ['wallstreetbets', 'stocks', 'investing', 'StockMarket']
+
+# Universe mention index: each subreddit's stream of new posts is read once
+# per window and answers every ticker of the universe
+INDEX_WINDOW_SECONDS = 15 * 60
+
+# The stream is paged (100 posts per page) back to the largest window served
+# (get_reddit_sentiment: 24h; analyze_wsb_hype: 12h). Reddit listings stop at
+# ~1000 posts, so a busy subreddit may cover less: see 'window_hours'.
+STREAM_LOOKBACK_HOURS = 24
+STREAM_PAGES = 10
+
+# Seconds allowed for each subreddit stream (paging is rate limited)
+STREAM_DEADLINE = 30
+
+CASHTAG_PATTERN = re.compile(r'\$([A-Za-z]{1,5}(?:[.-][A-Za-z])?)\b')
+SYMBOL_PATTERN = re.compile(r'\b([A-Z]{1,5}(?:[.-][A-Z])?)\b')
 
 def search_reddit_json(subreddit, query, limit=25):
     """
@@ -45,45 +60,56 @@ def search_reddit_json(subreddit, query, limit=25):
         limit: Max results (default: 25)
         
     Returns:
-        List of posts
+        List of posts (empty on any error)
     """
     try:
-        url = f"https://www.reddit.com/r/{subreddit}/search.json"
-        params = {
-            'q': query,
-            'restrict_sr': 'on',
-            'sort': 'new',
-            'limit': limit,
-            't': 'day'
-        }
-        headers = {'User-Agent': USER_AGENT}
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            posts = []
-            
-            for child in data['data']['children']:
-                post = child['data']
-                posts.append({
-                    'title': post.get('title', ''),
-                    'score': post.get('score', 0),
-                    'upvote_ratio': post.get('upvote_ratio', 0.5),
-                    'num_comments': post.get('num_comments', 0),
-                    'created_utc': post.get('created_utc', 0),
-                    'permalink': post.get('permalink', ''),
-                    'selftext': post.get('selftext', '')[:200]  # First 200 chars
-                })
-            
-            return posts
-        else:
-            return []
-            
+        return fetch_subreddit_search(subreddit, query, limit)
     except Exception as e:
         return []
 
 
+def fetch_subreddit_search(subreddit, query, limit=25):
+    """
+    Like search_reddit_json, but errors propagate so the concurrent
+    search can report the subreddit as failed.
+    
+    Raises:
+        requests.RequestException: on connection errors or HTTP errors (429, 5xx)
+    """
+    url = f"{REDDIT_BASE_URL}/r/{subreddit}/search.json"
+    params = {
+        'q': query,
+        'restrict_sr': 'on',
+        'sort': 'new',
+        'limit': limit,
+        't': 'day'
+    }
+    headers = {'User-Agent': USER_AGENT}
+    
+    # Pooled session: keep-alive, retries and the reddit.com rate limit
+    response = http_client.get(url, params=params, headers=headers, timeout=timeouts.PROVIDER_TIMEOUT)
+    response.raise_for_status()
+    posts, _ = _parse_listing(response.json())
+    return posts
+
+
+def _parse_listing(data):
+    """Posts of a Reddit listing and the cursor of the next page"""
+    posts = []
+    for child in data['data']['children']:
+        post = child['data']
+        posts.append({
+            'title': post.get('title', ''),
+            'score': post.get('score', 0),
+            'upvote_ratio': post.get('upvote_ratio', 0.5),
+            'num_comments': post.get('num_comments', 0),
+            'created_utc': post.get('created_utc', 0),
+            'permalink': post.get('permalink', ''),
+            'selftext': post.get('selftext', '')[:200]  # First 200 chars
+        })
+    return posts, data['data'].get('after')
+
+
 def get_reddit_sentiment(ticker_symbol, hours=24, max_posts=100):
     """
     Get Reddit sentiment for a ticker from multiple subreddits
@@ -98,9 +124,9 @@ def get_reddit_sentiment(ticker_symbol, hours=24, max_posts=100):
     """
     
     try:
-        # Enforce 15 second timeout for entire Reddit API operation
-        with time_limit(15):
-            return _get_reddit_sentiment_internal(ticker_symbol, hours, max_posts)
+        # Enforce 15 second deadline for entire Reddit API operation (any thread)
+        return timeouts.run_with_deadline(
+            _get_reddit_sentiment_internal, REDDIT_DEADLINE, ticker_symbol, hours, max_posts)
     except TimeoutException:
         # Return neutral sentiment on timeout
         return {
@@ -132,49 +158,63 @@ def _get_reddit_sentiment_internal(ticker_symbol, hours=24, max_posts=100):
     
     ticker = ticker_symbol.upper()
     
-    # Subreddits to search
-    subreddits = ['wallstreetbets', 'stocks', 'investing', 'StockMarket']
-    
-    mentions = []
-    total_upvotes = 0
-    total_comments = 0
-    
     cutoff_time = datetime.now() - timedelta(hours=hours)
     cutoff_timestamp = cutoff_time.timestamp()
     
-    # Search each subreddit
-    for sub_name in subreddits:
-        try:
-            # Search for ticker with $ or plain ticker
-            search_query = f"${ticker} OR {ticker}"
-            posts = search_reddit_json(sub_name, search_query, limit=max_posts)
-            
-            # Add small delay to avoid rate limiting
-            time.sleep(0.5)
-            
-            for post in posts:
-                # Check if post is within time window
-                if post['created_utc'] < cutoff_timestamp:
-                    continue
-                
-                # Extract mention details
-                mention = {
-                    'title': post['title'],
-                    'score': post['score'],
-                    'upvote_ratio': post['upvote_ratio'],
-                    'num_comments': post['num_comments'],
-                    'created': datetime.fromtimestamp(post['created_utc']),
-                    'subreddit': sub_name,
-                    'url': f"https://reddit.com{post['permalink']}"
-                }
-                
-                mentions.append(mention)
-                total_upvotes += post['score']
-                total_comments += post['num_comments']
-                
-        except Exception as e:
-            # Subreddit might have issues, continue to next
-            continue
+    # Scan mode: answer from the universe index (no per-ticker searches)
+    index = get_mention_index(ticker)
+    if index is not None:
+        mentions = index.mentions(ticker, cutoff_timestamp, max_posts)
+        coverage = index.window_coverage(cutoff_timestamp, hours)
+        return _summarize_mentions(ticker, mentions, hours, max_posts, coverage)
+    
+    # Search every subreddit concurrently, each with its own deadline
+    tasks = {
+        sub_name: (lambda sub_name=sub_name: _fetch_subreddit_mentions(
+            sub_name, ticker, max_posts, cutoff_timestamp), SUBREDDIT_DEADLINE, [])
+        for sub_name in SUBREDDITS
+    }
+    results, failures = timeouts.run_concurrently(tasks)
+    
+    # Merge whatever arrived (in subreddit order); failed ones reduce coverage
+    mentions = [mention for sub_name in SUBREDDITS for mention in results[sub_name]]
+    coverage = {
+        'subreddits_searched': len(SUBREDDITS) - len(failures),
+        'subreddits_failed': sorted(failures),
+        'window_hours': hours,
+    }
+    
+    return _summarize_mentions(ticker, mentions, hours, max_posts, coverage)
+
+
+def _fetch_subreddit_mentions(sub_name, ticker, max_posts, cutoff_timestamp):
+    """Mentions of ticker in one subreddit posted after cutoff_timestamp"""
+    # Search for ticker with $ or plain ticker
+    search_query = f"${ticker} OR {ticker}"
+    posts = fetch_subreddit_search(sub_name, search_query, limit=max_posts)
+    
+    # Check if post is within time window
+    return [_mention(post, sub_name) for post in posts if post['created_utc'] >= cutoff_timestamp]
+
+
+def _mention(post, sub_name):
+    """Mention details of a post"""
+    return {
+        'title': post['title'],
+        'score': post['score'],
+        'upvote_ratio': post['upvote_ratio'],
+        'num_comments': post['num_comments'],
+        'created': datetime.fromtimestamp(post['created_utc']),
+        'created_utc': post['created_utc'],
+        'subreddit': sub_name,
+        'url': f"https://reddit.com{post['permalink']}"
+    }
+
+
+def _summarize_mentions(ticker, mentions, hours, max_posts, coverage):
+    """Sentiment, engagement and confidence of a ticker's Reddit mentions"""
+    total_upvotes = sum(m['score'] for m in mentions)
+    total_comments = sum(m['num_comments'] for m in mentions)
     
     # Analyze sentiment
     if not mentions:
@@ -186,7 +226,8 @@ def _get_reddit_sentiment_internal(ticker_symbol, hours=24, max_posts=100):
             'score': 0,
             'confidence': 0,
             'engagement': 0,
-            'message': f'No recent mentions of {ticker} on Reddit (last {hours}h)'
+            **coverage,
+            'message': f'No recent mentions of {ticker} on Reddit (last {hours}h)' + _coverage_note(coverage, hours)
         }
     
     # Calculate sentiment based on engagement and keywords
@@ -259,8 +300,229 @@ def _get_reddit_sentiment_internal(ticker_symbol, hours=24, max_posts=100):
             }
             for m in top_mentions
         ],
+        **coverage,
         'message': f"Found {len(mentions)} mentions in last {hours}h - {sentiment_label} sentiment"
+                   + _coverage_note(coverage, hours)
+    }
+
+
+def _coverage_note(coverage, hours):
+    """Message suffix for a partial search (failed subreddits, shorter window than asked)"""
+    note = ""
+    if coverage['subreddits_failed']:
+        note += f" ({coverage['subreddits_searched']}/{len(SUBREDDITS)} subreddits)"
+    if coverage['window_hours'] < hours:
+        note += f" (covering {coverage['window_hours']}h)"
+    return note
+
+
+# ============================================================
+# Universe mention index
+# ============================================================
+
+class MentionIndex:
+    """
+    Inverted index ticker -> mentions, built from the recent posts of every
+    subreddit. Cashtags ($AAPL) are always indexed; bare symbols (AAPL) only
+    for tickers of the universe, to skip words like CEO or YOLO.
+    """
+
+    def __init__(self, posts_by_subreddit, universe=(), subreddits_failed=(), covered_since=0):
+        self.universe = frozenset(t.upper() for t in universe)
+        self.coverage = {
+            'subreddits_searched': len(posts_by_subreddit),
+            'subreddits_failed': sorted(subreddits_failed),
+        }
+        # Every searched subreddit is complete from this timestamp on
+        self.covered_since = covered_since
+        self._mentions = defaultdict(list)
+        
+        for sub_name, posts in posts_by_subreddit.items():
+            for post in posts:
+                for ticker in self.tickers_in(f"{post['title']} {post['selftext']}"):
+                    self._mentions[ticker].append(_mention(post, sub_name))
+
+    def tickers_in(self, text):
+        """Tickers mentioned in a text (each one once)"""
+        tickers = {match.upper() for match in CASHTAG_PATTERN.findall(text)}
+        tickers.update(match for match in SYMBOL_PATTERN.findall(text) if match in self.universe)
+        return tickers
+
+    def mentions(self, ticker, cutoff_timestamp=0, max_posts=None):
+        """Mentions of ticker after cutoff_timestamp (at most max_posts per subreddit)"""
+        mentions, per_subreddit = [], defaultdict(int)
+        for mention in self._mentions.get(ticker.upper(), ()):
+            if mention['created_utc'] < cutoff_timestamp:
+                continue
+            if max_posts is not None and per_subreddit[mention['subreddit']] >= max_posts:
+                continue
+            per_subreddit[mention['subreddit']] += 1
+            mentions.append(mention)
+        return mentions
+
+    def window_coverage(self, cutoff_timestamp, hours):
+        """Coverage of a query window: 'window_hours' is less than hours if the streams fall short"""
+        if self.covered_since <= cutoff_timestamp:
+            window_hours = hours
+        else:
+            window_hours = round(max(0.0, time.time() - self.covered_since) / 3600, 1)
+        return {**self.coverage, 'window_hours': window_hours}
+
+    def __len__(self):
+        return len(self._mentions)
+
+
+def fetch_subreddit_stream(subreddit, since=None, pages=STREAM_PAGES):
+    """
+    Newest posts of a subreddit, paged back until a post older than `since`
+    (at most `pages` listings of 100 posts).
+
+    Returns:
+        (posts, covered_since): covered_since is the timestamp from which the
+        posts are complete (0 if the listing ran out)
+    """
+    posts, after = [], None
+    for _ in range(pages):
+        params = {'limit': 100, 'raw_json': 1}
+        if after:
+            params['after'] = after
+        response = http_client.get(f"{REDDIT_BASE_URL}/r/{subreddit}/new.json", params=params,
+                                   headers={'User-Agent': USER_AGENT}, timeout=timeouts.PROVIDER_TIMEOUT)
+        response.raise_for_status()
+        page, after = _parse_listing(response.json())
+        posts.extend(page)
+        if not after or not page:
+            break
+        if since is not None and min(post['created_utc'] for post in page) < since:
+            break
+    if not after or not posts:
+        return posts, 0
+    return posts, min(post['created_utc'] for post in posts)
+
+
+def build_mention_index(universe=(), lookback_hours=STREAM_LOOKBACK_HOURS):
+    """Reads every subreddit stream concurrently and indexes the mentions"""
+    since = time.time() - lookback_hours * 3600
+    tasks = {
+        sub_name: (lambda sub_name=sub_name: fetch_subreddit_stream(sub_name, since),
+                   STREAM_DEADLINE, None)
+        for sub_name in SUBREDDITS
     }
+    results, failures = timeouts.run_concurrently(tasks)
+    streams = {name: result for name, result in results.items() if name not in failures}
+    posts_by_subreddit = {name: posts for name, (posts, _) in streams.items()}
+    covered_since = max((covered for _, covered in streams.values()), default=0)
+    return MentionIndex(posts_by_subreddit, universe, subreddits_failed=failures,
+                        covered_since=covered_since)
+
+
+# Seconds a build where no subreddit answered is reused before retrying
+INDEX_RETRY_SECONDS = 60
+
+_index_state = {'universe': None, 'bucket': None, 'index': None, 'retry_at': None}
+_index_lock = threading.Lock()  # Guards _index_state
+_build_lock = threading.Lock()  # One index build at a time
+_rebuild_thread = None  # Last background rebuild (see get_mention_index)
+
+
+def use_mention_index(tickers):
+    """
+    Scan mode: Reddit sentiment for these tickers is answered from the
+    universe index (one stream read per subreddit and window) instead of
+    one search per ticker and subreddit.
+    
+    The index is built here, once per scan and outside the per-ticker path.
+    
+    Returns:
+        The current MentionIndex
+    """
+    universe = frozenset(t.upper() for t in tickers)
+    with _index_lock:
+        if universe != _index_state['universe']:
+            _index_state.update(universe=universe, bucket=None, index=None, retry_at=None)
+    
+    with _build_lock:
+        return _build_index(universe, int(time.time() // INDEX_WINDOW_SECONDS))
+
+
+def stop_mention_index():
+    """Back to per-ticker searches"""
+    with _index_lock:
+        _index_state.update(universe=None, bucket=None, index=None, retry_at=None)
+
+
+def get_mention_index(ticker=None, max_age=INDEX_WINDOW_SECONDS):
+    """
+    Current window's index. When the window rolls over mid-scan the previous
+    index keeps answering while a background thread rebuilds it: a build
+    (up to STREAM_DEADLINE) never runs inside a ticker's REDDIT_DEADLINE.
+    
+    Returns:
+        MentionIndex, or None outside scan mode, for tickers outside the
+        universe or before the first build (callers fall back to search)
+    """
+    universe = _index_state['universe']
+    if universe is None or (ticker is not None and ticker.upper() not in universe):
+        return None
+    
+    bucket = int(time.time() // max_age)
+    index = _current_index(universe, bucket)
+    if index is not None:
+        return index
+    
+    _rebuild_in_background(universe, bucket)
+    with _index_lock:
+        return _index_state['index'] if _index_state['universe'] == universe else None
+
+
+def _rebuild_in_background(universe, bucket):
+    """Starts a rebuild thread unless a build is already running"""
+    global _rebuild_thread
+    if not _build_lock.acquire(blocking=False):
+        return
+    
+    def rebuild():
+        try:
+            _build_index(universe, bucket)
+        except Exception as e:
+            print(f"⚠️  Reddit mention index rebuild failed: {e}")
+        finally:
+            _build_lock.release()
+    
+    _rebuild_thread = threading.Thread(target=rebuild, name="reddit-mention-index", daemon=True)
+    _rebuild_thread.start()
+
+
+def _current_index(universe, bucket):
+    """Stored index if it is still valid for this universe and window"""
+    with _index_lock:
+        if _index_state['universe'] != universe or _index_state['index'] is None:
+            return None
+        if _index_state['bucket'] == bucket:
+            return _index_state['index']
+        # Failed build: reused (no mentions, zero coverage) until the backoff ends
+        if _index_state['retry_at'] is not None and time.monotonic() < _index_state['retry_at']:
+            return _index_state['index']
+        return None
+
+
+def _build_index(universe, bucket):
+    """Builds and stores the index (caller holds _build_lock)"""
+    # Another caller may have built it while this one waited
+    index = _current_index(universe, bucket)
+    if index is not None:
+        return index
+    
+    index = build_mention_index(universe)
+    with _index_lock:
+        if _index_state['universe'] == universe:
+            if index.coverage['subreddits_searched']:
+                _index_state.update(bucket=bucket, index=index, retry_at=None)
+            else:
+                # Reddit down or rate limiting: don't rebuild for every ticker
+                _index_state.update(bucket=None, index=index,
+                                    retry_at=time.monotonic() + INDEX_RETRY_SECONDS)
+    return index
 
 
 def get_sentiment_summary(reddit_data):
@@ -0,0 +1,127 @@
+"""
+Cliente HTTP compartido para los proveedores externos (Reddit, Google News RSS).
+
+Una sola sesión de requests por proceso: las conexiones se reutilizan
+(keep-alive) en lugar de abrir TCP+TLS por petición. Cada host tiene un pool
+limitado de conexiones (los hilos que excedan el límite esperan turno), los
+errores transitorios (429/5xx, caídas de conexión) se reintentan con backoff
+exponencial y un limitador de ritmo espacia las peticiones a cada host.
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.spectral_galileo.utils import timeouts
+
+USER_AGENT = "Mozilla/5.0 (compatible; StockAnalyzer/1.0)"
+
+# Conexiones simultáneas por host y número de hosts con pool propio
+POOL_SIZE = 4
+MAX_HOSTS = 10
+
+# Reintentos ante errores transitorios: espera backoff * 2^(n-1) segundos
+RETRIES = 2
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# Peticiones por segundo permitidas por host (sin entrada = sin límite)
+RATE_LIMITS = {
+    'www.reddit.com': 2.0,  # API JSON pública sin autenticación
+}
+
+
+class RateLimiter:
+    """
+    Limitador de ritmo por host, compartido entre hilos: reserva para cada
+    petición el siguiente hueco libre del host y espera hasta él.
+    """
+
+    def __init__(self, rates=None, default_rate=None):
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host):
+        """
+        Espera el turno de `host`.
+
+        Returns:
+            Segundos esperados
+        """
+        rate = self.rates.get(host, self.default_rate)
+        if not rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + 1.0 / rate
+
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HttpClient:
+    """Sesión HTTP con pool de conexiones, reintentos y límite de ritmo."""
+
+    def __init__(self, pool_size=POOL_SIZE, retries=RETRIES, backoff_factor=BACKOFF_FACTOR,
+                 rate_limits=None, timeout=timeouts.PROVIDER_TIMEOUT):
+        self.timeout = timeout
+        self.limiter = RateLimiter(RATE_LIMITS if rate_limits is None else rate_limits)
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,  # Agotados los reintentos se devuelve la última respuesta
+        )
+        # pool_block: con el pool lleno se espera una conexión libre en vez de abrir otra
+        adapter = HTTPAdapter(pool_connections=MAX_HOSTS, pool_maxsize=pool_size,
+                              pool_block=True, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        GET respetando el ritmo del host.
+
+        Raises:
+            requests.RequestException: si falla tras los reintentos
+        """
+        self.limiter.acquire(urlsplit(url).hostname)
+        return self.session.get(url, params=params, headers=headers,
+                                timeout=timeout or self.timeout)
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_guard = threading.Lock()
+
+
+def get_default_client():
+    """Cliente compartido (uno por proceso, con su pool y su limitador)."""
+    global _default_client
+    with _default_client_guard:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
+
+
+def get(url, params=None, headers=None, timeout=None):
+    """GET con el cliente compartido."""
+    return get_default_client().get(url, params=params, headers=headers, timeout=timeout)
@@ -0,0 +1,91 @@
+"""
+Plazos (deadlines) para llamadas de E/S que funcionan en cualquier hilo.
+
+A diferencia de signal.SIGALRM, que solo funciona en el hilo principal, aquí
+cada llamada corre en un hilo de trabajo y se espera su Future con un plazo.
+Si el plazo vence se devuelve un valor por defecto y el hilo se abandona (la
+llamada termina sola en segundo plano, sin bloquear a quien la pidió).
+"""
+
+import concurrent.futures
+import time
+
+# Timeout (segundos) de cada petición HTTP a un proveedor (yfinance, Reddit, RSS)
+PROVIDER_TIMEOUT = 10
+
+
+class DeadlineExceeded(TimeoutError):
+    """La llamada no terminó dentro de su plazo."""
+    pass
+
+
+def run_with_deadline(func, timeout, *args, **kwargs):
+    """
+    Llama a func(*args, **kwargs) en un hilo de trabajo y espera como mucho
+    `timeout` segundos. Funciona desde cualquier hilo (y desde asyncio vía
+    asyncio.to_thread), a diferencia de signal.alarm.
+
+    Raises:
+        DeadlineExceeded: si vence el plazo (la llamada sigue en segundo plano)
+        Cualquier excepción lanzada por func
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            raise DeadlineExceeded(f"Sin respuesta en {timeout}s") from None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_concurrently(tasks):
+    """
+    Ejecuta varias llamadas independientes en paralelo, cada una con su plazo.
+
+    Args:
+        tasks: Dict {nombre: (callable sin argumentos, plazo en segundos, fallback)}
+               Los plazos se cuentan desde el inicio de la llamada.
+
+    Returns:
+        (resultados, fallos): resultados es {nombre: valor o fallback} y fallos
+        {nombre: excepción} para las tareas que fallaron o vencieron.
+    """
+    if not tasks:
+        return {}, {}
+
+    started = time.monotonic()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(tasks))
+    try:
+        futures = {name: executor.submit(func) for name, (func, _, _) in tasks.items()}
+
+        results, failures = {}, {}
+        for name, future in futures.items():
+            _, deadline, fallback = tasks[name]
+            remaining = max(0.0, deadline - (time.monotonic() - started))
+            try:
+                results[name] = future.result(timeout=remaining)
+            except concurrent.futures.TimeoutError:
+                failures[name] = DeadlineExceeded(f"{name}: sin respuesta en {deadline}s")
+                results[name] = fallback
+            except Exception as e:
+                failures[name] = e
+                results[name] = fallback
+        return results, failures
+    finally:
+        # No esperar a las tareas vencidas: siguen en segundo plano
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def call_with_timeout(func, timeout, *args, default=None, **kwargs):
+    """
+    Llama a func(*args, **kwargs) con un plazo.
+
+    Returns:
+        El resultado, o `default` si vence el plazo o la llamada falla
+    """
+    try:
+        return run_with_deadline(func, timeout, *args, **kwargs)
+    except Exception:
+        return default
@@ -216,9 +216,14 @@ async def analizar(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     
     try:
-        # Ejecutar análisis
+        # Ejecutar análisis (datos desde la caché compartida con scanners y daemon)
+        dm = DataManager()
+        data = dm.get_ticker_data(ticker)
+        data['macro_data'] = dm.get_macro_data()
+        data['market_regime'] = dm.get_market_regime()
+        
         agent = FinancialAgent(ticker, is_short_term=is_short_term)
-        result = agent.run_analysis()
+        result = agent.run_analysis(pre_data=data)
         
         # Extraer datos clave
         precio = result['current_price']
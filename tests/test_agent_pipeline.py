@@ -0,0 +1,293 @@
+import unittest
+import sys
+import os
+import copy
+import random
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.core import agent as agent_module
+from src.spectral_galileo.core.agent import FinancialAgent
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ohlcv_daily_5y.csv')
+
+original_prepare = FinancialAgent._prepare_context
+
+
+def make_pre_data():
+    history = pd.read_csv(FIXTURE, index_col=0, parse_dates=[0])
+    return {
+        'history': history.iloc[-400:],
+        'fundamentals': {'sector': 'Technology', 'beta': 1.1, 'trailingPE': 22.0},
+        'news': [],
+        'macro_data': pd.DataFrame(),
+        'market_regime': {'regime': 'BULL', 'confidence': 80.0,
+                          'description': 'Mercado alcista - tendencia positiva',
+                          'thresholds': {'buy': 40, 'sell': 60}},
+        'timeframes': {},
+    }
+
+
+def comparable(result):
+    """Campos deterministas del resultado (sin fecha de generación)"""
+    return {
+        'strategy': result['strategy'],
+        'technical': result['technical'],
+        'fundamental': result['fundamental'],
+        'risk_management': result.get('risk_management'),
+    }
+
+
+class TestDualAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        agent_module.clear_stage_cache()
+
+    def run_single(self, is_short_term):
+        agent = FinancialAgent('TEST', is_short_term=is_short_term, skip_external_data=True)
+        return agent.run_analysis(pre_data=make_pre_data())
+
+    def test_matches_two_single_analyses(self):
+        """El análisis dual produce lo mismo que dos run_analysis por separado"""
+        expected_short = self.run_single(True)
+        expected_long = self.run_single(False)
+
+        short, long_ = FinancialAgent.run_dual_analysis('TEST', pre_data=make_pre_data(),
+                                                        skip_external_data=True)
+
+        np.testing.assert_equal(comparable(short), comparable(expected_short))
+        np.testing.assert_equal(comparable(long_), comparable(expected_long))
+
+    def test_common_stages_run_once(self):
+        with patch.object(FinancialAgent, '_prepare_context', autospec=True,
+                          side_effect=original_prepare) as prepare:
+            short, long_ = FinancialAgent.run_dual_analysis('TEST', pre_data=make_pre_data(),
+                                                            skip_external_data=True)
+
+        self.assertEqual(prepare.call_count, 1)
+        self.assertNotEqual(short['strategy'], long_['strategy'])
+
+    def test_error_is_returned_for_both_horizons(self):
+        with patch.object(FinancialAgent, '_prepare_context', return_value={'error': 'sin datos'}):
+            short, long_ = FinancialAgent.run_dual_analysis('TEST', skip_external_data=True)
+        self.assertEqual(short, {'error': 'sin datos'})
+        self.assertEqual(long_, {'error': 'sin datos'})
+
+
+class TestStageMemoisation(unittest.TestCase):
+
+    def setUp(self):
+        agent_module.clear_stage_cache()
+        self.pre_data = make_pre_data()
+
+    def tearDown(self):
+        agent_module.clear_stage_cache()
+
+    def analyze(self, pre_data, is_short_term=True, **params):
+        agent = FinancialAgent('TEST', is_short_term=is_short_term, skip_external_data=True, params=params)
+        return agent.run_analysis(pre_data=pre_data)
+
+    def test_new_params_reuse_earlier_stages(self):
+        """Cambiar umbrales solo recalcula scoring y reporte"""
+        with patch.object(agent_module.indicators, 'with_indicators',
+                          wraps=agent_module.indicators.with_indicators) as compute, \
+             patch.object(FinancialAgent, '_build_context', autospec=True,
+                          side_effect=FinancialAgent._build_context) as context:
+            default = self.analyze(self.pre_data)
+            strict = self.analyze(self.pre_data, buy_threshold=0.0, sell_threshold=100.0)
+            again = self.analyze(make_pre_data())
+
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(context.call_count, 1)
+        self.assertEqual(strict['strategy']['buy_threshold'], 0.0)
+        self.assertNotEqual(default['strategy']['buy_threshold'], 0.0)
+        self.assertEqual(again['strategy'], default['strategy'])
+
+    def test_new_bar_invalidates(self):
+        with patch.object(FinancialAgent, '_score', autospec=True,
+                          side_effect=FinancialAgent._score) as score:
+            self.analyze(self.pre_data)
+            shorter = make_pre_data()
+            shorter['history'] = shorter['history'].iloc[:-1]
+            self.analyze(shorter)
+        self.assertEqual(score.call_count, 2)
+
+    def test_restated_bar_invalidates(self):
+        """Un split/dividendo re-ajusta barras antiguas sin cambiar la última"""
+        with patch.object(FinancialAgent, '_score', autospec=True,
+                          side_effect=FinancialAgent._score) as score:
+            self.analyze(self.pre_data)
+            restated = make_pre_data()
+            restated['history'].iloc[:200, restated['history'].columns.get_loc('Close')] *= 0.5
+            self.analyze(restated)
+        self.assertEqual(score.call_count, 2)
+
+    def test_probability_is_deterministic(self):
+        """El Monte Carlo da lo mismo con y sin caché de etapas (no usa el random global)"""
+        state = random.getstate()
+        cached = self.analyze(self.pre_data, is_short_term=False)
+        self.assertEqual(random.getstate(), state)
+        agent_module.clear_stage_cache()
+        fresh = self.analyze(make_pre_data(), is_short_term=False)
+        self.assertIsNotNone(cached['strategy']['probability_success'])
+        self.assertEqual(cached['strategy']['probability_success'],
+                         fresh['strategy']['probability_success'])
+
+    def test_expired_context_refreshes_later_stages(self):
+        """Al caducar el contexto, un cambio solo en una fuente externa llega al veredicto"""
+        def analyze_long(earnings):
+            with patch.object(agent_module.reddit_sentiment, 'get_reddit_sentiment',
+                              return_value={'available': False}), \
+                 patch.object(agent_module.earnings_calendar, 'get_earnings_info', return_value=earnings), \
+                 patch.object(agent_module.insider_trading, 'get_insider_activity',
+                              return_value={'available': False}):
+                agent = FinancialAgent('TEST', is_short_term=False, skip_external_data=False,
+                                       params={'buy_threshold': -5.0})
+                return agent.run_analysis(pre_data={**make_pre_data(), 'account_value': 50000})
+
+        earnings_today = {'available': True, 'days_to_earnings': 0}
+        before = analyze_long({'available': False})
+        within_ttl = analyze_long(earnings_today)
+        with patch.object(agent_module, 'STAGE_TTL_SECONDS', 0):
+            expired = analyze_long(earnings_today)
+
+        self.assertEqual(within_ttl['strategy'], before['strategy'])
+        self.assertNotEqual(expired['strategy']['verdict'], before['strategy']['verdict'])
+        self.assertLess(abs(expired['strategy']['confidence']), abs(before['strategy']['confidence']))
+
+    def test_changed_fundamentals_invalidate_context(self):
+        self.analyze(self.pre_data)
+        changed = make_pre_data()
+        changed['fundamentals'] = {**changed['fundamentals'], 'pegRatio': 0.5}
+        result = self.analyze(changed)
+        self.assertEqual(result['fundamental']['peg'], 0.5)
+
+    def test_results_are_independent_copies(self):
+        first = self.analyze(self.pre_data)
+        first['strategy']['pros'].append('modificado')
+        second = self.analyze(self.pre_data)
+        self.assertNotIn('modificado', second['strategy']['pros'])
+
+    def test_indicator_buffer_is_read_in_place(self):
+        """Con buffer el agente lee los indicadores del bloque, sin concatenarlos al OHLCV"""
+        expected = self.analyze(self.pre_data)
+        agent_module.clear_stage_cache()
+
+        buffer = np.empty((len(self.pre_data['history']), len(agent_module.indicators.ALL_INDICATORS)))
+        agent = FinancialAgent('TEST', is_short_term=True, skip_external_data=True)
+        with patch.object(agent_module.pd, 'concat', side_effect=AssertionError('concat')):
+            result = agent.run_analysis(pre_data={**make_pre_data(), 'indicator_buffer': buffer})
+
+        self.assertTrue(np.shares_memory(agent.indicators.to_numpy(), buffer))
+        self.assertNotIn('RSI', agent.data.columns)
+        np.testing.assert_equal(comparable(result), comparable(expected))
+
+    def test_indicator_buffer_is_not_memoised(self):
+        """El frame del backtester vive en un buffer reutilizado"""
+        buffer = np.empty((len(self.pre_data['history']), len(agent_module.indicators.ALL_INDICATORS)))
+        with patch.object(FinancialAgent, '_build_context', autospec=True,
+                          side_effect=FinancialAgent._build_context) as context:
+            for _ in range(2):
+                self.analyze({**make_pre_data(), 'indicator_buffer': buffer})
+        self.assertEqual(context.call_count, 2)
+
+
+class TestLeanResults(unittest.TestCase):
+
+    def setUp(self):
+        agent_module.clear_stage_cache()
+
+    def tearDown(self):
+        agent_module.clear_stage_cache()
+
+    def analyze(self, lean, **extra):
+        agent = FinancialAgent('TEST', is_short_term=True, skip_external_data=True, lean=lean)
+        return agent.run_analysis(pre_data={**make_pre_data(), **extra})
+
+    def test_report_sections_are_deferred(self):
+        """En modo lean peers y la cuenta solo se consultan al leerlos"""
+        with patch.object(agent_module.market_data, 'get_peers', return_value=['MSFT']) as peers, \
+             patch.object(agent_module, '_read_account_value', return_value=50000) as account:
+            result = self.analyze(lean=True)
+            verdict = result['strategy']['verdict']
+            peers.assert_not_called()
+            account.assert_not_called()
+
+            self.assertIn('peers', result)
+            self.assertEqual(result['peers'], ['MSFT'])
+            self.assertGreater(result['risk_management']['position_size_shares'], 0)
+            result['peers']  # Segunda lectura: ya calculado
+
+        self.assertTrue(verdict)
+        self.assertEqual(peers.call_count, 1)
+        self.assertEqual(account.call_count, 1)
+
+    def test_lean_matches_full(self):
+        with patch.object(agent_module.market_data, 'get_peers', return_value=['MSFT']):
+            full = self.analyze(lean=False, account_value=50000)
+            agent_module.clear_stage_cache()
+            lean = self.analyze(lean=True, account_value=50000)
+            np.testing.assert_equal(dict(lean), full)
+
+    def test_lean_results_do_not_share_stage_state(self):
+        """Modificar un resultado lean no altera el de otro agente con la misma caché"""
+        with patch.object(agent_module.market_data, 'get_peers', return_value=[]):
+            first = self.analyze(lean=True, account_value=50000)
+            expected = copy.deepcopy(dict(first))
+            first['macro']['mutated'] = True
+            first['advanced']['multi_timeframe']['mutated'] = True
+            first['advanced']['aligned_signals'].append('MUTATED')
+            first['strategy']['verdict'] = 'MUTATED'
+            second = self.analyze(lean=True, account_value=50000)
+            np.testing.assert_equal(dict(second), expected)
+
+    def lazy(self):
+        return agent_module.LazyReport({'strategy': {}}, {'peers': lambda: ['MSFT']})
+
+    def test_pop_loads_deferred_section(self):
+        report = self.lazy()
+        self.assertEqual(report.pop('peers', 'MISSING'), ['MSFT'])
+        self.assertNotIn('peers', report)
+        self.assertEqual(report.pop('peers', 'MISSING'), 'MISSING')
+
+    def test_popitem_loads_deferred_sections(self):
+        report = self.lazy()
+        items = dict([report.popitem(), report.popitem()])
+        self.assertEqual(items, {'strategy': {}, 'peers': ['MSFT']})
+        self.assertEqual(len(report), 0)
+
+    def test_setdefault_keeps_deferred_section(self):
+        report = self.lazy()
+        self.assertEqual(report.setdefault('peers', None), ['MSFT'])
+        self.assertEqual(report['peers'], ['MSFT'])
+
+    def test_update_replaces_deferred_section(self):
+        report = self.lazy()
+        report.update({'peers': ['AMD']}, extra=1)
+        self.assertEqual(report['peers'], ['AMD'])
+        self.assertEqual(dict(report), {'strategy': {}, 'peers': ['AMD'], 'extra': 1})
+
+    def test_delete_deferred_section(self):
+        report = self.lazy()
+        del report['peers']
+        self.assertNotIn('peers', report)
+        self.assertEqual(len(report), 1)
+
+    def test_account_value_from_pre_data(self):
+        """Con account_value en pre_data no se lee la configuración del portafolio"""
+        with patch.object(agent_module, '_read_account_value') as account, \
+             patch.object(agent_module.market_data, 'get_peers', return_value=[]):
+            small = self.analyze(lean=False, account_value=10000)
+            large = self.analyze(lean=False, account_value=1000000)
+
+        account.assert_not_called()
+        self.assertLess(small['risk_management']['position_size_shares'],
+                        large['risk_management']['position_size_shares'])
+        self.assertEqual(small['strategy'], large['strategy'])
+
+
+if __name__ == '__main__':
+    unittest.main()
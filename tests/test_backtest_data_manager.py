@@ -0,0 +1,219 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'backtesting', 'scripts'))
+
+import backtest_data_manager as bdm
+import backtest_storage
+
+
+def make_download(start, periods, base=100.0):
+    """Simula la salida de yf.download (MultiIndex campo/ticker, orden alfabético)."""
+    dates = pd.date_range(start, periods=periods, freq="B")
+    close = base + np.arange(periods, dtype=float)
+    data = pd.DataFrame({
+        'Close': close,
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Open': close - 0.5,
+        'Volume': np.full(periods, 1_000_000, dtype='int64')
+    }, index=dates)
+    data.columns = pd.MultiIndex.from_product([data.columns, ['AAPL']])
+    return data
+
+
+class FakeDownload:
+    """Simula yf.download filtrando por start y registrando llamadas."""
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def __call__(self, ticker, start=None, end=None, progress=False):
+        self.calls.append({'start': start, 'end': end})
+        if start is not None:
+            return self.data[self.data.index >= pd.Timestamp(start)]
+        return self.data
+
+
+class TestIncrementalUpdate(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.manager = bdm.BacktestDataManager(data_dir=self.tmp_dir)
+        self.full = make_download('2024-01-01', 100)
+        self.download = FakeDownload(self.full.iloc[:-5])
+        with patch.object(bdm.yf, 'download', self.download):
+            self.manager.download_historical('AAPL', start_date='2024-01-01')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_normalize_selects_columns_by_name(self):
+        """Las columnas se asignan por nombre, no por posición"""
+        data = bdm.normalize_download(self.full.copy())
+        self.assertEqual(list(data.columns), bdm.OHLCV_COLUMNS)
+        self.assertAlmostEqual(data['Open'].iloc[0], 99.5)
+
+    def test_appends_only_new_bars(self):
+        """Solo se piden y anexan las barras posteriores a la última guardada"""
+        csv_path = self.manager.storage.path('AAPL')
+        before = csv_path.read_bytes()
+
+        self.download.data = self.full
+        with patch.object(bdm.yf, 'download', self.download):
+            result = self.manager.update_incremental('AAPL')
+
+        self.assertEqual(result, {'status': 'appended', 'rows': 5})
+        # Se pide desde la penúltima barra guardada (barra de solape)
+        self.assertEqual(self.download.calls[-1]['start'],
+                         self.full.index[-7].strftime('%Y-%m-%d'))
+        # El contenido previo queda intacto (append-only)
+        self.assertTrue(csv_path.read_bytes().startswith(before))
+
+        data = self.manager._read('AAPL')
+        self.assertEqual(len(data), len(self.full))
+        self.assertFalse(data.index.duplicated().any())
+
+    def test_up_to_date_does_not_touch_file(self):
+        """Sin barras nuevas el archivo no cambia"""
+        csv_path = self.manager.storage.path('AAPL')
+        before = csv_path.read_bytes()
+
+        with patch.object(bdm.yf, 'download', self.download):
+            result = self.manager.update_incremental('AAPL')
+
+        self.assertEqual(result['status'], 'up_to_date')
+        self.assertEqual(csv_path.read_bytes(), before)
+
+    def test_restated_overlap_triggers_reload(self):
+        """Si la barra de solape cambió (split/dividendo) se redescarga la serie"""
+        restated = self.full.copy()
+        restated[['Close', 'High', 'Low', 'Open']] *= 0.5
+        self.download.data = restated
+        with patch.object(bdm.yf, 'download', self.download):
+            result = self.manager.update_incremental('AAPL')
+
+        self.assertEqual(result['status'], 'reloaded')
+        data = self.manager._read('AAPL')
+        self.assertEqual(len(data), len(restated))
+        np.testing.assert_allclose(data['Close'].values, restated[('Close', 'AAPL')].values)
+
+    def test_partial_last_bar_is_overwritten(self):
+        """Una última barra intradía (parcial) se corrige sin redescargar la serie"""
+        partial = self.full.iloc[:-5].copy()
+        partial.iloc[-1, partial.columns.get_loc(('Close', 'AAPL'))] += 3.0
+        with patch.object(bdm.yf, 'download', FakeDownload(partial)):
+            self.manager.download_historical('AAPL', start_date='2024-01-01', force=True)
+
+        self.download.data = self.full
+        with patch.object(bdm.yf, 'download', self.download):
+            result = self.manager.update_incremental('AAPL')
+            again = self.manager.update_incremental('AAPL')
+
+        self.assertEqual(result, {'status': 'appended', 'rows': 5})
+        self.assertEqual(again['status'], 'up_to_date')
+        self.assertTrue(all(call['start'] is not None for call in self.download.calls))
+        data = self.manager._read('AAPL')
+        np.testing.assert_allclose(data['Close'].values, self.full[('Close', 'AAPL')].values)
+
+    def test_partial_bar_refreshed_without_new_bars(self):
+        partial = self.full.iloc[:-5].copy()
+        partial.iloc[-1, partial.columns.get_loc(('Close', 'AAPL'))] -= 2.0
+        with patch.object(bdm.yf, 'download', FakeDownload(partial)):
+            self.manager.download_historical('AAPL', start_date='2024-01-01', force=True)
+
+        with patch.object(bdm.yf, 'download', self.download):
+            result = self.manager.update_incremental('AAPL')
+
+        self.assertEqual(result, {'status': 'refreshed', 'rows': 0})
+        data = self.manager._read('AAPL')
+        self.assertEqual(len(data), len(self.full) - 5)
+        self.assertAlmostEqual(data['Close'].iloc[-1], self.full[('Close', 'AAPL')].iloc[-6])
+
+    def test_bulk_download_incremental(self):
+        """bulk_download(incremental=True) actualiza en lugar de redescargar"""
+        self.download.data = self.full
+        with patch.object(bdm.yf, 'download', self.download):
+            results = self.manager.bulk_download(['AAPL'], incremental=True)
+
+        self.assertEqual(results['AAPL']['update'], 'appended')
+        self.assertEqual(results['AAPL']['rows'], 5)
+
+
+class TestBinaryStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.full = make_download('2024-01-01', 100)
+        self.download = FakeDownload(self.full.iloc[:-5])
+        manager = bdm.BacktestDataManager(data_dir=self.tmp_dir)
+        with patch.object(bdm.yf, 'download', self.download):
+            manager.download_historical('AAPL', start_date='2024-01-01')
+        self.csv_data = backtest_storage.CsvStorage(self.tmp_dir).read('AAPL')
+        self.results = manager.migrate_to_binary()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_migration_roundtrip(self):
+        """La migración reproduce exactamente el CSV"""
+        self.assertEqual(self.results['AAPL']['status'], 'ok')
+        manager = bdm.BacktestDataManager(data_dir=self.tmp_dir)
+
+        self.assertEqual(manager.storage.name, 'binary')
+        pd.testing.assert_frame_equal(manager._read('AAPL'), self.csv_data,
+                                      check_freq=False, check_index_type=False)
+
+    def test_range_read_matches_csv_filter(self):
+        """El rango leído por búsqueda binaria coincide con el filtro sobre el CSV"""
+        manager = bdm.BacktestDataManager(data_dir=self.tmp_dir, storage='binary')
+        data = manager.get_historical_range('AAPL', start_date='2024-02-01',
+                                            end_date='2024-03-15', auto_download=False)
+        expected = self.csv_data[(self.csv_data.index >= '2024-02-01')
+                                 & (self.csv_data.index <= '2024-03-15')]
+
+        pd.testing.assert_frame_equal(data, expected, check_freq=False, check_index_type=False)
+
+    def test_incremental_append(self):
+        """La actualización incremental anexa a las columnas binarias"""
+        manager = bdm.BacktestDataManager(data_dir=self.tmp_dir, storage='binary')
+        self.download.data = self.full
+        with patch.object(bdm.yf, 'download', self.download):
+            result = manager.update_incremental('AAPL')
+
+        self.assertEqual(result, {'status': 'appended', 'rows': 5})
+        data = manager._read('AAPL')
+        self.assertEqual(len(data), len(self.full))
+        self.assertTrue(data.index.is_monotonic_increasing)
+
+    def test_append_replaces_tail_rows(self):
+        """append sustituye las filas desde la primera fecha anexada"""
+        storage = backtest_storage.BinaryStorage(self.tmp_dir)
+        tail = bdm.normalize_download(self.full.iloc[-8:].copy())
+        tail['Close'] += 1000.0
+        storage.append('AAPL', tail)
+
+        data = storage.read('AAPL')
+        self.assertEqual(len(data), len(self.full))
+        self.assertFalse(data.index.duplicated().any())
+        np.testing.assert_allclose(data['Close'].values[-8:], tail['Close'].values)
+        _, last_rows = storage.read_bounds('AAPL')
+        self.assertEqual(list(last_rows.index), list(tail.index[-2:]))
+
+    def test_csv_storage_can_be_forced(self):
+        """storage='csv' ignora la copia binaria"""
+        manager = bdm.BacktestDataManager(data_dir=self.tmp_dir, storage='csv')
+        self.assertIsInstance(manager.storage, backtest_storage.CsvStorage)
+        self.assertEqual(manager.list_available_tickers(), ['AAPL'])
+
+
+if __name__ == '__main__':
+    unittest.main()
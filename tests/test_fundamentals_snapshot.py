@@ -0,0 +1,166 @@
+import unittest
+import sys
+import os
+import time
+import concurrent.futures
+import pandas as pd
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.data import fundamentals_snapshot
+from src.spectral_galileo.data import market_data
+from src.spectral_galileo.external import earnings_calendar
+from src.spectral_galileo.external import insider_trading
+
+INFO = {'symbol': 'AAPL', 'sector': 'Technology', 'trailingPE': 28.0,
+        'earningsTimestamp': int(time.time()) + 10 * 86400}
+
+
+class FakeTicker:
+    """yf.Ticker simulado que cuenta las lecturas de .info"""
+    instances = []
+
+    def __init__(self, symbol, info=INFO, delay=0.0):
+        self.ticker = symbol
+        self.info_reads = 0
+        self._info = info
+        self._delay = delay
+        FakeTicker.instances.append(self)
+
+    @property
+    def info(self):
+        self.info_reads += 1
+        time.sleep(self._delay)
+        if isinstance(self._info, Exception):
+            raise self._info
+        return dict(self._info)
+
+    def get_earnings_dates(self, limit=12):
+        return pd.DataFrame()
+
+    def get_earnings_history(self):
+        return pd.DataFrame()
+
+    def get_insider_transactions(self):
+        return pd.DataFrame()
+
+    def get_insider_purchases(self):
+        return pd.DataFrame()
+
+    def get_insider_roster_holders(self):
+        return pd.DataFrame()
+
+
+def info_reads():
+    return sum(t.info_reads for t in FakeTicker.instances)
+
+
+class TestFundamentalsSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        fundamentals_snapshot.clear_snapshots()
+        FakeTicker.instances = []
+
+    def tearDown(self):
+        fundamentals_snapshot.clear_snapshots()
+
+    def test_info_fetched_once_across_modules(self):
+        """market_data, earnings e insiders comparten un yf.Ticker y un .info"""
+        with patch.object(fundamentals_snapshot.yf, 'Ticker', FakeTicker):
+            ticker = market_data.get_ticker_data('AAPL')
+            fundamentals = market_data.get_fundamental_info(ticker)
+            earnings = earnings_calendar.fetch_earnings_info('aapl')
+            insider = insider_trading.fetch_insider_activity('AAPL')
+
+        self.assertEqual(len(FakeTicker.instances), 1)
+        self.assertEqual(info_reads(), 1)
+        self.assertEqual(fundamentals['sector'], 'Technology')
+        self.assertIsNotNone(earnings['next_earnings_date'])
+        self.assertTrue(insider['available'])
+
+    def test_concurrent_readers_share_one_download(self):
+        with patch.object(fundamentals_snapshot.yf, 'Ticker',
+                          lambda symbol: FakeTicker(symbol, delay=0.2)):
+            snapshot = fundamentals_snapshot.get_snapshot('AAPL')
+            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+                results = list(executor.map(lambda _: snapshot.info, range(5)))
+
+        self.assertEqual(info_reads(), 1)
+        self.assertTrue(all(r['sector'] == 'Technology' for r in results))
+
+    def test_seeded_fundamentals_skip_download(self):
+        """Con los fundamentales de la caché, earnings no descarga .info"""
+        with patch.object(fundamentals_snapshot.yf, 'Ticker', FakeTicker):
+            cached = market_data.get_fundamental_info(FakeTicker('AAPL'))
+            fundamentals_snapshot.clear_snapshots()
+            FakeTicker.instances = []
+
+            fundamentals_snapshot.get_snapshot('AAPL').seed(cached)
+            earnings = earnings_calendar.fetch_earnings_info('AAPL')
+
+        self.assertEqual(info_reads(), 0)
+        self.assertIsNotNone(earnings['next_earnings_date'])
+
+    def test_ticker_obj_does_not_wait_for_info(self):
+        """Crear/leer el yf.Ticker no espera a otra descarga de .info en curso"""
+        with patch.object(fundamentals_snapshot.yf, 'Ticker',
+                          lambda symbol: FakeTicker(symbol, delay=0.5)):
+            snapshot = fundamentals_snapshot.get_snapshot('AAPL')
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                download = executor.submit(lambda: snapshot.info)
+                time.sleep(0.05)
+                started = time.monotonic()
+                ticker = market_data.get_ticker_data('AAPL')
+                elapsed = time.monotonic() - started
+                download.result()
+
+        self.assertIs(ticker, snapshot.ticker_obj)
+        self.assertLess(elapsed, 0.2)
+
+    def test_seed_requires_earnings_keys(self):
+        """Fundamentales de la caché sin las claves de earnings no siembran"""
+        legacy = {'symbol': 'AAPL', 'sector': 'Technology', 'trailingPE': 28.0}
+        with patch.object(fundamentals_snapshot.yf, 'Ticker', FakeTicker):
+            fundamentals_snapshot.get_snapshot('AAPL').seed(legacy)
+            earnings = earnings_calendar.fetch_earnings_info('AAPL')
+
+        self.assertEqual(info_reads(), 1)
+        self.assertIsNotNone(earnings['next_earnings_date'])
+
+    def test_seeded_info_not_trusted_near_report(self):
+        """Cerca del reporte la fecha (y su TTL horario) sale de .info en vivo"""
+        live = dict(INFO, earningsTimestamp=int(time.time()) + 3 * 3600)
+        cached = dict(INFO, earningsTimestamp=int(time.time()) + 6 * 3600, mostRecentQuarter=None)
+        with patch.object(fundamentals_snapshot.yf, 'Ticker', lambda symbol: FakeTicker(symbol, info=live)):
+            snapshot = fundamentals_snapshot.get_snapshot('AAPL')
+            snapshot.seed(cached)
+            self.assertTrue(snapshot.seeded)
+            earnings = earnings_calendar.fetch_earnings_info('AAPL')
+
+        self.assertEqual(info_reads(), 1)
+        self.assertFalse(snapshot.seeded)
+        self.assertEqual(earnings['next_earnings_date'], pd.to_datetime(live['earningsTimestamp'], unit='s'))
+
+    def test_failure_is_not_retried_immediately(self):
+        with patch.object(fundamentals_snapshot.yf, 'Ticker',
+                          lambda symbol: FakeTicker(symbol, info=RuntimeError('429'))):
+            snapshot = fundamentals_snapshot.get_snapshot('AAPL')
+            self.assertEqual(snapshot.info, {})
+            self.assertEqual(snapshot.info, {})
+            self.assertEqual(info_reads(), 1)
+
+            with patch.object(fundamentals_snapshot, 'FAILURE_RETRY_SECONDS', 0):
+                snapshot.info
+            self.assertEqual(info_reads(), 2)
+
+    def test_snapshot_expires(self):
+        with patch.object(fundamentals_snapshot.yf, 'Ticker', FakeTicker):
+            first = fundamentals_snapshot.get_snapshot('AAPL')
+            self.assertIs(fundamentals_snapshot.get_snapshot('aapl'), first)
+            with patch.object(fundamentals_snapshot, 'SNAPSHOT_TTL_SECONDS', -1):
+                self.assertIsNot(fundamentals_snapshot.get_snapshot('AAPL'), first)
+
+
+if __name__ == '__main__':
+    unittest.main()
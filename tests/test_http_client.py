@@ -0,0 +1,182 @@
+import unittest
+import sys
+import os
+import json
+import time
+import threading
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.utils import http_client
+from src.spectral_galileo.external import reddit_sentiment
+from src.spectral_galileo.data import market_data
+
+REDDIT_LISTING = {'data': {'children': [
+    {'data': {'title': 'AAPL calls to the moon', 'score': 120, 'upvote_ratio': 0.9,
+              'num_comments': 40, 'created_utc': 1700000000, 'permalink': '/r/x/1',
+              'selftext': 'texto'}},
+]}}
+
+RSS = b"""<?xml version="1.0"?><rss><channel>
+<item><title>Apple sube tras resultados</title><link>http://example.com/1</link></item>
+<item><title>Apple presenta nuevo producto</title><link>http://example.com/2</link></item>
+</channel></rss>"""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Sustituye a reddit.com / news.google.com y registra las conexiones"""
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.client_address))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            failures = server.failures.get(self.path.split('?')[0], 0)
+            if failures:
+                server.failures[self.path.split('?')[0]] = failures - 1
+        try:
+            if failures:
+                self.reply(503, b'busy', 'text/plain')
+            elif self.path.startswith('/slow'):
+                time.sleep(0.2)
+                self.reply(200, b'ok', 'text/plain')
+            elif '/search.json' in self.path:
+                self.reply(200, json.dumps(REDDIT_LISTING).encode(), 'application/json')
+            elif self.path.startswith('/rss'):
+                self.reply(200, RSS, 'application/rss+xml')
+            else:
+                self.reply(200, b'ok', 'text/plain')
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def reply(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.failures = {}
+        self.server.active = self.server.max_active = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = http_client.HttpClient(backoff_factor=0, rate_limits={})
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def connections(self):
+        return {address for _, address in self.server.requests}
+
+
+class TestHttpClient(StubServerTest):
+
+    def test_keep_alive_reuses_connection(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(f"{self.base_url}/ping").status_code, 200)
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(len(self.connections()), 1)
+
+    def test_retries_transient_errors(self):
+        self.server.failures['/flaky'] = 2
+        response = self.client.get(f"{self.base_url}/flaky")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_gives_up_after_retries(self):
+        """Agotados los reintentos se devuelve la última respuesta"""
+        self.server.failures['/down'] = 10
+        response = self.client.get(f"{self.base_url}/down")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.server.requests), http_client.RETRIES + 1)
+
+    def test_per_host_connection_limit(self):
+        """Con el pool lleno los hilos esperan una conexión libre"""
+        client = http_client.HttpClient(pool_size=2, rate_limits={})
+        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
+            responses = list(executor.map(lambda _: client.get(f"{self.base_url}/slow"), range(6)))
+        client.close()
+
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        self.assertLessEqual(self.server.max_active, 2)
+        self.assertLessEqual(len(self.connections()), 2)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_spaces_requests_per_host(self):
+        limiter = http_client.RateLimiter({'a.com': 20.0})
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire('a.com')
+        self.assertGreaterEqual(time.monotonic() - started, 4 / 20.0 - 0.01)
+
+    def test_shared_across_threads(self):
+        limiter = http_client.RateLimiter({'a.com': 20.0})
+        started = time.monotonic()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+            list(executor.map(lambda _: limiter.acquire('a.com'), range(5)))
+        self.assertGreaterEqual(time.monotonic() - started, 4 / 20.0 - 0.01)
+
+    def test_unlimited_hosts_do_not_wait(self):
+        limiter = http_client.RateLimiter({'a.com': 1.0})
+        limiter.acquire('a.com')
+        self.assertEqual(limiter.acquire('b.com'), 0.0)
+
+
+class TestFetchersUseSharedClient(StubServerTest):
+
+    def test_reddit_search(self):
+        with patch.object(reddit_sentiment, 'REDDIT_BASE_URL', self.base_url), \
+             patch.object(http_client, 'get_default_client', return_value=self.client):
+            for sub in ('wallstreetbets', 'stocks', 'investing'):
+                posts = reddit_sentiment.search_reddit_json(sub, '$AAPL OR AAPL')
+                self.assertEqual(posts[0]['title'], 'AAPL calls to the moon')
+
+        self.assertTrue(self.server.requests[0][0].startswith('/r/wallstreetbets/search.json?q='))
+        self.assertEqual(len(self.connections()), 1)
+
+    def test_reddit_http_errors_reduce_coverage(self):
+        """Un subreddit que responde 503 cuenta como fallido, no como buscado sin menciones"""
+        self.server.failures['/r/stocks/search.json'] = 10
+        with patch.object(reddit_sentiment, 'REDDIT_BASE_URL', self.base_url), \
+             patch.object(http_client, 'get_default_client', return_value=self.client):
+            result = reddit_sentiment._get_reddit_sentiment_internal('AAPL')
+            self.assertEqual(reddit_sentiment.search_reddit_json('stocks', 'AAPL'), [])
+
+        self.assertEqual(result['subreddits_failed'], ['stocks'])
+        self.assertEqual(result['subreddits_searched'], len(reddit_sentiment.SUBREDDITS) - 1)
+
+    def test_google_news_rss(self):
+        ticker = SimpleNamespace(ticker='AAPL', news=[])
+        with patch.object(market_data, 'GOOGLE_NEWS_RSS_URL', self.base_url + '/rss?q={ticker}'), \
+             patch.object(http_client, 'get_default_client', return_value=self.client):
+            news = market_data.get_news(ticker)
+
+        self.assertEqual([item['title'] for item in news],
+                         ['Apple sube tras resultados', 'Apple presenta nuevo producto'])
+        self.assertEqual(self.server.requests[0][0], '/rss?q=AAPL')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+import pandas as pd
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.analysis import indicators
+from src.spectral_galileo.analysis import indicator_engine
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class TestIndicatorEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.read_csv(os.path.join(FIXTURES_DIR, 'ohlcv_daily_5y.csv'),
+                              index_col=0, parse_dates=[0])
+        self.expected = indicators.add_all_indicators(self.df.copy())
+
+    def assert_rows_match(self, actual, expected):
+        for col in indicator_engine.INDICATOR_COLUMNS:
+            np.testing.assert_allclose(actual[col].to_numpy(dtype=float),
+                                       expected[col].to_numpy(dtype=float),
+                                       rtol=1e-7, atol=1e-7, err_msg=col)
+
+    def test_every_bar_matches_batch(self):
+        """Cada vela procesada coincide con add_all_indicators"""
+        engine = indicator_engine.IndicatorEngine()
+        rows = engine.append(self.df)
+        self.assert_rows_match(rows, self.expected)
+
+    def test_incremental_append_matches_snapshot(self):
+        """Calentar con la historia y anexar velas da el mismo snapshot"""
+        engine = indicator_engine.IndicatorEngine.from_history(self.df.iloc[:-10])
+        for i in range(len(self.df) - 10, len(self.df)):
+            engine.append(self.df.iloc[:i + 1])
+
+        snapshot = engine.snapshot()
+        self.assertEqual(snapshot.name, self.df.index[-1])
+        self.assert_rows_match(snapshot.to_frame().T, self.expected.iloc[[-1]])
+
+    def test_flat_prices_match_batch(self):
+        """Precios planos (divisiones 0/0, ventanas en cero) siguen las reglas de pandas"""
+        df = self.df.iloc[:80].copy()
+        df.iloc[20:60, :4] = 100.0
+        expected = indicators.add_all_indicators(df.copy())
+        rows = indicator_engine.IndicatorEngine().append(df)
+        self.assert_rows_match(rows, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -154,5 +154,246 @@ class TestIndicators(unittest.TestCase):
         # Should have NaN initially
         self.assertTrue(pd.isna(slope.iloc[0]))
 
+    def test_add_indicators_selective(self):
+        """add_indicators calcula solo lo pedido y coincide con el cálculo completo"""
+        full = indicators.add_all_indicators(self.df.copy())
+        partial = indicators.add_indicators(self.df.copy(), ['SMA_Slope', 'ADX', 'BB_Upper'])
+
+        self.assertEqual(list(partial.columns),
+                         list(self.df.columns) + ['BB_Upper', 'ADX', 'SMA_Slope'])
+        for col in ['BB_Upper', 'ADX', 'SMA_Slope']:
+            pd.testing.assert_series_equal(partial[col], full[col])
+
+    def test_add_indicators_shares_intermediates(self):
+        """El True Range se calcula una vez aunque lo usen ATR y ADX"""
+        from unittest.mock import patch
+        with patch.object(indicators, 'calculate_true_range',
+                          wraps=indicators.calculate_true_range) as tr:
+            indicators.add_indicators(self.df.copy(), ['ATR', 'ADX'])
+        self.assertEqual(tr.call_count, 1)
+
+    def test_add_indicators_unknown_column(self):
+        """Pedir un indicador inexistente lanza ValueError"""
+        with self.assertRaises(ValueError):
+            indicators.add_indicators(self.df.copy(), ['RSI', 'FOO'])
+
+    def test_with_indicators_does_not_mutate(self):
+        """with_indicators no modifica el DataFrame de entrada y coincide con add_all_indicators"""
+        original = self.df.copy()
+        result = indicators.with_indicators(self.df)
+        expected = indicators.add_all_indicators(self.df.copy())
+
+        pd.testing.assert_frame_equal(self.df, original)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    def test_with_indicators_replaces_existing_columns(self):
+        """Recalcular sobre un DataFrame con indicadores no duplica columnas"""
+        first = indicators.with_indicators(self.df)
+        second = indicators.with_indicators(first)
+
+        self.assertFalse(second.columns.duplicated().any())
+        self.assertEqual(list(second.columns), list(first.columns))
+
+    def test_indicator_frame_uses_buffer(self):
+        """Los indicadores se escriben en el buffer preasignado"""
+        buffer = np.zeros((len(self.df), len(indicators.ALL_INDICATORS)))
+        frame = indicators.indicator_frame(self.df, out=buffer)
+
+        self.assertTrue(np.shares_memory(frame.to_numpy(), buffer))
+        np.testing.assert_array_equal(buffer[:, indicators.ALL_INDICATORS.index('RSI')],
+                                      frame['RSI'].to_numpy())
+        with self.assertRaises(ValueError):
+            indicators.indicator_frame(self.df, out=buffer[:-1])
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def loop_obv(df):
+    """Implementación original (bucle) de OBV, referencia para la regresión."""
+    obv = [0]
+    for i in range(1, len(df)):
+        if df['Close'].iloc[i] > df['Close'].iloc[i-1]:
+            obv.append(obv[-1] + df['Volume'].iloc[i])
+        elif df['Close'].iloc[i] < df['Close'].iloc[i-1]:
+            obv.append(obv[-1] - df['Volume'].iloc[i])
+        else:
+            obv.append(obv[-1])
+    return pd.Series(obv, index=df.index)
+
+
+def loop_mfi(df, window=14):
+    """Implementación original (bucle) de MFI, referencia para la regresión."""
+    typical_price = (df['High'] + df['Low'] + df['Close']) / 3
+    money_flow = typical_price * df['Volume']
+    positive_flow = [0]
+    negative_flow = [0]
+    for i in range(1, len(df)):
+        if typical_price.iloc[i] > typical_price.iloc[i-1]:
+            positive_flow.append(money_flow.iloc[i])
+            negative_flow.append(0)
+        elif typical_price.iloc[i] < typical_price.iloc[i-1]:
+            positive_flow.append(0)
+            negative_flow.append(money_flow.iloc[i])
+        else:
+            positive_flow.append(0)
+            negative_flow.append(0)
+    positive_mf = pd.Series(positive_flow, index=df.index).rolling(window).sum()
+    negative_mf = pd.Series(negative_flow, index=df.index).rolling(window).sum()
+    return 100 - (100 / (1 + (positive_mf / negative_mf.replace(0, 0.0001))))
+
+
+class TestVectorizedVolumeIndicators(unittest.TestCase):
+    """Regresión de OBV/MFI vectorizados contra las versiones en bucle."""
+
+    def setUp(self):
+        self.df = pd.read_csv(os.path.join(FIXTURES_DIR, 'ohlcv_daily_5y.csv'),
+                              index_col=0, parse_dates=[0])
+
+    def test_obv_matches_loop(self):
+        """OBV vectorizado == bucle (incluye velas con cierre sin cambio)"""
+        pd.testing.assert_series_equal(indicators.calculate_obv(self.df), loop_obv(self.df),
+                                       check_dtype=False)
+
+    def test_mfi_matches_loop(self):
+        """MFI vectorizado == bucle"""
+        for window in (5, 14):
+            pd.testing.assert_series_equal(indicators.calculate_mfi(self.df, window=window),
+                                           loop_mfi(self.df, window=window))
+
+    def test_nan_and_float_volume_match_loop(self):
+        """Huecos de precio/volumen se propagan igual que en el bucle"""
+        df = self.df.iloc[:300].copy()
+        df['Volume'] = df['Volume'].astype(float)
+        df.iloc[50, df.columns.get_loc('Close')] = np.nan
+        df.iloc[120, df.columns.get_loc('Volume')] = np.nan
+
+        pd.testing.assert_series_equal(indicators.calculate_obv(df), loop_obv(df))
+        pd.testing.assert_series_equal(indicators.calculate_mfi(df), loop_mfi(df))
+
+    def test_short_inputs(self):
+        """Series de 0 y 1 velas (el bucle fallaba con 0)"""
+        one = self.df.iloc[:1]
+        pd.testing.assert_series_equal(indicators.calculate_obv(one), loop_obv(one),
+                                       check_dtype=False)
+        self.assertEqual(len(indicators.calculate_obv(self.df.iloc[:0])), 0)
+        self.assertEqual(len(indicators.calculate_mfi(self.df.iloc[:0])), 0)
+
+
+class TestPanelIndicators(unittest.TestCase):
+    """El cálculo en panel coincide con calcular cada ticker por separado."""
+
+    def setUp(self):
+        base = pd.read_csv(os.path.join(FIXTURES_DIR, 'ohlcv_daily_5y.csv'),
+                           index_col=0, parse_dates=[0])
+        rng = np.random.default_rng(1)
+        self.frames = {}
+        for ticker, scale in (('AAA', 1.0), ('BBB', 0.37), ('CCC', 4.2)):
+            df = base.copy()
+            df[['Open', 'High', 'Low', 'Close']] *= scale
+            df['Volume'] = rng.permutation(df['Volume'].to_numpy())
+            self.frames[ticker] = df
+        # CCC empieza a cotizar más tarde
+        self.frames['CCC'] = self.frames['CCC'].iloc[300:]
+        self.wide = pd.concat(self.frames, axis=1).swaplevel(axis=1)
+
+    def assert_matches_single(self, panel):
+        for ticker, df in self.frames.items():
+            expected = indicators.add_all_indicators(df.copy())
+            actual = panel[ticker]
+            self.assertEqual(list(actual.columns), list(expected.columns))
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False,
+                                          check_freq=False, rtol=1e-9)
+
+    def test_multiindex_frame(self):
+        """DataFrame ancho (campo, ticker) como el de yf.download"""
+        self.assert_matches_single(indicators.compute_panel_indicators(self.wide))
+
+    def test_ticker_first_columns(self):
+        """También acepta columnas (ticker, campo)"""
+        panel = indicators.compute_panel_indicators(self.wide.swaplevel(axis=1))
+        self.assertEqual(sorted(panel.tickers), ['AAA', 'BBB', 'CCC'])
+        self.assert_matches_single(panel)
+
+    def test_numpy_array(self):
+        """Panel desde un array 3-D (fechas x tickers x OHLCV)"""
+        fields = indicators.to_panel(self.wide)
+        tickers = list(fields['Close'].columns)
+        values = np.stack([fields[f].to_numpy() for f in indicators.OHLCV_COLUMNS], axis=2)
+
+        data = indicators.panel_from_array(values, fields['Close'].index, tickers)
+        self.assert_matches_single(indicators.compute_panel_indicators(data))
+
+    def test_latest(self):
+        """latest() devuelve la última fila de cada ticker"""
+        panel = indicators.compute_panel_indicators(self.wide, columns=['RSI'])
+        latest = panel.latest()
+        self.assertEqual(list(latest.columns), indicators.OHLCV_COLUMNS + ['RSI'])
+        self.assertAlmostEqual(latest.loc['BBB', 'RSI'],
+                               indicators.calculate_rsi(self.frames['BBB']).iloc[-1])
+
+        rsi = panel.field('RSI')
+        self.assertEqual(list(rsi.index), list(self.wide.index))
+        self.assertTrue(rsi['CCC'].iloc[:300].isna().all())
+
+    def test_field_matches_views(self):
+        """field() coincide con las vistas por ticker reindexadas a las fechas del panel"""
+        panel = indicators.compute_panel_indicators(self.wide)
+        for name in panel.columns:
+            expected = pd.DataFrame({t: panel[t][name] for t in panel.tickers}, index=panel.index)
+            pd.testing.assert_frame_equal(panel.field(name), expected, check_dtype=False,
+                                          check_freq=False)
+
+
+
+def loop_atr(high, low, close, periods=14):
+    """Implementación original (bucle) de agent.calculate_atr, referencia para la regresión."""
+    tr_list = []
+    for i in range(1, len(close)):
+        tr_list.append(max(high[i] - low[i], abs(high[i] - close[i-1]), abs(low[i] - close[i-1])))
+    return np.mean(tr_list[-periods:])
+
+
+def loop_volatility(close):
+    """Bloque original de volatilidad del agente (últimos 21 cierres)"""
+    close = close[-21:]
+    returns = np.diff(close) / close[:-1]
+    return np.std(returns) * np.sqrt(252)
+
+
+class TestArrayKernels(unittest.TestCase):
+    """ATR y volatilidad sobre arrays (varios tickers o fechas a la vez)."""
+
+    def setUp(self):
+        self.df = pd.read_csv(os.path.join(FIXTURES_DIR, 'ohlcv_daily_5y.csv'),
+                              index_col=0, parse_dates=[0])
+        self.high, self.low, self.close = (self.df[c].values for c in ('High', 'Low', 'Close'))
+
+    def test_atr_matches_loop_and_rolling(self):
+        for end in (15, 40, 500, len(self.df)):
+            window = slice(end - 15, end)
+            atr = indicators.atr_last(self.high[window], self.low[window], self.close[window])
+            self.assertAlmostEqual(atr, loop_atr(self.high[window], self.low[window],
+                                                 self.close[window]), places=10)
+        rolling = indicators.calculate_atr(self.df).iloc[-1]
+        self.assertAlmostEqual(indicators.atr_last(self.high, self.low, self.close), rolling, places=10)
+
+    def test_volatility_matches_loop(self):
+        for end in (21, 300, len(self.df)):
+            self.assertAlmostEqual(indicators.annualized_volatility(self.close[:end]),
+                                   loop_volatility(self.close[:end]), places=12)
+
+    def test_batches_match_rows(self):
+        """Con 2D (tickers x días) cada fila coincide con el cálculo individual"""
+        rows = [slice(i, i + 60) for i in (0, 200, 700)]
+        high, low, close = (np.stack([x[r] for r in rows]) for x in (self.high, self.low, self.close))
+
+        atr = indicators.atr_last(high, low, close)
+        volatility = indicators.annualized_volatility(close)
+        for i, r in enumerate(rows):
+            self.assertEqual(atr[i], indicators.atr_last(self.high[r], self.low[r], self.close[r]))
+            self.assertEqual(volatility[i], indicators.annualized_volatility(self.close[r]))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import logging
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'backtesting', 'scripts'))
+
+import backtest_storage
+import parameter_optimizer
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ohlcv_daily_5y.csv')
+
+
+class TestSimulateLongOnly(unittest.TestCase):
+
+    def test_enter_on_buy_exit_on_sell(self):
+        close = np.array([100, 100, 110, 121, 121, 100, 100], dtype=float)
+        signals = np.array([[0, 0], [1, 0], [0, 0], [-1, 0], [0, 1], [0, 0], [-1, 0]])
+        first, idle = parameter_optimizer.simulate_long_only(close, signals)
+
+        # Comprado de la vela 1 a la 3: +21%
+        self.assertAlmostEqual(first['return'], 21.0)
+        self.assertEqual(first['trades'], 1)
+        self.assertEqual(first['win_rate'], 1.0)
+        self.assertEqual(first['max_drawdown'], 0.0)
+
+        # Comprado de la vela 4 a la 6: 121 -> 100
+        self.assertAlmostEqual(idle['return'], (100 / 121 - 1) * 100)
+        self.assertEqual(idle['win_rate'], 0.0)
+        self.assertAlmostEqual(idle['max_drawdown'], 1 - 100 / 121)
+
+
+class TestGridSearchThresholds(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.INFO)
+        self.tmp_dir = tempfile.mkdtemp()
+        daily = pd.read_csv(FIXTURE, index_col=0, parse_dates=[0])
+        backtest_storage.CsvStorage(self.tmp_dir).write('AAPL', daily)
+        self.optimizer = parameter_optimizer.ParameterOptimizer(
+            results_dir=os.path.join(self.tmp_dir, 'results'), data_dir=self.tmp_dir)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_grid_matches_single_evaluations(self):
+        """La evaluación vectorizada coincide con evaluar cada combinación por separado"""
+        window = {'start_date': '2022-01-01', 'end_date': '2023-06-30'}
+        result = self.optimizer.grid_search_thresholds(buy_range=(30, 44, 7), sell_range=(50, 64, 7),
+                                                       ticker='AAPL', **window)
+        self.assertEqual(len(result['all_results']), 9)
+        self.assertTrue(any(r['trades'] > 0 for r in result['all_results']))
+
+        for row in result['all_results']:
+            single = self.optimizer._evaluate_parameters('AAPL', row['buy_threshold'], row['sell_threshold'],
+                                                         **window)
+            self.assertAlmostEqual(single['return'], row['return'])
+            self.assertEqual(single['trades'], row['trades'])
+
+    def test_missing_data_is_neutral(self):
+        metrics = self.optimizer._evaluate_parameters('MISSING', 40, 60)
+        self.assertEqual(metrics['trades'], 0)
+        self.assertEqual(metrics['return'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.data import price_store
+from src.spectral_galileo.data import market_data
+
+
+def make_history(start, periods, tz="America/New_York", base=100.0):
+    dates = pd.date_range(start, periods=periods, freq="B", tz=tz)
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': np.full(periods, 1_000_000, dtype='int64')
+    }, index=dates)
+
+
+class FakeProvider:
+    """Simula ticker.history() registrando cada llamada."""
+
+    def __init__(self, history):
+        self.history = history
+        self.calls = []
+
+    def fetch(self, period=None, start=None):
+        self.calls.append({'period': period, 'start': start})
+        if start is not None:
+            start_ts = pd.Timestamp(start).tz_localize(self.history.index.tz)
+            return self.history[self.history.index >= start_ts]
+        return self.history
+
+
+class TestPriceStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = price_store.PriceStore(base_dir=self.tmp_dir, max_age_seconds=0)
+        start = pd.Timestamp.now().normalize() - pd.Timedelta(days=300)
+        self.full = make_history(start.strftime('%Y-%m-%d'), 200)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip_preserves_ohlcv_and_timezone(self):
+        """Escribir y leer devuelve los mismos datos e índice"""
+        self.store.write('AAPL', '1d', self.full, covered_since=self.full.index[0])
+        loaded = self.store.read('AAPL', '1d')
+
+        pd.testing.assert_frame_equal(loaded, self.full, check_names=False, check_freq=False,
+                                      check_index_type=False)
+        self.assertEqual(str(loaded.index.tz), 'America/New_York')
+
+    def test_first_call_downloads_full_period(self):
+        """Sin datos locales se descarga el periodo completo"""
+        provider = FakeProvider(self.full)
+        data = self.store.get_history('AAPL', '1y', '1d', provider.fetch)
+
+        self.assertEqual(provider.calls, [{'period': '1y', 'start': None}])
+        self.assertEqual(len(data), len(self.full))
+
+    def test_refresh_fetches_only_tail(self):
+        """Con datos locales solo se piden las barras finales"""
+        provider = FakeProvider(self.full.iloc[:-5])
+        self.store.get_history('AAPL', '1y', '1d', provider.fetch)
+
+        provider.history = self.full
+        data = self.store.get_history('AAPL', '1y', '1d', provider.fetch)
+
+        self.assertIsNone(provider.calls[-1]['period'])
+        self.assertIsNotNone(provider.calls[-1]['start'])
+        self.assertEqual(len(data), len(self.full))
+        self.assertAlmostEqual(data['Close'].iloc[-1], self.full['Close'].iloc[-1])
+        self.assertFalse(data.index.duplicated().any())
+
+    def test_fresh_store_skips_provider(self):
+        """Dentro de max_age no se consulta al proveedor"""
+        store = price_store.PriceStore(base_dir=self.tmp_dir, max_age_seconds=3600)
+        provider = FakeProvider(self.full)
+        store.get_history('AAPL', '1y', '1d', provider.fetch)
+        store.get_history('AAPL', '1y', '1d', provider.fetch)
+
+        self.assertEqual(len(provider.calls), 1)
+
+    def test_restated_overlap_triggers_reload(self):
+        """Si la barra de solape cambió (split/dividendo) se recarga la serie"""
+        provider = FakeProvider(self.full.iloc[:-5])
+        self.store.get_history('AAPL', '1y', '1d', provider.fetch)
+
+        restated = self.full.copy()
+        restated[['Open', 'High', 'Low', 'Close']] *= 0.5
+        provider.history = restated
+        data = self.store.get_history('AAPL', '1y', '1d', provider.fetch)
+
+        self.assertEqual(len(data), len(restated))
+        np.testing.assert_allclose(data['Close'].values, restated['Close'].values)
+
+    def test_longer_period_extends_coverage(self):
+        """Un periodo más largo que lo almacenado fuerza descarga completa"""
+        provider = FakeProvider(self.full)
+        self.store.get_history('AAPL', '6mo', '1d', provider.fetch)
+        self.store.get_history('AAPL', '1y', '1d', provider.fetch)
+
+        self.assertEqual(provider.calls[-1], {'period': '1y', 'start': None})
+
+    def test_append_does_not_modify_mapped_file(self):
+        """Un lector con la serie ya mapeada sigue viendo la versión anterior completa"""
+        self.store.write('AAPL', '1d', self.full.iloc[:-1], covered_since=self.full.index[0])
+        mapped = self.store._records('AAPL', '1d')
+        before = np.array(mapped)
+
+        restated_tail = self.full.iloc[-2:].copy()
+        restated_tail['Close'] += 10.0
+        self.store.append('AAPL', '1d', restated_tail)
+
+        np.testing.assert_array_equal(mapped, before)
+        loaded = self.store.read('AAPL', '1d')
+        self.assertEqual(len(loaded), len(self.full))
+        np.testing.assert_allclose(loaded['Close'].values[-2:], restated_tail['Close'].values)
+        self.assertEqual([f for f in os.listdir(self.tmp_dir) if f.endswith('.tmp')], [])
+
+    def test_is_storable(self):
+        """Solo periodos conocidos con velas diarias o superiores"""
+        self.assertTrue(price_store.is_storable('1y', '1d'))
+        self.assertTrue(price_store.is_storable('5y', '1mo'))
+        self.assertFalse(price_store.is_storable('1d', '1d'))
+        self.assertFalse(price_store.is_storable('1y', '1h'))
+
+
+
+class TestBatchHistoryShape(unittest.TestCase):
+    """get_batch_historical_data devuelve lo mismo que la ruta individual"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        start = pd.Timestamp.now().normalize() - pd.Timedelta(days=300)
+        self.histories = {
+            'AAPL': make_history(start.strftime('%Y-%m-%d'), 200),
+            'SAP.DE': make_history(start.strftime('%Y-%m-%d'), 200, tz='Europe/Berlin', base=50.0),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def fake_download(self, tickers, ignore_tz=None, **kwargs):
+        """Como yf.download: float, Dividends/Stock Splits según actions, zona más común"""
+        frames = {}
+        for symbol in tickers:
+            frame = self.histories[symbol].astype('float64')
+            frame['Adj Close'] = frame['Close']
+            frame.index = (frame.index.tz_localize(None) if ignore_tz
+                           else frame.index.tz_convert('America/New_York'))
+            frames[symbol] = frame
+        return pd.concat(frames, axis=1)
+
+    def test_matches_per_ticker_path(self):
+        timezones = {'AAPL': 'America/New_York', 'SAP.DE': 'Europe/Berlin'}
+        with patch.object(market_data.yf, 'download', self.fake_download), \
+             patch.object(market_data, '_exchange_timezone', timezones.get):
+            batch = market_data.get_batch_historical_data(['AAPL', 'SAP.DE'])
+
+        store = price_store.PriceStore(base_dir=self.tmp_dir)
+        for symbol, history in self.histories.items():
+            ticker_history = history.assign(Dividends=0.0, **{'Stock Splits': 0.0})
+            single = store.get_history(symbol, '1y', '1d', FakeProvider(ticker_history).fetch)
+            pd.testing.assert_frame_equal(batch[symbol], single)
+            self.assertEqual(str(batch[symbol].index.tz), timezones[symbol])
+
+
+if __name__ == '__main__':
+    unittest.main()
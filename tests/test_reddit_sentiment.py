@@ -0,0 +1,272 @@
+import unittest
+import sys
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.external import reddit_sentiment
+
+
+def post(title, score=50, comments=10):
+    return {'title': title, 'score': score, 'upvote_ratio': 0.9, 'num_comments': comments,
+            'created_utc': time.time() - 60, 'permalink': '/r/x/1', 'selftext': ''}
+
+
+def fake_search(delays=None):
+    """fetch_subreddit_search simulado: un post alcista por subreddit, con retardo opcional"""
+    delays = delays or {}
+
+    def search(subreddit, query, limit=25):
+        time.sleep(delays.get(subreddit, 0.0))
+        return [post(f"{subreddit}: buying calls, to the moon")]
+    return search
+
+
+class TestSubredditFanOut(unittest.TestCase):
+
+    def analyze(self, search):
+        with patch.object(reddit_sentiment, 'fetch_subreddit_search', side_effect=search):
+            started = time.monotonic()
+            result = reddit_sentiment._get_reddit_sentiment_internal('AAPL')
+            return result, time.monotonic() - started
+
+    def test_subreddits_queried_concurrently(self):
+        delay = 0.3
+        result, elapsed = self.analyze(fake_search({s: delay for s in reddit_sentiment.SUBREDDITS}))
+
+        self.assertLess(elapsed, 2 * delay)
+        self.assertEqual(result['mentions'], len(reddit_sentiment.SUBREDDITS))
+        self.assertEqual(result['subreddits_failed'], [])
+
+    def test_slow_subreddit_only_reduces_coverage(self):
+        """Un subreddit vencido no anula la señal de los demás"""
+        with patch.object(reddit_sentiment, 'SUBREDDIT_DEADLINE', 0.2):
+            result, elapsed = self.analyze(fake_search({'stocks': 2.0}))
+
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(result['sentiment'], 'BULLISH')
+        self.assertEqual(result['mentions'], len(reddit_sentiment.SUBREDDITS) - 1)
+        self.assertEqual(result['subreddits_failed'], ['stocks'])
+        self.assertNotIn('stocks', {p['subreddit'] for p in result['top_posts']})
+
+    def test_all_subreddits_failing_is_neutral(self):
+        def broken(subreddit, query, limit=25):
+            raise ConnectionError("sin red")
+
+        result, _ = self.analyze(broken)
+        self.assertEqual(result['sentiment'], 'NEUTRAL')
+        self.assertEqual(result['mentions'], 0)
+        self.assertEqual(len(result['subreddits_failed']), len(reddit_sentiment.SUBREDDITS))
+
+    def test_old_posts_are_ignored(self):
+        def search(subreddit, query, limit=25):
+            old = post('old calls')
+            old['created_utc'] = time.time() - 3 * 86400
+            return [old]
+
+        result, _ = self.analyze(search)
+        self.assertEqual(result['mentions'], 0)
+        self.assertEqual(result['subreddits_searched'], len(reddit_sentiment.SUBREDDITS))
+
+
+STREAM = {
+    'wallstreetbets': [post('$NVDA calls printing, to the moon'), post('AAPL puts, this will crash'),
+                       post('The CEO said YOLO on $tsla again')],
+    'stocks': [post('Why I am long AAPL and $NVDA'), post('Old news about MSFT')],
+    'investing': [post('Index funds only')],
+    'StockMarket': [],
+}
+
+
+def fake_stream(subreddit, since=None, pages=reddit_sentiment.STREAM_PAGES):
+    return STREAM[subreddit], 0
+
+
+class TestMentionIndex(unittest.TestCase):
+
+    def setUp(self):
+        STREAM['stocks'][1]['created_utc'] = time.time() - 3 * 86400
+        self.index = reddit_sentiment.MentionIndex(STREAM, universe=['AAPL', 'NVDA', 'MSFT'])
+
+    def tearDown(self):
+        reddit_sentiment.stop_mention_index()
+
+    def test_cashtags_and_universe_symbols(self):
+        self.assertEqual(self.index.tickers_in('$nvda and AAPL, CEO, YOLO, GOOG'), {'NVDA', 'AAPL'})
+        self.assertEqual(len(self.index.mentions('NVDA')), 2)
+        self.assertEqual(len(self.index.mentions('AAPL')), 2)
+        self.assertEqual(len(self.index.mentions('TSLA')), 1)  # Cashtag fuera del universo
+        self.assertEqual(self.index.mentions('CEO'), [])
+
+    def test_time_window_and_cap(self):
+        cutoff = time.time() - 86400
+        self.assertEqual(self.index.mentions('MSFT', cutoff), [])
+        self.assertEqual(len(self.index.mentions('MSFT')), 1)
+        self.assertEqual(len(self.index.mentions('NVDA', max_posts=0)), 0)
+
+    def test_index_matches_per_ticker_search(self):
+        """El índice da el mismo resultado que buscar ticker por ticker"""
+        def search(subreddit, query, limit=25):
+            ticker = query.split()[-1]
+            return [p for p in STREAM[subreddit]
+                    if ticker in self.index.tickers_in(f"{p['title']} {p['selftext']}")]
+
+        universe = ['AAPL', 'NVDA', 'MSFT']
+        with patch.object(reddit_sentiment, 'fetch_subreddit_search', side_effect=search):
+            searched = {t: reddit_sentiment._get_reddit_sentiment_internal(t) for t in universe}
+
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=fake_stream), \
+             patch.object(reddit_sentiment, 'fetch_subreddit_search') as search_calls:
+            reddit_sentiment.use_mention_index(universe)
+            indexed = {t: reddit_sentiment._get_reddit_sentiment_internal(t) for t in universe}
+
+        search_calls.assert_not_called()
+        self.assertEqual(indexed, searched)
+
+    def test_one_stream_read_per_window(self):
+        """El coste escala con los subreddits, no con los tickers"""
+        universe = [f"T{i}" for i in range(30)] + ['AAPL', 'NVDA']
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=fake_stream) as fetch, \
+             patch.object(reddit_sentiment, 'fetch_subreddit_search') as search:
+            reddit_sentiment.use_mention_index(universe)
+            results = [reddit_sentiment.get_reddit_sentiment(t) for t in universe]
+            hype = reddit_sentiment.analyze_wsb_hype('NVDA')
+
+        self.assertEqual(fetch.call_count, len(reddit_sentiment.SUBREDDITS))
+        search.assert_not_called()
+        self.assertEqual(results[-1]['mentions'], 2)
+        self.assertEqual(results[0]['mentions'], 0)
+        self.assertEqual(hype['mentions'], 2)
+
+    def test_outside_universe_uses_search(self):
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=fake_stream) as fetch, \
+             patch.object(reddit_sentiment, 'fetch_subreddit_search', return_value=[]) as search:
+            reddit_sentiment.use_mention_index(['AAPL'])
+            fetch.reset_mock()
+            reddit_sentiment._get_reddit_sentiment_internal('GOOG')
+
+        fetch.assert_not_called()
+        self.assertEqual(search.call_count, len(reddit_sentiment.SUBREDDITS))
+
+    def listing_responses(self, pages):
+        listings = [{'data': {'children': [{'data': p} for p in posts], 'after': after}}
+                    for posts, after in pages]
+        return [SimpleNamespace(json=lambda listing=listing: listing, raise_for_status=lambda: None)
+                for listing in listings]
+
+    def test_stream_pagination(self):
+        responses = self.listing_responses([([post('$AAPL one')], 't3_x'), ([post('$AAPL two')], None)])
+        with patch.object(reddit_sentiment.http_client, 'get', side_effect=responses) as get:
+            posts, covered_since = reddit_sentiment.fetch_subreddit_stream('stocks', pages=3)
+
+        self.assertEqual([p['title'] for p in posts], ['$AAPL one', '$AAPL two'])
+        self.assertEqual(covered_since, 0)  # El listado se agotó
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(get.call_args.kwargs['params']['after'], 't3_x')
+
+    def test_stream_pages_back_to_window(self):
+        """Se pagina hasta pasar el inicio de la ventana, no un número fijo de páginas"""
+        now = time.time()
+        def aged(title, hours):
+            p = post(title)
+            p['created_utc'] = now - hours * 3600
+            return p
+
+        pages = [([aged('$AAPL a', 1)], 't3_1'), ([aged('$AAPL b', 10)], 't3_2'),
+                 ([aged('$AAPL c', 30)], 't3_3'), ([aged('$AAPL d', 40)], None)]
+        with patch.object(reddit_sentiment.http_client, 'get', side_effect=self.listing_responses(pages)) as get:
+            posts, covered_since = reddit_sentiment.fetch_subreddit_stream('stocks', since=now - 24 * 3600)
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(len(posts), 3)
+        self.assertLess(covered_since, now - 24 * 3600)
+
+    def test_short_stream_reduces_window(self):
+        """Si el tope de páginas no alcanza 24h, la cobertura lo dice"""
+        def stream(subreddit, since=None, pages=reddit_sentiment.STREAM_PAGES):
+            covered = time.time() - 10 * 3600 if subreddit == 'wallstreetbets' else 0
+            return STREAM[subreddit], covered
+
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=stream):
+            reddit_sentiment.use_mention_index(['AAPL'])
+            day = reddit_sentiment._get_reddit_sentiment_internal('AAPL', hours=24)
+            hype = reddit_sentiment._get_reddit_sentiment_internal('AAPL', hours=6)
+
+        self.assertAlmostEqual(day['window_hours'], 10, delta=0.1)
+        self.assertIn('covering 10.0h', day['message'])
+        self.assertEqual(hype['window_hours'], 6)
+
+    def test_failed_subreddit_reduces_coverage(self):
+        def stream(subreddit, since=None, pages=reddit_sentiment.STREAM_PAGES):
+            if subreddit == 'stocks':
+                raise ConnectionError("sin red")
+            return STREAM[subreddit], 0
+
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=stream):
+            reddit_sentiment.use_mention_index(['AAPL'])
+            result = reddit_sentiment._get_reddit_sentiment_internal('AAPL')
+
+        self.assertEqual(result['mentions'], 1)
+        self.assertEqual(result['subreddits_failed'], ['stocks'])
+
+    def test_index_built_once_per_scan(self):
+        """use_mention_index construye el índice; los tickers solo lo leen"""
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=fake_stream) as fetch:
+            reddit_sentiment.use_mention_index(['AAPL', 'NVDA'])
+            self.assertEqual(fetch.call_count, len(reddit_sentiment.SUBREDDITS))
+            reddit_sentiment.use_mention_index(['AAPL', 'NVDA'])  # Mismo universo y ventana
+            for ticker in ['AAPL', 'NVDA', 'AAPL']:
+                reddit_sentiment.get_reddit_sentiment(ticker)
+
+        self.assertEqual(fetch.call_count, len(reddit_sentiment.SUBREDDITS))
+
+    def test_failed_build_is_not_retried_per_ticker(self):
+        """Con Reddit caído no se reconstruye el índice en cada ticker"""
+        def down(subreddit, since=None, pages=reddit_sentiment.STREAM_PAGES):
+            raise ConnectionError("429")
+
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=down) as fetch, \
+             patch.object(reddit_sentiment, 'fetch_subreddit_search') as search:
+            reddit_sentiment.use_mention_index(['AAPL', 'NVDA'])
+            results = [reddit_sentiment.get_reddit_sentiment(t) for t in ['AAPL', 'NVDA', 'AAPL']]
+
+        self.assertEqual(fetch.call_count, len(reddit_sentiment.SUBREDDITS))
+        search.assert_not_called()
+        self.assertTrue(all(r['sentiment'] == 'NEUTRAL' and r['subreddits_searched'] == 0 for r in results))
+
+        with patch.object(reddit_sentiment, 'INDEX_RETRY_SECONDS', 0), \
+             patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=down) as fetch:
+            reddit_sentiment.stop_mention_index()
+            reddit_sentiment.use_mention_index(['AAPL'])
+            reddit_sentiment.get_reddit_sentiment('AAPL')
+            reddit_sentiment._rebuild_thread.join()
+        self.assertEqual(fetch.call_count, 2 * len(reddit_sentiment.SUBREDDITS))
+
+    def test_window_rollover_rebuilds_in_background(self):
+        """Al cambiar de ventana el ticker responde con el índice anterior sin esperar la reconstrucción"""
+        def slow_stream(subreddit, since=None, pages=reddit_sentiment.STREAM_PAGES):
+            time.sleep(0.5)
+            return STREAM[subreddit], 0
+
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=fake_stream):
+            previous = reddit_sentiment.use_mention_index(['AAPL', 'NVDA'])
+        reddit_sentiment._index_state['bucket'] -= 1  # La ventana cambió
+
+        with patch.object(reddit_sentiment, 'fetch_subreddit_stream', side_effect=slow_stream) as fetch, \
+             patch.object(reddit_sentiment, 'fetch_subreddit_search') as search:
+            started = time.monotonic()
+            results = [reddit_sentiment.get_reddit_sentiment(t) for t in ['NVDA', 'AAPL', 'NVDA']]
+            elapsed = time.monotonic() - started
+            reddit_sentiment._rebuild_thread.join()
+
+        self.assertLess(elapsed, 0.3)
+        search.assert_not_called()
+        self.assertEqual(fetch.call_count, len(reddit_sentiment.SUBREDDITS))
+        self.assertEqual([r['mentions'] for r in results], [2, 2, 2])
+        self.assertIsNot(reddit_sentiment.get_mention_index('AAPL'), previous)
+
+
+if __name__ == '__main__':
+    unittest.main()
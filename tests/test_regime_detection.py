@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.analysis import regime_detection
+from src.spectral_galileo.core.data_manager import DataManager
+from src.spectral_galileo.data.shared_cache import SharedCache
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ohlcv_daily_5y.csv')
+
+BULL = {
+    'regime': 'BULL',
+    'confidence': 80.0,
+    'description': 'Mercado alcista - tendencia positiva',
+    'thresholds': {'buy': 40, 'sell': 60},
+}
+
+
+class TestRegimeDetection(unittest.TestCase):
+
+    def setUp(self):
+        regime_detection._regime_cache.update(bucket=None, data=None)
+        self.spy = pd.read_csv(FIXTURE, index_col=0, parse_dates=[0])
+
+    def tearDown(self):
+        regime_detection._regime_cache.update(bucket=None, data=None)
+
+    def test_regime_from_history(self):
+        """El régimen se calcula a partir de la historia dada sin modificarla"""
+        columns = list(self.spy.columns)
+        regime = regime_detection.regime_from_history(self.spy)
+
+        self.assertIn(regime['regime'], ('BULL', 'BEAR', 'SIDEWAYS'))
+        self.assertIn('buy', regime['thresholds'])
+        self.assertEqual(list(self.spy.columns), columns)
+
+    def test_empty_history_is_unknown(self):
+        regime = regime_detection.regime_from_history(self.spy.iloc[:0])
+        self.assertEqual(regime['regime'], 'UNKNOWN')
+        self.assertIn('thresholds', regime)
+
+    def test_market_regime_computed_once_per_bucket(self):
+        """Varias llamadas dentro de la misma ventana comparten el cálculo"""
+        with patch.object(regime_detection, 'detect_market_regime', return_value=BULL) as detect:
+            for _ in range(5):
+                regime_detection.get_market_regime()
+        self.assertEqual(detect.call_count, 1)
+
+    def test_unknown_regime_not_cached(self):
+        unknown = {'regime': 'UNKNOWN', 'confidence': 0, 'thresholds': {'buy': 50, 'sell': 50}}
+        with patch.object(regime_detection, 'detect_market_regime', return_value=unknown) as detect:
+            regime_detection.get_market_regime()
+            regime_detection.get_market_regime()
+        self.assertEqual(detect.call_count, 2)
+
+    def test_adjusted_thresholds_use_supplied_regime(self):
+        """Con regime_data no se vuelve a detectar el régimen"""
+        with patch.object(regime_detection, 'detect_market_regime') as detect:
+            thresholds = regime_detection.get_regime_adjusted_thresholds(0.6, regime_data=BULL)
+        detect.assert_not_called()
+        self.assertEqual(thresholds['buy_threshold'], 45)
+        self.assertEqual(thresholds['regime'], 'BULL')
+
+
+class TestRegimeTimeline(unittest.TestCase):
+
+    def setUp(self):
+        self.spy = pd.read_csv(FIXTURE, index_col=0, parse_dates=[0])
+        self.timeline = regime_detection.RegimeTimeline.from_history(self.spy)
+
+    def test_matches_point_in_time_detection(self):
+        """Cada fecha coincide con detectar el régimen usando solo los datos hasta ese día"""
+        for position in (0, 30, 62, 63, 150, 199, 200, 640, len(self.spy) - 1):
+            date = self.spy.index[position]
+            expected = regime_detection.regime_from_history(self.spy.iloc[:position + 1])
+            np.testing.assert_equal(self.timeline.at(date), expected, err_msg=str(date))
+
+    def test_non_trading_day_uses_previous_close(self):
+        friday = self.spy.index[(self.spy.index.dayofweek == 4)][60]
+        saturday = friday + pd.Timedelta(days=1)
+        self.assertIs(self.timeline.at(saturday), self.timeline.at(friday))
+
+    def test_before_history_is_unknown(self):
+        date = self.spy.index[0] - pd.Timedelta(days=10)
+        self.assertEqual(self.timeline.at(date)['regime'], 'UNKNOWN')
+
+    def test_empty_history(self):
+        timeline = regime_detection.RegimeTimeline.from_history(self.spy.iloc[:0])
+        self.assertEqual(len(timeline), 0)
+        self.assertEqual(timeline.at(self.spy.index[0])['regime'], 'UNKNOWN')
+
+
+class TestDataManagerRegime(unittest.TestCase):
+
+    def setUp(self):
+        regime_detection._regime_cache.update(bucket=None, data=None)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = SharedCache(path=os.path.join(self.tmp_dir, 'cache.db'))
+
+    def tearDown(self):
+        regime_detection._regime_cache.update(bucket=None, data=None)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_regime_shared_across_managers(self):
+        """Otro DataManager (otro proceso) reutiliza el régimen de la caché compartida"""
+        with patch.object(regime_detection, 'detect_market_regime', return_value=BULL) as detect:
+            first = DataManager(cache=self.cache).get_market_regime()
+            regime_detection._regime_cache.update(bucket=None, data=None)
+            second = DataManager(cache=self.cache).get_market_regime()
+
+        self.assertEqual(detect.call_count, 1)
+        self.assertEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
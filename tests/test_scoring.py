@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.analysis import indicators
+from src.spectral_galileo.analysis import scoring
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ohlcv_daily_5y.csv')
+
+PARAM_SETS = [
+    {},
+    {'buy_threshold': 30.0, 'sell_threshold': 60.0},
+    {'w_rsi': 0.6, 'w_macd': 0.3, 'w_stoch': 0.1},
+    {'buy_threshold': 45.0, 'w_rsi': 0.4, 'w_macd': 0.4, 'w_stoch': 0.2},
+]
+
+
+def random_features(n, seed=5):
+    rng = np.random.default_rng(seed)
+    features = np.empty((n, len(scoring.FEATURES)))
+    features[:, scoring.RSI] = rng.uniform(5, 95, n)
+    features[:, scoring.MACD] = rng.normal(0, 1, n)
+    features[:, scoring.MACD_SIGNAL] = rng.normal(0, 1, n)
+    features[:, scoring.STOCH_K] = rng.uniform(0, 100, n)
+    features[:, scoring.VOLATILITY] = rng.uniform(0, 0.9, n)
+    features[:, scoring.CATEGORY] = rng.integers(0, len(scoring.CATEGORIES), n)
+    features[:, scoring.IS_ETF] = rng.integers(0, 2, n)
+    features[:3, scoring.VOLATILITY] = [0.0, 0.04, 0.10]   # Bordes de los tramos
+    return features
+
+
+class TestScoringKernel(unittest.TestCase):
+
+    def test_batch_matches_scalar(self):
+        """score_batch (N x M) coincide con score_features celda a celda"""
+        features = random_features(300)
+        batch = scoring.score_batch(features, PARAM_SETS)
+        signals = {'BUY': 1, 'HOLD': 0, 'SELL': -1}
+
+        self.assertEqual(batch['final_score'].shape, (300, len(PARAM_SETS)))
+        for i, vector in enumerate(features):
+            for j, params in enumerate(PARAM_SETS):
+                expected = scoring.score_features(vector, params)
+                self.assertAlmostEqual(batch['final_score'][i, j], expected['final_score'], places=9)
+                self.assertAlmostEqual(batch['confidence'][i, j], expected['confidence'], places=9)
+                self.assertEqual(batch['buy_threshold'][i, j], expected['buy_threshold'])
+                self.assertEqual(batch['sell_threshold'][i, j], expected['sell_threshold'])
+                self.assertEqual(batch['signal'][i, j], signals[expected['signal']])
+
+    def test_thresholds_default_to_category(self):
+        vector = scoring.feature_vector({'RSI': 25, 'MACD': 1, 'MACD_Signal': 0, 'Stoch_K': 10},
+                                        0.20, 'AAPL')
+        result = scoring.score_features(vector)
+        self.assertEqual((result['buy_threshold'], result['sell_threshold']),
+                         scoring.CATEGORY_THRESHOLDS['mega_cap_stable'])
+
+        result = scoring.score_features(vector, {'buy_threshold': 90.0, 'w_tech': 2.0})
+        self.assertEqual(result['buy_threshold'], 90.0)
+        self.assertEqual(result['signal'], 'BUY')
+
+    def test_confidence_with_nan_volatility(self):
+        """Volatilidad NaN aporta 0, como el max(0, nan) escalar original"""
+        confidence = scoring.calculate_confidence_short_term(50, 60, 40, float('nan'))
+        self.assertAlmostEqual(confidence, 58.57, places=2)
+        aligned = scoring.calculate_confidence_short_term(50, 50, 50, float('nan'))
+        self.assertEqual(scoring.short_term_verdict('BUY', 40, aligned), "COMPRA 🟢")
+
+        batch = scoring.confidence_batch(np.array([50, 50]), np.array([60, 60]), np.array([40, 40]),
+                                         np.array([np.nan, 0.05]))
+        self.assertFalse(np.isnan(batch).any())
+        self.assertAlmostEqual(batch[0], confidence, places=9)
+
+    def test_categorize_batch(self):
+        volatility = np.array([0.0, 0.2, 0.35, 0.349, 0.45, 0.46, 0.9, np.nan])
+        for ticker in ('AAPL', 'TSLA', 'KO', 'JPM', 'XYZ', None):
+            expected = [scoring.CATEGORIES.index(scoring.categorize_stock_for_thresholds(v, ticker))
+                        for v in volatility]
+            np.testing.assert_array_equal(scoring.categorize_batch(volatility, ticker), expected,
+                                          err_msg=str(ticker))
+
+    def test_long_term_verdict_codes(self):
+        confidence = np.array([-20, -10, 0, 5, 24.9, 25, 29.9, 30, 31, 60])
+        probability = np.array([90, 90, 90, 90, 90, 90, 90, 90, 79, np.nan])
+        codes = scoring.long_term_verdict_codes(confidence[:, None], probability[:, None],
+                                                np.array([[25.0, 40.0]]))
+        for i, (conf, prob) in enumerate(zip(confidence, probability)):
+            for j, buy in enumerate((25.0, 40.0)):
+                prob_arg = None if np.isnan(prob) else prob
+                self.assertEqual(scoring.LONG_TERM_VERDICTS[codes[i, j]],
+                                 scoring.long_term_verdict(conf, prob_arg, buy))
+        self.assertEqual(scoring.long_term_verdict(30, 80, 25), "FUERTE COMPRA 🚀")
+        self.assertEqual(scoring.long_term_verdict(30, None, 25), "COMPRA 🟢")
+
+
+class TestFeaturesFromFrame(unittest.TestCase):
+
+    def test_rows_match_point_in_time_vectors(self):
+        """Cada fila usa solo la historia hasta esa vela"""
+        data = indicators.with_indicators(pd.read_csv(FIXTURE, index_col=0, parse_dates=[0]))
+        features = scoring.features_from_frame(data, 'AAPL')
+
+        for position in (25, 300, len(data) - 1):
+            close = data['Close'].to_numpy()[position - 20:position + 1]
+            returns = np.diff(close) / close[:-1]
+            volatility = np.std(returns) * np.sqrt(252)
+            expected = scoring.feature_vector(data.iloc[position], volatility, 'AAPL')
+            np.testing.assert_allclose(features[position], expected, rtol=1e-9, err_msg=str(position))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,221 @@
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest.mock import patch
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.data import shared_cache
+from src.spectral_galileo.core import data_manager
+from src.spectral_galileo.external import earnings_calendar
+from src.spectral_galileo.external import insider_trading
+
+
+class TestSharedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'cache.db')
+        self.cache = shared_cache.SharedCache(path=self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip_dataframe(self):
+        """Los DataFrames se guardan y recuperan como copias independientes"""
+        df = pd.DataFrame({'Close': [1.0, 2.0, 3.0]})
+        self.cache.set('history', 'AAPL', df)
+
+        loaded = self.cache.get('history', 'AAPL')
+        pd.testing.assert_frame_equal(loaded, df)
+        loaded['Close'] = 0.0
+        pd.testing.assert_frame_equal(self.cache.get('history', 'AAPL'), df)
+
+    def test_visible_from_another_instance(self):
+        """Otra instancia (otro proceso) sobre la misma base ve las entradas"""
+        self.cache.set('fundamentals', 'AAPL', {'sector': 'Technology'})
+        other = shared_cache.SharedCache(path=self.path)
+
+        self.assertEqual(other.get('fundamentals', 'AAPL'), {'sector': 'Technology'})
+
+    def test_ttl_per_field(self):
+        """Cada campo expira según su propio TTL"""
+        cache = shared_cache.SharedCache(path=self.path, ttls={'news': 0, 'fundamentals': 3600})
+        cache.set('news', 'AAPL', [{'title': 'x'}])
+        cache.set('fundamentals', 'AAPL', {'sector': 'Technology'})
+
+        with patch.object(shared_cache.time, 'time', return_value=shared_cache.time.time() + 1):
+            self.assertIsNone(cache.get('news', 'AAPL'))
+            self.assertIsNotNone(cache.get('fundamentals', 'AAPL'))
+
+    def test_ttl_per_entry(self):
+        """Un TTL al guardar sustituye al del campo para esa entrada"""
+        self.cache.set('earnings', 'SHORT', {'a': 1}, ttl=60)
+        self.cache.set('earnings', 'LONG', {'a': 2})
+
+        with patch.object(shared_cache.time, 'time', return_value=shared_cache.time.time() + 120):
+            self.assertIsNone(self.cache.get('earnings', 'SHORT'))
+            self.assertEqual(self.cache.get('earnings', 'LONG'), {'a': 2})
+
+    def test_migrates_old_schema(self):
+        """Bases anteriores (sin expires_at) siguen funcionando"""
+        conn = sqlite3.connect(self.path)
+        conn.executescript(shared_cache._SCHEMA.replace('    expires_at REAL,\n', ''))
+        conn.close()
+
+        self.cache.set('news', 'AAPL', ['x'], ttl=60)
+        self.assertEqual(self.cache.get('news', 'AAPL'), ['x'])
+
+    def test_lru_eviction(self):
+        """Al superar el tope se desaloja la entrada menos usada"""
+        cache = shared_cache.SharedCache(path=self.path, max_entries={'news': 2})
+        now = shared_cache.time.time()
+        with patch.object(shared_cache.time, 'time', side_effect=[now - 3, now - 2, now - 1, now]):
+            cache.set('news', 'A', ['a'])
+            cache.set('news', 'B', ['b'])
+            cache.get('news', 'A')          # A pasa a ser la más reciente
+            cache.set('news', 'C', ['c'])   # desaloja B
+
+        self.assertIsNotNone(cache.get('news', 'A'))
+        self.assertIsNone(cache.get('news', 'B'))
+        self.assertIsNotNone(cache.get('news', 'C'))
+
+    def test_hit_miss_counters(self):
+        """Los contadores registran aciertos y fallos por campo"""
+        self.cache.get('history', 'AAPL')
+        self.cache.set('history', 'AAPL', pd.DataFrame({'Close': [1.0]}))
+        self.cache.get('history', 'AAPL')
+        self.cache.get('history', 'AAPL')
+
+        stats = self.cache.stats()['history']
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 1)
+
+
+class TestDataManagerCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = shared_cache.SharedCache(path=os.path.join(self.tmp_dir, 'cache.db'))
+        self.calls = []
+
+        def fetcher(field, value):
+            def fetch(ticker_obj):
+                self.calls.append(field)
+                return value
+            return fetch
+
+        self.fields = {
+            'history': fetcher('history', pd.DataFrame({'Close': [1.0, 2.0]})),
+            'fundamentals': fetcher('fundamentals', {'sector': 'Technology'}),
+            'news': fetcher('news', [{'title': 'x'}]),
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_second_manager_reuses_cached_fields(self):
+        """Un segundo DataManager no vuelve a consultar al proveedor"""
+        with patch.dict(data_manager.TICKER_FIELDS, self.fields):
+            data_manager.DataManager(cache=self.cache).get_ticker_data('AAPL')
+            data = data_manager.DataManager(cache=self.cache).get_ticker_data('aapl')
+
+        self.assertEqual(sorted(self.calls), ['fundamentals', 'history', 'news'])
+        self.assertEqual(data['fundamentals'], {'sector': 'Technology'})
+        self.assertIn('ticker_obj', data)
+
+    def test_empty_responses_not_cached(self):
+        """Respuestas vacías del proveedor no se guardan"""
+        self.fields['news'] = lambda ticker_obj: self.calls.append('news') or []
+        with patch.dict(data_manager.TICKER_FIELDS, self.fields):
+            data_manager.DataManager(cache=self.cache).get_ticker_data('AAPL')
+            data_manager.DataManager(cache=self.cache).get_ticker_data('AAPL')
+
+        self.assertEqual(self.calls.count('news'), 2)
+        self.assertEqual(self.calls.count('history'), 1)
+
+    def test_prefetch_seeds_history(self):
+        """prefetch descarga en batch solo los tickers no cacheados"""
+        batch_calls = []
+
+        def fake_batch(tickers, period='1y', interval='1d'):
+            batch_calls.append(list(tickers))
+            return {t: pd.DataFrame({'Close': [1.0, 2.0]}) for t in tickers if t != 'ZZZZ'}
+
+        dm = data_manager.DataManager(cache=self.cache)
+        with patch.object(data_manager.market_data, 'get_batch_historical_data', fake_batch), \
+                patch.dict(data_manager.TICKER_FIELDS, self.fields):
+            dm.prefetch(['msft', 'AAPL', 'ZZZZ'])
+            dm.prefetch(['AAPL', 'MSFT'])
+            dm.get_ticker_data('AAPL')
+
+        self.assertEqual(batch_calls, [['AAPL', 'MSFT', 'ZZZZ']])
+        self.assertNotIn('history', self.calls)
+
+
+class TestDailyExternalCache(unittest.TestCase):
+    """Earnings e insiders: una consulta a yfinance por ticker y día"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = shared_cache.SharedCache(path=os.path.join(self.tmp_dir, 'cache.db'))
+        self.earnings = {'available': True, 'ticker': 'AAPL', 'next_earnings_date': None,
+                         'days_to_earnings': None, 'earnings_trend': 'BEATING'}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_earnings_cached_per_trading_day(self):
+        with patch.object(earnings_calendar, 'fetch_earnings_info', return_value=self.earnings) as fetch:
+            for _ in range(3):
+                result = earnings_calendar.get_earnings_info('aapl', cache=self.cache)
+            with patch.object(shared_cache, 'trading_date', return_value='2099-01-02'):
+                earnings_calendar.get_earnings_info('AAPL', cache=self.cache)
+            earnings_calendar.get_earnings_info('AAPL', cache=self.cache, refresh=True)
+
+        self.assertEqual(result['earnings_trend'], 'BEATING')
+        self.assertEqual(fetch.call_count, 3)
+
+    def test_failures_not_cached(self):
+        failure = {'available': False, 'ticker': 'AAPL', 'message': 'error'}
+        with patch.object(insider_trading, 'fetch_insider_activity', return_value=failure) as fetch:
+            insider_trading.get_insider_activity('AAPL', cache=self.cache)
+            insider_trading.get_insider_activity('AAPL', cache=self.cache)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_expiry_around_next_report(self):
+        now = pd.Timestamp('2024-07-01 10:00')
+        day = 24 * 60 * 60
+
+        def ttl(offset):
+            data = {'next_earnings_date': now + offset}
+            return earnings_calendar.earnings_cache_ttl(data, self.cache, now=now)
+
+        self.assertEqual(ttl(pd.Timedelta(days=30)), day)
+        self.assertEqual(ttl(pd.Timedelta(hours=30)), 6 * 60 * 60)
+        self.assertEqual(ttl(pd.Timedelta(hours=5)), earnings_calendar.REPORT_TTL_SECONDS)
+        self.assertEqual(ttl(pd.Timedelta(hours=-5)), earnings_calendar.REPORT_TTL_SECONDS)
+        self.assertEqual(earnings_calendar.earnings_cache_ttl({'next_earnings_date': None}, self.cache), day)
+
+    def test_warm_up_fills_cache(self):
+        insider = {'available': True, 'ticker': 'AAPL', 'sentiment': 'BULLISH'}
+        with patch.object(earnings_calendar, 'fetch_earnings_info', return_value=self.earnings), \
+             patch.object(insider_trading, 'fetch_insider_activity', return_value=insider):
+            summary = data_manager.DataManager(cache=self.cache).warm_external(['AAPL', 'MSFT'])
+
+        self.assertEqual(summary, {'tickers': 2, 'earnings': 2, 'insider': 2})
+        with patch.object(earnings_calendar, 'fetch_earnings_info') as fetch_earnings, \
+             patch.object(insider_trading, 'fetch_insider_activity') as fetch_insider:
+            earnings_calendar.get_earnings_info('MSFT', cache=self.cache)
+            insider_trading.get_insider_activity('MSFT', days=90, cache=self.cache)
+        fetch_earnings.assert_not_called()
+        fetch_insider.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
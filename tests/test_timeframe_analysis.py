@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import pandas as pd
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.analysis import timeframe_analysis
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ohlcv_daily_5y.csv')
+
+
+def resample_until(daily, date, interval):
+    """Referencia: remuestrear desde cero solo los días hasta `date`"""
+    truncated = daily[daily.index <= date]
+    bars = truncated.resample(timeframe_analysis.RESAMPLE_RULES[interval]).agg(
+        timeframe_analysis.OHLCV_AGGREGATION)
+    return bars.dropna(subset=['Close'])
+
+
+class TestHistoricalTimeframes(unittest.TestCase):
+
+    def setUp(self):
+        self.daily = pd.read_csv(FIXTURE, index_col=0, parse_dates=[0])
+        self.timeframes = timeframe_analysis.HistoricalTimeframes(self.daily)
+        self.dates = [self.daily.index[i] for i in (300, 301, 302, 303, 304, 700, len(self.daily) - 1)]
+
+    def test_weekly_and_monthly_match_truncated_resample(self):
+        """Las barras (incluida la parcial) coinciden con remuestrear solo hasta la fecha"""
+        for interval, period in (('1wk', '2y'), ('1mo', '5y')):
+            for date in self.dates:
+                since = date - pd.Timedelta(days=timeframe_analysis.PERIOD_DAYS[period])
+                expected = resample_until(self.daily, date, interval)
+                expected = expected[expected.index >= since]
+                result = self.timeframes.bars_at(date, interval, period)
+                pd.testing.assert_frame_equal(result, expected, check_freq=False,
+                                              check_dtype=False, obj=f"{interval} {date}")
+
+    def test_daily_window(self):
+        date = self.dates[-2]
+        result = self.timeframes.bars_at(date, '1d', '1y')
+        self.assertEqual(result.index[-1], date)
+        self.assertGreater(result.index[0], date - pd.Timedelta(days=366))
+
+    def test_no_look_ahead(self):
+        """Los datos posteriores a la fecha simulada no afectan a las barras"""
+        date = self.dates[2]
+        altered = self.daily.copy()
+        altered.loc[altered.index > date, ['High', 'Close']] *= 10
+        frames = timeframe_analysis.HistoricalTimeframes(altered).frames_at(date)
+
+        for name, bars in self.timeframes.frames_at(date).items():
+            pd.testing.assert_frame_equal(frames[name], bars, obj=name)
+
+    def test_supplied_frames_skip_downloads(self):
+        """Con frames no se descarga nada"""
+        frames = self.timeframes.frames_at(self.dates[-1])
+        with patch.object(timeframe_analysis.market_data, 'get_historical_data') as fetch:
+            result = timeframe_analysis.analyze_multiple_timeframes('TEST', frames=frames)
+
+        fetch.assert_not_called()
+        self.assertIn('Daily', result['timeframes'])
+        self.assertIn('Weekly', result['timeframes'])
+        self.assertIn('Monthly', result['timeframes'])
+
+    def test_empty_frames_are_neutral(self):
+        with patch.object(timeframe_analysis.market_data, 'get_historical_data') as fetch:
+            result = timeframe_analysis.analyze_multiple_timeframes('TEST', frames={})
+        fetch.assert_not_called()
+        self.assertIsNone(result['confluence'])
+
+
+if __name__ == '__main__':
+    unittest.main()
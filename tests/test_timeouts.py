@@ -0,0 +1,157 @@
+import unittest
+import sys
+import os
+import time
+import concurrent.futures
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.spectral_galileo.utils import timeouts
+from src.spectral_galileo.analysis import timeframe_analysis
+from src.spectral_galileo.external import reddit_sentiment
+from src.spectral_galileo.core import agent as agent_module
+from src.spectral_galileo.core.agent import FinancialAgent
+
+
+def slow(value, seconds):
+    def run():
+        time.sleep(seconds)
+        return value
+    return run
+
+
+def fail():
+    raise RuntimeError("proveedor caído")
+
+
+class TestRunConcurrently(unittest.TestCase):
+
+    def test_tasks_run_in_parallel(self):
+        """El tiempo total es el de la tarea más lenta, no la suma"""
+        started = time.monotonic()
+        results, failures = timeouts.run_concurrently({
+            'a': (slow(1, 0.3), 5, None),
+            'b': (slow(2, 0.3), 5, None),
+            'c': (slow(3, 0.3), 5, None),
+        })
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(results, {'a': 1, 'b': 2, 'c': 3})
+        self.assertEqual(failures, {})
+        self.assertLess(elapsed, 0.8)
+
+    def test_deadline_returns_fallback(self):
+        """Una tarea vencida devuelve su fallback sin esperar a que termine"""
+        started = time.monotonic()
+        results, failures = timeouts.run_concurrently({
+            'fast': (slow('ok', 0.0), 5, None),
+            'hung': (slow('late', 2.0), 0.2, 'neutral'),
+        })
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(results, {'fast': 'ok', 'hung': 'neutral'})
+        self.assertIsInstance(failures['hung'], timeouts.DeadlineExceeded)
+
+    def test_error_returns_fallback(self):
+        results, failures = timeouts.run_concurrently({'bad': (fail, 5, {'sentiment': 'NEUTRAL'})})
+        self.assertEqual(results['bad'], {'sentiment': 'NEUTRAL'})
+        self.assertIsInstance(failures['bad'], RuntimeError)
+
+    def test_call_with_timeout(self):
+        self.assertEqual(timeouts.call_with_timeout(slow(5, 0.0), 1), 5)
+        self.assertEqual(timeouts.call_with_timeout(slow(5, 1.0), 0.1, default=0), 0)
+
+
+class TestDeadlinesInWorkerThreads(unittest.TestCase):
+    """Los plazos deben cumplirse fuera del hilo principal (scanners, Telegram)"""
+
+    def in_worker(self, func, *args):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            started = time.monotonic()
+            result = executor.submit(func, *args).result()
+            return result, time.monotonic() - started
+
+    def test_run_with_deadline(self):
+        def call():
+            try:
+                timeouts.run_with_deadline(slow(1, 2.0), 0.2)
+            except timeouts.DeadlineExceeded:
+                return 'expired'
+        result, elapsed = self.in_worker(call)
+        self.assertEqual(result, 'expired')
+        self.assertLess(elapsed, 1.0)
+
+    def test_reddit_deadline(self):
+        with patch.object(reddit_sentiment, 'REDDIT_DEADLINE', 0.2), \
+             patch.object(reddit_sentiment, '_get_reddit_sentiment_internal',
+                          side_effect=lambda *a: slow({'sentiment': 'BULLISH'}, 2.0)()):
+            result, elapsed = self.in_worker(reddit_sentiment.get_reddit_sentiment, 'AAPL')
+        self.assertEqual(result['sentiment'], 'NEUTRAL')
+        self.assertIn('timeout', result['message'])
+        self.assertLess(elapsed, 1.0)
+
+    def test_timeframe_deadline(self):
+        with patch.object(timeframe_analysis, 'TIMEFRAME_DEADLINE', 0.2), \
+             patch.object(timeframe_analysis.market_data, 'get_ticker_data'), \
+             patch.object(timeframe_analysis.market_data, 'get_historical_data',
+                          side_effect=lambda *a, **k: slow(pd.DataFrame(), 2.0)()):
+            result, elapsed = self.in_worker(timeframe_analysis.analyze_timeframe, 'AAPL', '1y', '1d')
+        self.assertIsNone(result)
+        self.assertLess(elapsed, 1.0)
+
+
+class TestAgentExternalFanOut(unittest.TestCase):
+
+    def setUp(self):
+        dates = pd.date_range('2024-01-01', periods=260, freq='B')
+        close = 100 + np.cumsum(np.random.default_rng(3).normal(0, 1, 260))
+        self.pre_data = {
+            'history': pd.DataFrame({
+                'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                'Volume': np.full(260, 1_000_000)
+            }, index=dates),
+            'fundamentals': {'sector': 'Technology', 'beta': 1.0},
+            'news': [],
+            'macro_data': {},
+            'market_regime': {'regime': 'BULL', 'confidence': 80.0,
+                              'thresholds': {'buy': 40, 'sell': 60}},
+            'timeframes': {},
+        }
+
+    def test_external_sources_run_concurrently(self):
+        """Reddit, earnings e insiders se consultan en paralelo"""
+        delay = 0.4
+        with patch.object(agent_module.reddit_sentiment, 'get_reddit_sentiment',
+                          side_effect=lambda *a, **k: slow({'sentiment': 'NEUTRAL', 'score': 0}, delay)()), \
+             patch.object(agent_module.earnings_calendar, 'get_earnings_info',
+                          side_effect=lambda *a, **k: slow({'next_date': None, 'recent_surprise': None}, delay)()), \
+             patch.object(agent_module.insider_trading, 'get_insider_activity',
+                          side_effect=lambda *a, **k: slow({'sentiment': 'NEUTRAL', 'score': 0}, delay)()):
+            agent = FinancialAgent('TEST', skip_external_data=False)
+            started = time.monotonic()
+            tasks = agent._external_tasks(self.pre_data)
+            results, failures = timeouts.run_concurrently(tasks)
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(failures, {})
+        self.assertLess(elapsed, 3 * delay)
+        self.assertEqual(results['market_regime']['regime'], 'BULL')
+
+    def test_failed_source_falls_back_to_neutral(self):
+        with patch.object(agent_module.insider_trading, 'get_insider_activity', side_effect=fail), \
+             patch.object(agent_module.reddit_sentiment, 'get_reddit_sentiment',
+                          return_value={'sentiment': 'NEUTRAL', 'score': 0}), \
+             patch.object(agent_module.earnings_calendar, 'get_earnings_info',
+                          return_value={'next_date': None, 'recent_surprise': None}):
+            agent = FinancialAgent('TEST', skip_external_data=False)
+            results, failures = timeouts.run_concurrently(agent._external_tasks(self.pre_data))
+
+        self.assertIn('insider', failures)
+        self.assertEqual(results['insider']['sentiment'], 'NEUTRAL')
+
+
+if __name__ == '__main__':
+    unittest.main()